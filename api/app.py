@@ -1,23 +1,39 @@
-from flask import Flask, request, jsonify, send_from_directory, redirect
+from flask import Blueprint, current_app, request, jsonify, send_from_directory, redirect
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, verify_jwt_in_request
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from marshmallow import Schema, fields, validate, ValidationError
 from .supplier_mongo import Supplier
-from .user_mongo import User
+from .user_mongo import User, DEFAULT_PAGE_SIZE
+from . import supplier_sqlite, user_sqlite
+from .sqlite_db import SQLiteDatabase
+from .seed import iter_json_records, seed_users
+from .logging_setup import SanitizedFormatter, configure_logging
+from . import (archiver, audit, compression, json_provider, metrics, mongo_pool, profiler, read_routing,
+               static_assets, timing)
+from .health import CachedPing, mongo_ping
+from .timing import TimedFlask
+from .slow_queries import SlowQueryLog
+from bson.errors import InvalidId
 from flask_pymongo import PyMongo
+from pymongo.errors import PyMongoError
 from . import config
 from flask_wtf.csrf import CSRFProtect
-from flask_swagger_ui import get_swaggerui_blueprint
+from flask.cli import with_appcontext
+from werkzeug.local import LocalProxy
+import click
+import gzip
+import hashlib
+import json
 import secrets
+import sqlite3
 import logging
-import re
+import random
+import threading
 from datetime import timedelta
 from functools import wraps
+from pathlib import Path
 import os
-import yaml
-from .validators import CNPJValidator
 from dotenv import load_dotenv
 
 
@@ -26,44 +42,11 @@ load_dotenv()
 
 
 # ============================================================================
-# Logger customizado que sanitiza headers sensíveis
+# Logging: JSON estruturado, assíncrono (QueueHandler/QueueListener) e sanitizado
 # ============================================================================
 
-class SanitizedFormatter(logging.Formatter):
-    """Formatter que mascara tokens JWT e credenciais sensíveis nos logs."""
-    
-    # Padrão para detectar tokens JWT (começa com "eyJ")
-    JWT_PATTERN = re.compile(r'eyJ[A-Za-z0-9_-]+')
-    # Padrão para Authorization header
-    AUTH_PATTERN = re.compile(r'Authorization["\']?\s*:\s*["\']?Bearer\s+[^\s"\']+')
-    
-    def format(self, record):
-        msg = super().format(record)
-        # Mascarar tokens JWT
-        msg = self.JWT_PATTERN.sub(lambda m: m.group(0)[:10] + '...[REDACTED]', msg)
-        # Mascarar Authorization header
-        msg = self.AUTH_PATTERN.sub('Authorization: Bearer [REDACTED]', msg)
-        return msg
-
-
-# Configurar logging com formatter customizado
-log_handler = logging.StreamHandler()
-log_formatter = SanitizedFormatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-log_handler.setFormatter(log_formatter)
-
+configure_logging()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-logger.addHandler(log_handler)
-
-# Log handler para werkzeug
-werkzeug_logger = logging.getLogger('werkzeug')
-werkzeug_logger.setLevel(logging.DEBUG)
-werkzeug_logger.handlers.clear()
-werkzeug_logger.addHandler(log_handler)
-
-logger.info("Inicializando aplicação Flask com MongoDB")
 
 # ============================================================================
 # Configuração inicial
@@ -73,52 +56,115 @@ logger.info("Inicializando aplicação Flask com MongoDB")
 SWAGGER_URL = '/api/docs'
 API_URL = '/api/swagger.json'
 
-class SupplierSchema(Schema):
-    name = fields.Str(required=True)
-    cnpj = fields.Str(required=True, validate=CNPJValidator())
-    email = fields.Email(required=True)
-    phone = fields.Str(required=True)
+# ============================================================================
+# Extensões (ligadas à aplicação em create_app)
+# ============================================================================
+
+# JWTManager e CSRFProtect guardam o estado em app.extensions e podem ser
+# ligados a várias aplicações. O cliente MongoDB, o limiter e o registro de
+# consultas lentas são criados por aplicação em create_app: uma segunda
+# aplicação (testes, bench/wsgi.py) não troca o estado da primeira.
+jwt = JWTManager()
+csrf = CSRFProtect()
+
+# Cliente da aplicação atual (app.extensions['esk_mongo']). O PyMongo cria o
+# MongoClient com connect=False: nenhuma conexão é aberta até a primeira
+# operação no banco
+mongo = LocalProxy(lambda: current_app.extensions['esk_mongo'])
+
+# Limites padrão por IP e por rota (também aplicados em api/asgi.py)
+DEFAULT_LIMITS = ["200 per day", "50 per hour"]
 
+# Campos que PUT /users/<id> pode alterar; os demais (hash, timestamps) são ignorados
+USER_UPDATE_FIELDS = ('username', 'email', 'role', 'active', 'password')
 
-app = Flask(__name__, static_folder='../frontend', static_url_path='/frontend')
-app.config["MONGO_URI"] = config.MONGO_URI
+bp = Blueprint('main', __name__)
 
-mongo = PyMongo(app)
+
+def rate_limit(rule):
+    """Limite próprio da rota (rule) ou isenção (None), aplicado por _init_limiter."""
+    def decorator(fn):
+        fn.rate_limit = rule
+        return fn
+    return decorator
 
 # ============================================================================
-# CORS: Configuração restritiva por ambiente
+# Modelos: instanciados sob demanda, um par por aplicação
 # ============================================================================
-CORS(
-    app,
-    resources={r"/*": {"origins": config.ALLOWED_ORIGINS}},
-    supports_credentials=True,
-    allow_headers=["Content-Type", "Authorization", "X-CSRFToken"],
-    expose_headers=["Content-Type"],
-    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    max_age=3600
-)
-
-# Configurar Swagger UI
-swaggerui_blueprint = get_swaggerui_blueprint(
-    SWAGGER_URL,
-    API_URL,
-    config={
-        'app_name': "Sistema de Gestão de Fornecedores"
-    }
-)
-app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+
+# Implementações por backend (DATABASE_BACKEND)
+MODELS = {
+    'mongo': {'supplier': Supplier, 'user': User},
+    'sqlite': {'supplier': supplier_sqlite.Supplier, 'user': user_sqlite.User},
+}
+
+def _get_model(name):
+    models = current_app.extensions.setdefault('esk_models', {})
+    if name not in models:
+        factory = MODELS[current_app.config['DATABASE_BACKEND']][name]
+        if current_app.config['DATABASE_BACKEND'] == 'sqlite':
+            models[name] = factory(current_app.extensions['esk_sqlite'])
+        else:
+            # Read preference das listagens (None = primário), ver api/read_routing.py
+            options = {'read_preference': current_app.extensions['esk_list_read_preference']}
+            if name == 'supplier':
+                # Group commit das criações (SUPPLIER_GROUP_COMMIT_MS > 0)
+                options.update(group_commit_ms=current_app.config['SUPPLIER_GROUP_COMMIT_MS'],
+                               group_commit_max=current_app.config['SUPPLIER_GROUP_COMMIT_MAX'])
+            models[name] = factory(current_app.extensions['esk_mongo'], **options)
+        # create/update/delete geram eventos de auditoria (gravados em lote, fora da requisição)
+        if 'esk_audit' in current_app.extensions:
+            models[name] = audit.Audited(models[name], name, current_app.extensions['esk_audit'])
+    return models[name]
+
+supplier = LocalProxy(lambda: _get_model('supplier'))
+user = LocalProxy(lambda: _get_model('user'))
+
+
+def _validate_supplier(data):
+    """Valida o payload de fornecedor; retorna as mensagens de erro ou None."""
+    # marshmallow só é importado na primeira validação
+    from .schemas import SupplierSchema, ValidationError
+    with timing.span('validate'):
+        try:
+            SupplierSchema().load(data)
+        except ValidationError as err:
+            return err.messages
+    return None
+
+
+def jwt_required(**options):
+    """jwt_required do flask_jwt_extended, com a verificação medida no span 'jwt'.
+
+    O identity do token é o autor dos eventos de auditoria da requisição.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timing.span('jwt'):
+                verify_jwt_in_request(**options)
+            with audit.acting_as(get_jwt_identity()):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
 
 # ============================================================================
 # Middleware para logging com sanitização
 # ============================================================================
 
-@app.before_request
 def log_request_info():
-    """Log de requisições com headers sensíveis sanitizados."""
+    """Log amostrado de headers e corpo (sanitizados ao serem emitidos).
+
+    Só ocorre com LOG_LEVEL=DEBUG e para a fração LOG_REQUEST_SAMPLE_RATE das
+    requisições; nas demais o corpo não é lido nem mantido em buffer.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= current_app.config['LOG_REQUEST_SAMPLE_RATE']:
+        return
     logger.debug('Request Headers: %s', request.headers)
     logger.debug('Request Body: %s', request.get_data())
 
-@app.after_request
 def log_response_info(response):
     """Log de resposta (sem corpo para evitar dados sensíveis)."""
     logger.debug('Response Status: %s', response.status)
@@ -128,32 +174,69 @@ def log_response_info(response):
 # Rota para servir documentação Swagger
 # ============================================================================
 
-# Rota para servir o arquivo swagger.json
-@app.route('/api/swagger.json')
-def serve_swagger_spec():
-    with open('api/openapi.yaml', 'r', encoding='utf-8') as f:
-        spec = yaml.safe_load(f)
-    return jsonify(spec)
+class _CompiledSpec:
+    """Especificação OpenAPI convertida de YAML para JSON uma única vez.
 
-# ============================================================================
-# Configuração de segurança
-# ============================================================================
+    Guarda o corpo JSON, sua versão gzip e o ETag. Em modo debug, a
+    especificação é recompilada quando o mtime do arquivo muda.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def get(self, check_mtime=False):
+        entry = self._entry
+        if entry is None or (check_mtime and self._mtime() != entry['mtime']):
+            with self._lock:
+                entry = self._entry
+                if entry is None or (check_mtime and self._mtime() != entry['mtime']):
+                    entry = self._entry = self._compile()
+        return entry
 
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', secrets.token_hex(32))
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-app.config['WTF_CSRF_SECRET_KEY'] = os.getenv('WTF_CSRF_SECRET_KEY', secrets.token_hex(32))
+    def _mtime(self):
+        return os.stat(self.path).st_mtime_ns
+
+    def _compile(self):
+        import yaml  # carregado apenas quando a documentação é acessada
+        mtime = self._mtime()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            spec = yaml.safe_load(f)
+        body = json.dumps(spec, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        logger.info(f"Especificação OpenAPI compilada ({len(body)} bytes)")
+        return {
+            'mtime': mtime,
+            'body': body,
+            'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+            'etag': hashlib.sha256(body).hexdigest()[:32],
+        }
 
-# CSRF: Desabilitado em TESTING e desenvolvimento, habilitado em produção
-# ENABLE_CSRF controla se CSRF está ativo (padrão: False em dev/test, True em prod)
-ENABLE_CSRF = os.getenv('ENABLE_CSRF', 'false').lower() == 'true'
-app.config['WTF_CSRF_ENABLED'] = ENABLE_CSRF
-logger.info(f"CSRF habilitado: {ENABLE_CSRF}")
+
+openapi_spec = _CompiledSpec(Path(__file__).parent / 'openapi.yaml')
+
+# Rota para servir o arquivo swagger.json
+@bp.route('/api/swagger.json')
+def serve_swagger_spec():
+    spec = openapi_spec.get(check_mtime=current_app.debug)
+    use_gzip = (current_app.config.get('SWAGGER_GZIP', True)
+                and 'gzip' in request.accept_encodings)
+    if use_gzip:
+        response = current_app.response_class(spec['gzip'], mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(f"{spec['etag']}-gz")
+    else:
+        response = current_app.response_class(spec['body'], mimetype='application/json')
+        response.set_etag(spec['etag'])
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('SWAGGER_CACHE_MAX_AGE', 86400)
+    return response.make_conditional(request)
 
 # ============================================================================
 # Security Headers Middleware
 # ============================================================================
 
-@app.after_request
 def add_security_headers(response):
     """Adiciona headers de segurança padrão."""
     response.headers['X-Content-Type-Options'] = 'nosniff'
@@ -169,77 +252,131 @@ def add_security_headers(response):
         "connect-src 'self' https://cdn.jsdelivr.net"
     )
     # HSTS apenas em produção (HTTPS e não TESTING)
-    if not app.config.get('DEBUG', False) and not app.config.get('TESTING', False):
+    if not current_app.config.get('DEBUG', False) and not current_app.config.get('TESTING', False):
         response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
     return response
 
-# ============================================================================
-# Inicializar extensões
-# ============================================================================
-
-jwt = JWTManager(app)
-csrf = CSRFProtect(app)
-
 # ============================================================================
 # Rate Limiting
 # ============================================================================
 
-# Criar limiter sempre, mas será desabilitado em TESTING
-limiter = Limiter(
-    app=app,
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://",  # Em produção, usar Redis
-    in_memory_fallback_enabled=True
-)
+def _init_limiter(app):
+    """Cria o limiter da aplicação e aplica os limites marcados com rate_limit nas views."""
+    limiter = Limiter(
+        key_func=get_remote_address,
+        default_limits=DEFAULT_LIMITS,
+        storage_uri="memory://",  # Em produção, usar Redis
+        in_memory_fallback_enabled=True
+    )
+    limiter.init_app(app)
+    for endpoint, view in list(app.view_functions.items()):
+        if hasattr(view, 'rate_limit'):
+            app.view_functions[endpoint] = (limiter.exempt(view) if view.rate_limit is None
+                                            else limiter.limit(view.rate_limit)(view))
+    app.extensions['esk_limiter'] = limiter
+    return limiter
 
 # Desabilitar rate limiting em modo TESTING
-@app.before_request
 def disable_limiter_if_testing():
     """Desabilita rate limiting quando app está em modo TESTING."""
-    if app.config.get('TESTING', False):
-        limiter.enabled = False
-    else:
-        limiter.enabled = True
-
-logger.info("Rate limiting inicializado (será desabilitado em TESTING)")
-
-# Instanciar modelos (agora ambos usam MongoDB)
-supplier = Supplier(mongo)
-user = User(mongo)
+    current_app.extensions['esk_limiter'].enabled = not current_app.config.get('TESTING', False)
 
 # ============================================================================
-# Seed: garante que a collection de usuários não fique vazia
+# Comandos CLI: inicialização explícita do banco
 # ============================================================================
 
-def _seed_users():
-    """Importa usuários do users.json para o MongoDB se a collection estiver vazia."""
-    try:
-        if mongo.db.users.count_documents({}) > 0:
-            return
+def _seed_users(json_path=None):
+    """Importa usuários de um arquivo de seed (padrão: db/users.json).
+
+    Idempotente: usuários já existentes (mesmo username) são mantidos. O
+    arquivo é lido de forma incremental e gravado com bulk_write em lote.
+    Só a ausência do arquivo é ignorada; falhas de leitura ou do banco
+    encerram o comando com erro (código de saída 1).
+    """
+    if json_path is None:
         json_path = os.path.join(os.path.dirname(__file__), '..', 'db', 'users.json')
-        if not os.path.exists(json_path):
-            logger.warning("db/users.json não encontrado — seed de usuários ignorado")
-            return
-        import json as _json
-        with open(json_path, 'r', encoding='utf-8') as f:
-            users_data = _json.load(f)
-        count = 0
-        for u in users_data.values():
-            u.pop('id', None)
-            if not mongo.db.users.find_one({'username': u['username']}):
-                mongo.db.users.insert_one(u)
-                count += 1
-        logger.info(f"Seed de usuários: {count} usuário(s) importado(s) do users.json")
-    except Exception as e:
+    if not os.path.exists(json_path):
+        logger.warning(f"{json_path} não encontrado — seed de usuários ignorado")
+        return
+    try:
+        if current_app.config['DATABASE_BACKEND'] == 'sqlite':
+            count = user.seed(iter_json_records(json_path))
+        else:
+            count = seed_users(mongo.db.users, iter_json_records(json_path))
+        logger.info(f"Seed de usuários: {count} usuário(s) importado(s) de {os.path.basename(json_path)}")
+    except (PyMongoError, sqlite3.Error, ValueError, OSError) as e:
         logger.error(f"Erro no seed de usuários: {e}")
+        raise click.ClickException(f"Erro no seed de usuários: {e}") from e
+
+def audit_store(app):
+    """Store da trilha de auditoria do backend configurado."""
+    if app.config['DATABASE_BACKEND'] == 'sqlite':
+        return audit.SQLiteAuditStore(app.extensions['esk_sqlite'])
+    return audit.MongoAuditStore(app.extensions['esk_mongo'].db)
+
+@click.command('create-indexes')
+@with_appcontext
+def create_indexes_command():
+    """Garante os índices das collections (uso: flask create-indexes)."""
+    supplier.ensure_indexes()
+    user.ensure_indexes()
+    audit_store(current_app).ensure_indexes()
+    click.echo("Índices de fornecedores, usuários e auditoria garantidos.")
+
+@click.command('seed-users')
+@click.option('--file', 'json_path', type=click.Path(exists=True, dir_okay=False),
+              help='Arquivo de seed (.json ou .jsonl); padrão: db/users.json')
+@with_appcontext
+def seed_users_command(json_path):
+    """Importa usuários do arquivo de seed sem duplicar os existentes."""
+    _seed_users(json_path)
+    click.echo("Seed de usuários concluído.")
+
+@click.command('migrate-data')
+@with_appcontext
+def migrate_data_command():
+    """Converte registros antigos para o formato gravado atual (uso: flask migrate-data).
+
+    Migração única e idempotente: depois dela as leituras devolvem os
+    documentos como estão gravados, sem normalização por registro.
+    """
+    suppliers = supplier.migrate()
+    users = user.migrate()
+    click.echo(f"Migração concluída: {suppliers} fornecedor(es) e {users} usuário(s) atualizados.")
+
+def archive_suppliers():
+    """Arquivamento com a retenção e o lote configurados; retorna quantos foram movidos."""
+    return supplier.archive(timedelta(days=current_app.config['ARCHIVE_RETENTION_DAYS']),
+                            current_app.config['ARCHIVE_BATCH_SIZE'])
+
+@click.command('archive-suppliers')
+@with_appcontext
+def archive_suppliers_command():
+    """Move fornecedores excluídos além da retenção para o arquivo (uso: flask archive-suppliers)."""
+    click.echo(f"{archive_suppliers()} fornecedor(es) arquivado(s).")
 
-with app.app_context():
+@click.command('compress-static')
+@with_appcontext
+def compress_static_command():
+    """Gera as variantes .gz dos arquivos JS/CSS do frontend."""
+    count = compression.precompress_static(current_app.static_folder)
+    click.echo(f"{count} arquivo(s) comprimido(s).")
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Executa create-indexes, migrate-data e seed-users (uso: flask init-db)."""
+    supplier.ensure_indexes()
+    user.ensure_indexes()
+    audit_store(current_app).ensure_indexes()
+    supplier.migrate()
+    user.migrate()
     _seed_users()
+    click.echo("Banco de dados inicializado.")
 
 # Rotas de autenticação
-@app.route('/auth/login', methods=['POST'])
-@limiter.limit("10 per minute")  # Rate limiting: máximo 10 tentativas/minuto
+@bp.route('/auth/login', methods=['POST'])
+@rate_limit("10 per minute")  # Rate limiting: máximo 10 tentativas/minuto
 def login():
     """Login de usuário"""
     try:
@@ -281,8 +418,8 @@ def login():
         logger.error(f"Erro no login: {str(e)}", exc_info=True)
         return {'success': False, 'message': 'Erro interno no servidor'}, 500
 
-@app.route('/auth/register', methods=['POST'])
-@limiter.limit("5 per minute")  # Rate limiting: máximo 5 registros/minuto
+@bp.route('/auth/register', methods=['POST'])
+@rate_limit("5 per minute")  # Rate limiting: máximo 5 registros/minuto
 def register():
     """Registro de novo usuário"""
     try:
@@ -331,21 +468,36 @@ def admin_required(fn):
     return wrapper
 
 # Rotas protegidas de usuários (apenas admin)
-@app.route('/users', methods=['GET'])
+@bp.route('/users', methods=['GET'])
 @admin_required
 def get_users():
-    """Lista todos os usuários (requer admin)"""
+    """Lista usuários paginados (requer admin)
+
+    Parâmetros de query: limit, after (cursor), role, active, q (prefixo
+    de username ou email, sem diferenciar maiúsculas).
+    """
     try:
-        users = user.get_all()
-        # Remover senhas da resposta
-        for u in users.values():
-            u.pop('password', None)
-        return {'success': True, 'data': users}
+        args = request.args
+        active = args.get('active')
+        if active is not None:
+            active = active.lower() in ('true', '1', 'sim')
+        try:
+            users, next_cursor = user.get_page(
+                limit=args.get('limit', DEFAULT_PAGE_SIZE),
+                after=args.get('after'),
+                role=args.get('role'),
+                active=active,
+                search=args.get('q', '').strip(),
+                read_after=read_routing.read_after()
+            )
+        except (ValueError, InvalidId):
+            return {'success': False, 'message': 'Parâmetros de paginação inválidos'}, 400
+        return {'success': True, 'data': users, 'next_cursor': next_cursor}
     except Exception as e:
         logger.error(f"Erro ao listar usuários: {str(e)}")
         return {'success': False, 'message': 'Erro interno no servidor'}, 500
 
-@app.route('/users/<id>', methods=['GET'])
+@bp.route('/users/<id>', methods=['GET'])
 @admin_required
 def get_user(id):
     """Obtém um usuário específico (requer admin)"""
@@ -359,13 +511,25 @@ def get_user(id):
         logger.error(f"Erro ao buscar usuário {id}: {str(e)}")
         return {'success': False, 'message': 'Erro interno no servidor'}, 500
 
-@app.route('/users/<id>', methods=['PUT'])
+@bp.route('/users/<id>', methods=['PUT'])
 @admin_required
 def update_user(id):
-    """Atualiza um usuário (requer admin)"""
+    """Atualiza um usuário (requer admin)
+
+    Apenas os campos de USER_UPDATE_FIELDS são aplicados; a senha nova é
+    gravada com hash pelo repositório, como na criação.
+    """
     try:
-        data = request.get_json()
-        user_data = user.update(id, data)
+        data = request.get_json(silent=True) or {}
+        changes = {field: data[field] for field in USER_UPDATE_FIELDS if field in data}
+        if not changes:
+            return {'success': False, 'message': 'Nenhum campo atualizável informado'}, 400
+        if 'password' in changes and not (isinstance(changes['password'], str) and changes['password']):
+            return {'success': False, 'message': 'Senha inválida'}, 400
+        try:
+            user_data = user.update(id, changes)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}, 400
         if user_data is None:
             return {'success': False, 'message': 'Usuário não encontrado'}, 404
         user_data.pop('password', None)
@@ -374,7 +538,7 @@ def update_user(id):
         logger.error(f"Erro ao atualizar usuário {id}: {str(e)}")
         return {'success': False, 'message': 'Erro interno no servidor'}, 500
 
-@app.route('/users/<id>', methods=['DELETE'])
+@bp.route('/users/<id>', methods=['DELETE'])
 @admin_required
 def delete_user(id):
     """Remove um usuário (requer admin)"""
@@ -387,13 +551,13 @@ def delete_user(id):
         return {'success': False, 'message': 'Erro interno no servidor'}, 500
 
 # Proteger todas as rotas de fornecedores com autenticação
-@app.route('/suppliers', methods=['GET'])
+@bp.route('/suppliers', methods=['GET'])
 @jwt_required()
 def get_all_suppliers():
     """Lista todos os fornecedores."""
     try:
         logger.info("Recebendo solicitação para listar fornecedores")
-        data = supplier.get_all()
+        data = supplier.get_all(after=read_routing.read_after())
         logger.debug(f"Fornecedores recuperados: {len(data)} itens")
         logger.debug(f"Estrutura: {data.keys() if data else 'Nenhum dado'}")
         # Garantir que a resposta está no formato esperado pelo frontend
@@ -402,7 +566,7 @@ def get_all_suppliers():
         logger.error(f"Erro ao listar fornecedores: {str(e)}", exc_info=True)
         return {'success': False, 'message': 'Erro ao listar fornecedores'}, 500
 
-@app.route('/suppliers/<id>', methods=['GET'])
+@bp.route('/suppliers/<id>', methods=['GET'])
 @jwt_required()
 def get_one_supplier(id):
     """Obtém um fornecedor pelo ID."""
@@ -415,18 +579,16 @@ def get_one_supplier(id):
         logger.error(f"Erro ao buscar fornecedor {id}: {str(e)}")
         return {'success': False, 'message': 'Erro ao buscar fornecedor'}, 500
 
-@app.route('/suppliers', methods=['POST'])
+@bp.route('/suppliers', methods=['POST'])
 @jwt_required()
 def create_supplier():
     """Cria um novo fornecedor."""
     try:
-        schema = SupplierSchema()
-        try:
-            data = request.get_json()
-            schema.load(data)
-        except ValidationError as err:
-            logger.warning(f"Erro de validação: {err.messages}")
-            return {'success': False, 'message': f"Erro de validação: {err.messages}"}, 400
+        data = request.get_json()
+        errors = _validate_supplier(data)
+        if errors:
+            logger.warning(f"Erro de validação: {errors}")
+            return {'success': False, 'message': f"Erro de validação: {errors}"}, 400
         logger.debug(f"Tentando criar fornecedor com dados: {data}")
         result = supplier.create(data)
         logger.info(f"Fornecedor criado com sucesso: {result}")
@@ -439,19 +601,17 @@ def create_supplier():
         logger.error(f"Erro ao criar fornecedor: {str(e)}", exc_info=True)
         return {'success': False, 'message': f'Erro ao criar fornecedor: {str(e)}'}, 500
 
-@app.route('/suppliers/<id>', methods=['PUT'])
+@bp.route('/suppliers/<id>', methods=['PUT'])
 @jwt_required()
 def update_supplier(id):
     """Atualiza um fornecedor existente."""
     try:
         data = request.get_json()
         logger.debug(f"Tentando atualizar fornecedor {id} com dados: {data}")
-        schema = SupplierSchema()
-        try:
-            schema.load(data)
-        except ValidationError as err:
-            logger.warning(f"Erro de validação: {err.messages}")
-            return {'success': False, 'message': f"Erro de validação: {err.messages}"}, 400
+        errors = _validate_supplier(data)
+        if errors:
+            logger.warning(f"Erro de validação: {errors}")
+            return {'success': False, 'message': f"Erro de validação: {errors}"}, 400
         result = supplier.update(id, data)
         if result is None:
             logger.warning(f"Fornecedor não encontrado para atualização: {id}")
@@ -465,7 +625,7 @@ def update_supplier(id):
         logger.error(f"Erro ao atualizar fornecedor {id}: {str(e)}", exc_info=True)
         return {'success': False, 'message': f'Erro ao atualizar fornecedor: {str(e)}'}, 500
 
-@app.route('/suppliers/<id>', methods=['DELETE'])
+@bp.route('/suppliers/<id>', methods=['DELETE'])
 @jwt_required()
 def delete_supplier(id):
     """Remove um fornecedor pelo ID."""
@@ -483,12 +643,171 @@ def delete_supplier(id):
         return {'success': False, 'message': f'Erro ao excluir fornecedor: {str(e)}'}, 500
 
 # Redirecionar a raiz para o frontend
-@app.route('/')
+@bp.route('/')
 def root():
     return redirect('/frontend/index.html')
 
+# ============================================================================
+# Health checks (sem autenticação e sem rate limiting, para probes)
+# ============================================================================
+
+@bp.route('/healthz', methods=['GET'])
+@rate_limit(None)
+def healthz():
+    """Liveness: o processo responde; não consulta o banco"""
+    return {'status': 'ok'}
+
+def _data_migrated(app):
+    """False enquanto houver registros sem 'id' (deploy sem `flask migrate-data`/`init-db`).
+
+    Depois da migração toda escrita grava o formato atual: o resultado
+    positivo fica guardado e a consulta não se repete.
+    """
+    if not app.extensions.get('esk_migrated'):
+        app.extensions['esk_migrated'] = not (supplier.pending_migration() or user.pending_migration())
+    return app.extensions['esk_migrated']
+
+@bp.route('/readyz', methods=['GET'])
+@rate_limit(None)
+def readyz():
+    """Readiness: ping no banco, em cache por HEALTH_CACHE_SECONDS, e dados já migrados"""
+    health = current_app.extensions['esk_health']
+    if current_app.config['DATABASE_BACKEND'] == 'sqlite':
+        result, age = health.check(current_app.extensions['esk_sqlite'].ping)
+    else:
+        result, age = health.check(mongo_ping(mongo.cx, health.timeout))
+    body = {'status': 'ready' if result['ok'] else 'unavailable',
+            current_app.config['DATABASE_BACKEND']: dict(result, age_s=age)}
+    if not result['ok']:
+        return body, 503
+    try:
+        migrated = _data_migrated(current_app._get_current_object())
+    except (PyMongoError, sqlite3.Error) as e:
+        logger.warning(f"Readiness: verificação da migração falhou: {e}")
+        migrated = False
+    if not migrated:
+        body.update(status='unavailable', migration='pendente: execute flask migrate-data')
+        return body, 503
+    return body, 200
+
+# ============================================================================
+# Métricas (formato Prometheus)
+# ============================================================================
+
+@bp.route('/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """Exposição das métricas da aplicação (requer admin)"""
+    if not current_app.config['METRICS_ENABLED']:
+        return {'success': False, 'message': 'Métricas desabilitadas'}, 404
+    return current_app.response_class(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@bp.route('/admin/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """Formas de consulta lentas ordenadas por tempo total (requer admin)"""
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 200))
+    except ValueError:
+        return {'success': False, 'message': 'Parâmetro limit inválido'}, 400
+    slow_query_log = current_app.extensions['esk_slow_queries']
+    return {
+        'success': True,
+        'threshold_ms': slow_query_log.threshold_ms,
+        'data': slow_query_log.top_shapes(limit)
+    }
+
+@bp.route('/admin/suppliers/archive', methods=['GET'])
+@admin_required
+def get_archived_suppliers():
+    """Fornecedores arquivados, paginados por cursor (requer admin)
+
+    Parâmetros de query: limit, after (cursor) e cnpj.
+    """
+    args = request.args
+    try:
+        items, next_cursor = supplier.get_archive(
+            limit=args.get('limit', DEFAULT_PAGE_SIZE), after=args.get('after'), cnpj=args.get('cnpj'))
+    except (ValueError, InvalidId):
+        return {'success': False, 'message': 'Parâmetros de paginação inválidos'}, 400
+    except Exception as e:
+        logger.error(f"Erro ao consultar o arquivo de fornecedores: {e}")
+        return {'success': False, 'message': 'Erro interno no servidor'}, 500
+    return {'success': True, 'data': items, 'next_cursor': next_cursor}
+
+@bp.route('/admin/audit/<entity>/<entity_id>', methods=['GET'])
+@admin_required
+def get_audit_history(entity, entity_id):
+    """Histórico de alterações de um fornecedor ou usuário, do mais recente ao mais antigo (requer admin)
+
+    Parâmetros de query: limit e before (cursor: next_cursor da página anterior).
+    """
+    if entity not in ('supplier', 'user'):
+        return {'success': False, 'message': 'Entidade inválida'}, 404
+    if 'esk_audit' not in current_app.extensions:
+        return {'success': False, 'message': 'Auditoria desabilitada'}, 404
+    args = request.args
+    try:
+        limit = int(args.get('limit', audit.DEFAULT_HISTORY_LIMIT))
+        before = audit.parse_cursor(args['before']) if args.get('before') else None
+        events, next_cursor = audit_store(current_app).history(entity, entity_id, limit, before)
+    except ValueError:
+        return {'success': False, 'message': 'Parâmetros de paginação inválidos'}, 400
+    except Exception as e:
+        logger.error(f"Erro ao consultar a auditoria de {entity} {entity_id}: {e}")
+        return {'success': False, 'message': 'Erro interno no servidor'}, 500
+    return {'success': True, 'data': events, 'next_cursor': next_cursor}
+
+# ============================================================================
+# Profiler sob demanda (amostragem de pilha por requisição)
+# ============================================================================
+
+def profiler_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not current_app.config['PROFILER_ENABLED']:
+            return {'success': False, 'message': 'Profiler desabilitado'}, 404
+        return fn(*args, **kwargs)
+    return wrapper
+
+@bp.route('/admin/profiles/token', methods=['POST'])
+@admin_required
+@profiler_required
+def create_profile_token():
+    """Gera um token para o header X-Profile-Token (requer admin)"""
+    token, expires = profiler.create_token(
+        current_app.config['PROFILER_SECRET'], current_app.config['PROFILER_TOKEN_TTL'])
+    return {'success': True, 'header': profiler.PROFILE_HEADER, 'token': token, 'expires_at': expires}
+
+@bp.route('/admin/profiles', methods=['GET'])
+@admin_required
+@profiler_required
+def get_profiles():
+    """Funções com mais amostras por rota (requer admin)"""
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 200))
+    except ValueError:
+        return {'success': False, 'message': 'Parâmetro limit inválido'}, 400
+    return {'success': True, 'data': profiler.profiles.report(request.args.get('route'), limit)}
+
+@bp.route('/admin/profiles/collapsed', methods=['GET'])
+@admin_required
+@profiler_required
+def get_profiles_collapsed():
+    """Pilhas no formato collapsed para flamegraph (requer admin)"""
+    return current_app.response_class(
+        profiler.profiles.collapsed(request.args.get('route')), mimetype='text/plain')
+
+@bp.route('/admin/profiles', methods=['DELETE'])
+@admin_required
+@profiler_required
+def reset_profiles():
+    """Descarta os perfis coletados (requer admin)"""
+    profiler.profiles.reset()
+    return {'success': True, 'message': 'Perfis removidos'}
+
 # Favicon simples (ícone vazio para evitar erro 404)
-@app.route('/favicon.ico')
+@bp.route('/favicon.ico')
 def favicon():
     from flask import Response
     # Retorna um favicon vazio (1x1 pixel transparente)
@@ -500,5 +819,215 @@ def favicon():
     )
     return Response(favicon_data, mimetype='image/x-icon')
 
-if __name__ == '__main__':
-    app.run(port=5000)
\ No newline at end of file
+# ============================================================================
+# Fábrica da aplicação
+# ============================================================================
+
+_metrics_server = None
+
+def start_metrics_server(app, port_offset=0):
+    """Sobe o servidor de métricas dedicado (METRICS_BIND) no processo atual, uma única vez.
+
+    As métricas ficam em memória em cada processo, então o servidor é
+    iniciado no processo que atende as requisições: no gunicorn, em cada
+    worker (post_fork), ouvindo na porta de METRICS_BIND + `port_offset`
+    (índice do worker); o Prometheus coleta um alvo por worker. Não é
+    chamado por create_app: o mestre do gunicorn não atende requisições.
+    """
+    global _metrics_server
+    bind = app.config['METRICS_BIND']
+    if _metrics_server is not None or not (bind and app.config['METRICS_ENABLED']):
+        return _metrics_server
+    host, _, port = bind.rpartition(':')
+    try:
+        _metrics_server = metrics.start_metrics_server(f"{host}:{int(port) + port_offset}")
+    except OSError as e:
+        # Porta ocupada não impede o processo de atender a aplicação
+        logger.error(f"Servidor de métricas não iniciado em {host}:{int(port) + port_offset}: {e}")
+    return _metrics_server
+
+def reset_mongo_client(app):
+    """Recria o MongoClient e descarta os modelos que guardam suas collections.
+
+    Usado no processo filho após o fork (ver gunicorn.conf.py): o
+    MongoClient não é fork-safe e não deve ser herdado do processo mestre.
+    """
+    app.extensions['esk_mongo'] = PyMongo(app, **app.extensions['esk_mongo_options'])
+    json_provider.init_app(app)
+    app.extensions.pop('esk_models', None)
+    app.extensions['esk_health'].reset()
+    app.extensions['esk_sqlite'].close()
+    mongo_pool.pool_monitor.reset()
+
+def warm_mongo_pool(app):
+    """Abre as conexões de MONGO_MIN_POOL_SIZE (se MONGO_WARMUP estiver ativo)."""
+    if app.config['DATABASE_BACKEND'] != 'mongo':
+        return
+    if app.config['MONGO_WARMUP'] and app.config['MONGO_MIN_POOL_SIZE']:
+        mongo_pool.warm_up(app.extensions['esk_mongo'].cx, app.config['MONGO_MIN_POOL_SIZE'],
+                           app.config['MONGO_WARMUP_TIMEOUT'])
+
+def create_app(config_overrides=None):
+    """Cria e configura a aplicação Flask.
+
+    Nenhuma operação no MongoDB é feita aqui: o cliente conecta na primeira
+    consulta, e índices/seed ficam nos comandos `flask create-indexes`,
+    `flask seed-users` e `flask init-db`. A documentação Swagger só é
+    registrada quando DOCS_ENABLED está ativo.
+    """
+    logger.info("Inicializando aplicação Flask com MongoDB")
+    app = TimedFlask(__name__, static_folder='../frontend', static_url_path='/frontend')
+    app.config['DATABASE_BACKEND'] = config.DATABASE_BACKEND
+    app.config['SQLITE_PATH'] = config.SQLITE_PATH
+    app.config["MONGO_URI"] = config.MONGO_URI
+    app.config['MONGO_MAX_POOL_SIZE'] = config.MONGO_MAX_POOL_SIZE
+    app.config['MONGO_MIN_POOL_SIZE'] = config.MONGO_MIN_POOL_SIZE
+    app.config['MONGO_MAX_IDLE_TIME_MS'] = config.MONGO_MAX_IDLE_TIME_MS
+    app.config['MONGO_MAX_CONNECTING'] = config.MONGO_MAX_CONNECTING
+    app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'] = config.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    app.config['MONGO_CONNECT_TIMEOUT_MS'] = config.MONGO_CONNECT_TIMEOUT_MS
+    app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS'] = config.MONGO_SERVER_SELECTION_TIMEOUT_MS
+    app.config['MONGO_COMPRESSORS'] = config.MONGO_COMPRESSORS
+    app.config['MONGO_ZLIB_LEVEL'] = config.MONGO_ZLIB_LEVEL
+    app.config['MONGO_WARMUP'] = config.MONGO_WARMUP
+    app.config['MONGO_WARMUP_TIMEOUT'] = config.MONGO_WARMUP_TIMEOUT
+    app.config['HEALTH_CACHE_SECONDS'] = config.HEALTH_CACHE_SECONDS
+    app.config['MONGO_LIST_READ_PREFERENCE'] = config.MONGO_LIST_READ_PREFERENCE
+    app.config['MONGO_MAX_STALENESS_SECONDS'] = config.MONGO_MAX_STALENESS_SECONDS
+    app.config['SUPPLIER_GROUP_COMMIT_MS'] = config.SUPPLIER_GROUP_COMMIT_MS
+    app.config['SUPPLIER_GROUP_COMMIT_MAX'] = config.SUPPLIER_GROUP_COMMIT_MAX
+    app.config['ARCHIVE_RETENTION_DAYS'] = config.ARCHIVE_RETENTION_DAYS
+    app.config['ARCHIVE_INTERVAL_SECONDS'] = config.ARCHIVE_INTERVAL_SECONDS
+    app.config['ARCHIVE_BATCH_SIZE'] = config.ARCHIVE_BATCH_SIZE
+    app.config['AUDIT_ENABLED'] = config.AUDIT_ENABLED
+    app.config['AUDIT_BATCH_SIZE'] = config.AUDIT_BATCH_SIZE
+    app.config['AUDIT_FLUSH_MS'] = config.AUDIT_FLUSH_MS
+    app.config['AUDIT_QUEUE_SIZE'] = config.AUDIT_QUEUE_SIZE
+    app.config['DOCS_ENABLED'] = os.getenv('DOCS_ENABLED', 'true').lower() == 'true'
+    app.config['LOG_REQUEST_SAMPLE_RATE'] = config.LOG_REQUEST_SAMPLE_RATE
+    app.config['METRICS_ENABLED'] = config.METRICS_ENABLED
+    app.config['METRICS_BIND'] = config.METRICS_BIND
+    app.config['SLOW_QUERY_ENABLED'] = config.SLOW_QUERY_ENABLED
+    app.config['SLOW_QUERY_MS'] = config.SLOW_QUERY_MS
+    app.config['SLOW_QUERY_FILE'] = config.SLOW_QUERY_FILE
+    app.config['PROFILER_ENABLED'] = config.PROFILER_ENABLED
+    app.config['PROFILER_SAMPLE_RATE'] = config.PROFILER_SAMPLE_RATE
+    app.config['PROFILER_INTERVAL_MS'] = config.PROFILER_INTERVAL_MS
+    app.config['PROFILER_TOKEN_TTL'] = config.PROFILER_TOKEN_TTL
+    app.config['PROFILER_SECRET'] = os.getenv('PROFILER_SECRET')
+    app.config['SERVER_TIMING_ENABLED'] = config.SERVER_TIMING_ENABLED
+    app.config['COMPRESS_ENABLED'] = config.COMPRESS_ENABLED
+    app.config['COMPRESS_MIN_SIZE'] = config.COMPRESS_MIN_SIZE
+    app.config['COMPRESS_LEVEL'] = config.COMPRESS_LEVEL
+    app.config['COMPRESS_ALGORITHMS'] = config.COMPRESS_ALGORITHMS
+    app.config['JSON_PROVIDER'] = config.JSON_PROVIDER
+    app.config['STATIC_FINGERPRINT'] = config.STATIC_FINGERPRINT
+    app.config['STATIC_MAX_AGE'] = config.STATIC_MAX_AGE
+    app.config['STATIC_OFFLOAD'] = config.STATIC_OFFLOAD
+    app.config['STATIC_ACCEL_PREFIX'] = config.STATIC_ACCEL_PREFIX
+
+    # ========================================================================
+    # Configuração de segurança
+    # ========================================================================
+
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', secrets.token_hex(32))
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    app.config['WTF_CSRF_SECRET_KEY'] = os.getenv('WTF_CSRF_SECRET_KEY', secrets.token_hex(32))
+
+    # CSRF: Desabilitado em TESTING e desenvolvimento, habilitado em produção
+    # ENABLE_CSRF controla se CSRF está ativo (padrão: False em dev/test, True em prod)
+    app.config['WTF_CSRF_ENABLED'] = os.getenv('ENABLE_CSRF', 'false').lower() == 'true'
+
+    if config_overrides:
+        app.config.from_mapping(config_overrides)
+    logger.info(f"CSRF habilitado: {app.config['WTF_CSRF_ENABLED']}")
+
+    # Pool e compressão do protocolo; o PoolMonitor publica a espera no checkout
+    mongo_options = dict(mongo_pool.client_options(app.config), event_listeners=[mongo_pool.pool_monitor])
+
+    # Request id, header Server-Timing e access log (primeiro hook registrado)
+    if app.config['SERVER_TIMING_ENABLED']:
+        timing.init_app(app)
+        mongo_options['event_listeners'].append(timing.command_timing)
+
+    # Métricas por rota e por comando MongoDB
+    if app.config['METRICS_ENABLED']:
+        metrics.init_app(app)
+        mongo_options['event_listeners'].append(metrics.command_metrics)
+
+    # Consultas acima de SLOW_QUERY_MS: arquivo rotativo + explain por forma nova
+    slow_query_log = SlowQueryLog(threshold_ms=app.config['SLOW_QUERY_MS'], path=app.config['SLOW_QUERY_FILE'])
+    slow_query_log.client_getter = lambda: app.extensions['esk_mongo'].cx
+    app.extensions['esk_slow_queries'] = slow_query_log
+    if app.config['SLOW_QUERY_ENABLED']:
+        mongo_options['event_listeners'].append(slow_query_log)
+
+    app.extensions['esk_mongo_options'] = mongo_options
+    app.extensions['esk_mongo'] = PyMongo(app, **mongo_options)
+    # Substitui o BSONProvider definido pelo Flask-PyMongo
+    json_provider.init_app(app)
+    app.extensions['esk_health'] = CachedPing(ttl=app.config['HEALTH_CACHE_SECONDS'])
+    if app.config['DATABASE_BACKEND'] not in MODELS:
+        raise ValueError(f"DATABASE_BACKEND inválido: {app.config['DATABASE_BACKEND']}")
+    # Backend SQLite: conexões abertas sob demanda, uma por thread
+    app.extensions['esk_sqlite'] = SQLiteDatabase(app.config['SQLITE_PATH'])
+    # Listagens em secundários (MONGO_LIST_READ_PREFERENCE) e leituras causais
+    read_routing.init_app(app)
+    # Move fornecedores excluídos há mais de ARCHIVE_RETENTION_DAYS para o arquivo
+    archiver.init_app(app, archive_suppliers)
+    # Trilha de auditoria: fila em memória gravada em lote por um thread de fundo
+    audit.init_app(app, lambda: audit_store(app))
+
+    # ========================================================================
+    # CORS: Configuração restritiva por ambiente
+    # ========================================================================
+    CORS(
+        app,
+        resources={r"/*": {"origins": config.ALLOWED_ORIGINS}},
+        supports_credentials=True,
+        allow_headers=["Content-Type", "Authorization", "X-CSRFToken", "X-Read-After"],
+        expose_headers=["Content-Type", "Server-Timing", "X-Request-ID", "X-Read-After"],
+        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        max_age=3600
+    )
+
+    jwt.init_app(app)
+    csrf.init_app(app)
+
+    app.before_request(log_request_info)
+    app.before_request(disable_limiter_if_testing)
+    app.after_request(log_response_info)
+    app.after_request(add_security_headers)
+    # Compressão gzip/br/zstd das respostas e variantes .gz do frontend
+    compression.init_app(app)
+    # URLs com hash e cache imutável do frontend (envolve a view de estáticos)
+    static_assets.init_app(app)
+
+    app.register_blueprint(bp)
+    # Limites por rota no limiter desta aplicação (antes do profiler envolver as views)
+    _init_limiter(app)
+    logger.info("Rate limiting inicializado (será desabilitado em TESTING)")
+
+    if app.config['DOCS_ENABLED']:
+        # Swagger UI é importado apenas quando a documentação está habilitada
+        from flask_swagger_ui import get_swaggerui_blueprint
+        swaggerui_blueprint = get_swaggerui_blueprint(
+            SWAGGER_URL,
+            API_URL,
+            config={
+                'app_name': "Sistema de Gestão de Fornecedores"
+            }
+        )
+        app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+
+    # Envolve as views já registradas; sem efeito com PROFILER_ENABLED=false
+    profiler.init_app(app)
+
+    app.cli.add_command(create_indexes_command)
+    app.cli.add_command(seed_users_command)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(migrate_data_command)
+    app.cli.add_command(archive_suppliers_command)
+    app.cli.add_command(compress_static_command)
+
+    return app
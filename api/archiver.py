@@ -0,0 +1,73 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Archiver:
+    """Thread de fundo que executa o arquivamento de fornecedores periodicamente.
+
+    `job` é chamado dentro de um contexto da aplicação a cada `interval`
+    segundos (a primeira execução ocorre após um intervalo completo). O
+    thread é iniciado na primeira requisição de cada processo, e de novo
+    após um fork, pois threads não sobrevivem a ele. Com vários workers,
+    cada um executa o seu; o arquivamento é idempotente, então execuções
+    simultâneas apenas competem pelos mesmos lotes.
+    """
+
+    def __init__(self, app, job, interval):
+        self.app = app
+        self.job = job
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.runs = 0
+        self.last_moved = 0
+
+    def ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='supplier-archiver', daemon=True)
+            self._thread.start()
+            logger.info(f"Arquivador de fornecedores iniciado (a cada {self.interval:g} s)")
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        with self.app.app_context():
+            moved = self.job()
+        self.runs += 1
+        self.last_moved = moved
+        return moved
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Erro no arquivamento de fornecedores: {e}")
+
+
+def init_app(app, job):
+    """Registra o arquivador (ARCHIVE_INTERVAL_SECONDS > 0 e fora de TESTING)."""
+    interval = app.config['ARCHIVE_INTERVAL_SECONDS']
+    if interval <= 0:
+        return None
+    archiver = Archiver(app, job, interval)
+    app.extensions['esk_archiver'] = archiver
+
+    def start_archiver():
+        if not app.config.get('TESTING', False):
+            archiver.ensure_started()
+
+    app.before_request(start_archiver)
+    return archiver
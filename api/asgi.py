@@ -0,0 +1,312 @@
+"""Ponto de entrada ASGI: rotas de fornecedores assíncronas (AsyncMongoClient).
+
+Uso: uvicorn api.asgi:app --host 0.0.0.0 --port 5000
+
+As rotas /suppliers e /suppliers/<id> são atendidas no event loop, sem
+um thread por requisição: enquanto aguardam o MongoDB, milhares de
+conexões compartilham um único thread. As demais rotas (login, usuários,
+documentação, frontend, preflight CORS) são repassadas à aplicação Flask
+de api/wsgi.py por um pool de threads.
+
+Autenticação, validação, limites por IP, formatos de resposta, métricas
+por rota, Server-Timing e access log são os mesmos das views síncronas.
+O profiler sob demanda (X-Profile-Token) não vale para estas rotas: a
+amostragem de pilha do thread do event loop misturaria as requisições
+concorrentes. Com DATABASE_BACKEND=sqlite não há driver assíncrono:
+todas as rotas são atendidas pela aplicação Flask.
+"""
+import json
+import logging
+import re
+import time
+
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import ExpiredSignatureError, InvalidTokenError
+from limits import parse_many
+from limits.aio.storage import MemoryStorage
+from limits.aio.strategies import FixedWindowRateLimiter
+from pymongo import AsyncMongoClient
+from werkzeug.http import dump_cookie, parse_cookie
+
+from . import audit, compression, config, metrics, read_routing, timing
+from .app import DEFAULT_LIMITS, _validate_supplier, add_security_headers, start_metrics_server
+from .wsgi import app as flask_app
+from .supplier_mongo import AsyncSupplier
+
+logger = logging.getLogger(__name__)
+
+_SUPPLIER_PATH = re.compile(r'^/suppliers(?:/([^/]+))?$')
+_EXPOSE_HEADERS = 'Content-Type, Server-Timing, X-Request-ID, X-Read-After'
+
+
+def _cookie(header, name):
+    if not header:
+        return None
+    return parse_cookie(header).get(name)
+
+
+def _read_after_headers(last_write, secure):
+    # Mesmo header e cookie de read_routing._finish (API síncrona)
+    token = read_routing.encode_operation_time(last_write)
+    cookie = dump_cookie(read_routing.READ_AFTER_COOKIE, token, max_age=read_routing.READ_AFTER_MAX_AGE,
+                         httponly=True, samesite='Lax', secure=secure)
+    return [(b'x-read-after', token.encode()), (b'set-cookie', cookie.encode('latin-1'))]
+
+
+class _JWTError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SupplierASGI:
+    """Aplicação ASGI: fornecedores assíncronos + Flask para o restante."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.fallback = WSGIMiddleware(flask_app)
+        self.client = None
+        self.supplier = None
+        self.enabled = flask_app.config['DATABASE_BACKEND'] == 'mongo'
+        self._static_headers = None
+        self._limits = parse_many('; '.join(DEFAULT_LIMITS))
+        self._limiter = FixedWindowRateLimiter(MemoryStorage())
+        self._routes = {
+            ('GET', False): ('get_all_suppliers', self.get_all_suppliers),
+            ('POST', False): ('create_supplier', self.create_supplier),
+            ('GET', True): ('get_one_supplier', self.get_one_supplier),
+            ('PUT', True): ('update_supplier', self.update_supplier),
+            ('DELETE', True): ('delete_supplier', self.delete_supplier),
+        }
+
+    # ------------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------------
+
+    def startup(self):
+        """Cria o AsyncMongoClient no processo (e event loop) que atende as requisições."""
+        if self.client is not None or not self.enabled:
+            return
+        options = self.flask_app.extensions['esk_mongo_options']
+        self.client = AsyncMongoClient(self.flask_app.config['MONGO_URI'], **options)
+        self.supplier = AsyncSupplier(self.client.get_default_database(),
+                                      read_preference=self.flask_app.extensions['esk_list_read_preference'],
+                                      group_commit_ms=self.flask_app.config['SUPPLIER_GROUP_COMMIT_MS'],
+                                      group_commit_max=self.flask_app.config['SUPPLIER_GROUP_COMMIT_MAX'])
+        if 'esk_audit' in self.flask_app.extensions:
+            self.supplier = audit.AsyncAudited(self.supplier, 'supplier', self.flask_app.extensions['esk_audit'])
+        with self.flask_app.test_request_context():
+            headers = add_security_headers(self.flask_app.response_class()).headers
+        self._static_headers = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers.items() if name.lower() not in ('content-type', 'content-length')
+        ]
+        # Servidor de METRICS_BIND no processo do event loop (não no import)
+        start_metrics_server(self.flask_app)
+        logger.info("Rotas assíncronas de fornecedores inicializadas")
+
+    async def shutdown(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # ------------------------------------------------------------------------
+    # Despacho
+    # ------------------------------------------------------------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and self.enabled:
+            match = _SUPPLIER_PATH.match(scope['path'])
+            route = match and self._routes.get((scope['method'], match.group(1) is not None))
+            if route:
+                await self._handle(scope, receive, send, route, match.group(1))
+                return
+        await self.fallback(scope, receive, send)
+
+    async def _handle(self, scope, receive, send, route, id):
+        self.startup()
+        start = time.perf_counter()
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        request_id = timing.request_id_from(headers.get('x-request-id'))
+        token = timing.begin_spans()
+        routing_tokens = read_routing.begin_request(
+            headers.get('x-read-after') or _cookie(headers.get('cookie'), read_routing.READ_AFTER_COOKIE))
+        endpoint, view = route
+        rule = '/suppliers/<id>' if id is not None else '/suppliers'
+        # Mesmas métricas por rota das views síncronas (api/metrics.py)
+        metrics_token = metrics.begin_request(rule) if self.flask_app.config['METRICS_ENABLED'] else None
+        status = 500
+        try:
+            status, payload = await self._dispatch(scope, receive, headers, endpoint, view, id)
+            with timing.span('serialize'):
+                body = self.flask_app.json.dumps_bytes(payload)
+            encoding, body = compression.compress_body(body, headers.get('accept-encoding'), self.flask_app.config)
+        finally:
+            spans = timing.end_spans(token)
+            last_write = read_routing.end_request(routing_tokens)
+            total = time.perf_counter() - start
+            if metrics_token is not None:
+                metrics.end_request(metrics_token, rule, scope['method'], status, total)
+
+        response_headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'vary', b'Accept-Encoding'),
+            (b'x-request-id', request_id.encode()),
+            (b'server-timing', timing.server_timing_header(spans, total).encode('latin-1')),
+        ]
+        if encoding:
+            response_headers.append((b'content-encoding', encoding.encode()))
+        if last_write is not None:
+            response_headers.extend(_read_after_headers(last_write, scope.get('scheme') == 'https'))
+        response_headers.extend(self._static_headers)
+        response_headers.extend(self._cors_headers(headers.get('origin')))
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+        timing.log_access(request_id, scope['method'], rule, scope['path'], status, total, spans)
+
+    async def _dispatch(self, scope, receive, headers, endpoint, view, id):
+        if not self.flask_app.config.get('TESTING', False):
+            client = scope.get('client') or ('127.0.0.1', 0)
+            for limit in self._limits:
+                if not await self._limiter.hit(limit, client[0], f'main.{endpoint}'):
+                    return 429, {'success': False, 'message': f'Limite de requisições excedido: {limit}'}
+        try:
+            with timing.span('jwt'):
+                identity = self._verify_jwt(headers.get('authorization'))
+        except _JWTError as e:
+            return e.status, {'msg': str(e)}
+        with audit.acting_as(identity):
+            if scope['method'] in ('POST', 'PUT'):
+                data = await self._read_json(receive)
+                return await (view(id, data) if id is not None else view(data))
+            return await (view(id) if id is not None else view())
+
+    def _verify_jwt(self, authorization):
+        # Mesmas mensagens e códigos dos callbacks padrão do flask_jwt_extended
+        if not authorization:
+            raise _JWTError(401, 'Missing Authorization Header')
+        scheme, _, encoded = authorization.partition(' ')
+        if scheme != 'Bearer' or not encoded:
+            raise _JWTError(401, "Missing 'Bearer' type in 'Authorization' header. "
+                                 "Expected 'Authorization: Bearer <JWT>'")
+        try:
+            with self.flask_app.app_context():
+                decoded = decode_token(encoded.strip())
+        except ExpiredSignatureError:
+            raise _JWTError(401, 'Token has expired')
+        except (InvalidTokenError, JWTExtendedException) as e:
+            raise _JWTError(422, str(e))
+        if decoded.get('type') == 'refresh':
+            raise _JWTError(422, 'Only non-refresh tokens are allowed')
+        return decoded.get(self.flask_app.config['JWT_IDENTITY_CLAIM'])
+
+    async def _read_json(self, receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        try:
+            return json.loads(b''.join(chunks) or b'null')
+        except ValueError:
+            return None
+
+    def _cors_headers(self, origin):
+        if not origin or origin not in config.ALLOWED_ORIGINS:
+            return []
+        return [
+            (b'access-control-allow-origin', origin.encode('latin-1')),
+            (b'access-control-allow-credentials', b'true'),
+            (b'access-control-expose-headers', _EXPOSE_HEADERS.encode()),
+            (b'vary', b'Origin'),
+        ]
+
+    # ------------------------------------------------------------------------
+    # Views (mesmas respostas de api/app.py)
+    # ------------------------------------------------------------------------
+
+    async def get_all_suppliers(self):
+        try:
+            data = await self.supplier.get_all(after=read_routing.read_after())
+            return 200, {'success': True, 'data': data}
+        except Exception as e:
+            logger.error(f"Erro ao listar fornecedores: {str(e)}", exc_info=True)
+            return 500, {'success': False, 'message': 'Erro ao listar fornecedores'}
+
+    async def get_one_supplier(self, id):
+        try:
+            data = await self.supplier.get(id)
+            if data is None:
+                return 404, {'success': False, 'message': 'Fornecedor não encontrado'}
+            return 200, {'success': True, 'data': data}
+        except Exception as e:
+            logger.error(f"Erro ao buscar fornecedor {id}: {str(e)}")
+            return 500, {'success': False, 'message': 'Erro ao buscar fornecedor'}
+
+    async def create_supplier(self, data):
+        try:
+            errors = _validate_supplier(data)
+            if errors:
+                logger.warning(f"Erro de validação: {errors}")
+                return 400, {'success': False, 'message': f"Erro de validação: {errors}"}
+            result = await self.supplier.create(data)
+            logger.info(f"Fornecedor criado com sucesso: {result}")
+            return 201, {'success': True, 'data': result}
+        except ValueError as e:
+            logger.warning(f"Erro de validação ao criar fornecedor: {str(e)}")
+            return 400, {'success': False, 'message': str(e)}
+        except Exception as e:
+            logger.error(f"Erro ao criar fornecedor: {str(e)}", exc_info=True)
+            return 500, {'success': False, 'message': f'Erro ao criar fornecedor: {str(e)}'}
+
+    async def update_supplier(self, id, data):
+        try:
+            errors = _validate_supplier(data)
+            if errors:
+                logger.warning(f"Erro de validação: {errors}")
+                return 400, {'success': False, 'message': f"Erro de validação: {errors}"}
+            result = await self.supplier.update(id, data)
+            if result is None:
+                logger.warning(f"Fornecedor não encontrado para atualização: {id}")
+                return 404, {'success': False, 'message': 'Fornecedor não encontrado'}
+            logger.info(f"Fornecedor {id} atualizado com sucesso")
+            return 200, {'success': True, 'data': result}
+        except ValueError as e:
+            logger.warning(f"Erro de validação ao atualizar fornecedor: {str(e)}")
+            return 400, {'success': False, 'message': str(e)}
+        except Exception as e:
+            logger.error(f"Erro ao atualizar fornecedor {id}: {str(e)}", exc_info=True)
+            return 500, {'success': False, 'message': f'Erro ao atualizar fornecedor: {str(e)}'}
+
+    async def delete_supplier(self, id):
+        try:
+            if await self.supplier.delete(id):
+                logger.info(f"Fornecedor {id} excluído com sucesso")
+                return 200, {'success': True, 'message': 'Fornecedor excluído com sucesso'}
+            logger.warning(f"Fornecedor {id} não encontrado para exclusão")
+            return 404, {'success': False, 'message': 'Fornecedor não encontrado'}
+        except Exception as e:
+            logger.error(f"Erro ao excluir fornecedor {id}: {str(e)}")
+            return 500, {'success': False, 'message': f'Erro ao excluir fornecedor: {str(e)}'}
+
+
+app = SupplierASGI(flask_app)
@@ -0,0 +1,356 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from .sqlite_db import sortable_text
+
+logger = logging.getLogger(__name__)
+
+# Limites da consulta de histórico
+DEFAULT_HISTORY_LIMIT = 50
+MAX_HISTORY_LIMIT = 200
+
+# Timestamps preenchidos pelos próprios modelos não entram em 'fields'
+_IGNORED_FIELDS = ('created_at', 'updated_at')
+
+# Usuário autenticado da requisição (identity do JWT)
+_actor = ContextVar('audit_actor', default=None)
+
+
+@contextmanager
+def acting_as(actor):
+    """Define o autor dos eventos registrados dentro do bloco (por requisição)."""
+    token = _actor.set(actor)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def _changed_fields(data):
+    return sorted(k for k in (data or {}) if k not in _IGNORED_FIELDS)
+
+
+def format_cursor(ts, id):
+    """Cursor do histórico: ts e id do último evento devolvido ("<ts ISO>_<id>")."""
+    return f"{ts if isinstance(ts, str) else sortable_text(ts)}_{id}"
+
+
+def parse_cursor(cursor):
+    """Cursor de format_cursor -> (datetime, id em texto); ValueError se malformado."""
+    ts, separator, id = cursor.rpartition('_')
+    if not separator or not id:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return datetime.fromisoformat(ts.removesuffix('Z')), id
+
+
+class _Flush:
+    """Marcador na fila: o worker grava o lote pendente e sinaliza `done` (stop encerra o thread)."""
+
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class AuditLog:
+    """Fila limitada de eventos de auditoria gravados em lote por um thread de fundo.
+
+    record() não faz I/O: o evento entra em uma fila de até `queue_size`
+    itens e volta imediatamente. O worker grava com um único insert_many a
+    cada `batch_size` eventos ou `flush_ms` milissegundos após o primeiro
+    evento do lote, o que ocorrer antes.
+
+    Perda limitada: com a fila cheia o evento é descartado (contado em
+    `dropped`), e um lote cuja gravação falha é descartado após o log do
+    erro, sem novas tentativas que fariam a fila crescer. No encerramento
+    do processo (atexit/close) os eventos pendentes são gravados.
+    """
+
+    def __init__(self, store_getter, batch_size=100, flush_ms=200, queue_size=10000):
+        self.store_getter = store_getter
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        # Separado de _lock: close() segura _lock enquanto espera o worker, que também descarta
+        self._dropped_lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._atexit = False
+        self.written = 0
+        self.dropped = 0
+
+    # ------------------------------------------------------------------------
+    # Produtores (threads das requisições)
+    # ------------------------------------------------------------------------
+
+    def record(self, entity, entity_id, action, fields=(), actor=None):
+        event = {
+            'ts': datetime.utcnow(),
+            'entity': entity,
+            'entity_id': str(entity_id),
+            'action': action,
+            'actor': actor if actor is not None else _actor.get(),
+            'fields': list(fields),
+        }
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            dropped = self._drop(1)
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"Fila de auditoria cheia: {dropped} evento(s) descartado(s)")
+
+    def _drop(self, count):
+        # Incrementado pelas threads das requisições e pelo worker
+        with self._dropped_lock:
+            self.dropped += count
+            return self.dropped
+
+    def flush(self, timeout=5.0):
+        """Grava os eventos enfileirados até agora; False se o prazo expirar."""
+        return self._send(_Flush(), timeout)
+
+    def close(self, timeout=5.0):
+        """Grava os pendentes e encerra o worker (atexit e worker_exit do gunicorn).
+
+        Um record() posterior inicia um novo worker.
+        """
+        with self._lock:
+            done = self._send(_Flush(stop=True), timeout)
+            self._worker = None
+        return done
+
+    def _send(self, marker, timeout):
+        if self._worker is None or self._worker_pid != os.getpid():
+            return True
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    # ------------------------------------------------------------------------
+    # Thread de fundo
+    # ------------------------------------------------------------------------
+
+    def _ensure_worker(self):
+        # Reinicia o thread após fork (threads não sobrevivem ao fork)
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            if not self._atexit:
+                atexit.register(self.close)
+                self._atexit = True
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='audit-log', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, _Flush):
+                self._write(batch)
+                batch, deadline = [], None
+                item.done.set()
+                if item.stop:
+                    return
+                continue
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_ms / 1000
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self.store_getter().insert_many(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self._drop(len(batch))
+            logger.error(f"Erro ao gravar {len(batch)} evento(s) de auditoria (descartados): {e}")
+
+
+class Audited:
+    """Repositório que registra no AuditLog cada create/update/delete bem-sucedido.
+
+    Os demais métodos são repassados ao repositório original. Os eventos
+    trazem apenas os nomes dos campos alterados, nunca os valores.
+    """
+
+    def __init__(self, model, entity, log):
+        self._model = model
+        self._entity = entity
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def create(self, data):
+        fields = _changed_fields(data)
+        result = self._model.create(data)
+        if result is not None:
+            self._log.record(self._entity, result['id'], 'create', fields)
+        return result
+
+    def update(self, id, data):
+        fields = _changed_fields(data)
+        result = self._model.update(id, data)
+        if result is not None:
+            self._log.record(self._entity, result['id'], 'update', fields)
+        return result
+
+    def delete(self, id):
+        deleted = self._model.delete(id)
+        if deleted:
+            self._log.record(self._entity, id, 'delete')
+        return deleted
+
+
+class AsyncAudited(Audited):
+    """Audited para os repositórios assíncronos (api/asgi.py)."""
+
+    async def create(self, data):
+        fields = _changed_fields(data)
+        result = await self._model.create(data)
+        if result is not None:
+            self._log.record(self._entity, result['id'], 'create', fields)
+        return result
+
+    async def update(self, id, data):
+        fields = _changed_fields(data)
+        result = await self._model.update(id, data)
+        if result is not None:
+            self._log.record(self._entity, result['id'], 'update', fields)
+        return result
+
+    async def delete(self, id):
+        deleted = await self._model.delete(id)
+        if deleted:
+            self._log.record(self._entity, id, 'delete')
+        return deleted
+
+
+def _history_page(events, ids, limit):
+    # Um evento a mais só indica que existe próxima página; o cursor é o (ts, id) do
+    # último devolvido: eventos com o mesmo ts não são pulados entre páginas
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = format_cursor(events[-1]['ts'], ids[limit - 1])
+    return events, next_cursor
+
+
+class MongoAuditStore:
+    """Coleção audit_log, com índice por entidade, data e _id (ordem do histórico)."""
+
+    INDEX_KEYS = [('entity', ASCENDING), ('entity_id', ASCENDING), ('ts', DESCENDING), ('_id', DESCENDING)]
+
+    def __init__(self, db):
+        self.collection = db.audit_log
+
+    def ensure_indexes(self):
+        try:
+            self.collection.create_index(self.INDEX_KEYS, name='idx_audit_entity')
+        except OperationFailure as e:
+            # IndexKeySpecsConflict: índice de versão anterior (sem _id) com o mesmo nome
+            if e.code not in (85, 86):
+                raise
+            logger.warning("Recriando o índice 'idx_audit_entity' com novas chaves")
+            self.collection.drop_index('idx_audit_entity')
+            self.collection.create_index(self.INDEX_KEYS, name='idx_audit_entity')
+        logger.info("Índice 'idx_audit_entity' garantido na coleção 'audit_log'.")
+
+    def insert_many(self, events):
+        self.collection.insert_many(events, ordered=False)
+
+    def history(self, entity, entity_id, limit=DEFAULT_HISTORY_LIMIT, before=None):
+        """Eventos da entidade, do mais recente ao mais antigo: (eventos, próximo cursor).
+
+        `before` é o next_cursor da página anterior, já lido com parse_cursor:
+        (ts, id) do último evento recebido.
+        """
+        limit = max(1, min(int(limit), MAX_HISTORY_LIMIT))
+        query = {'entity': entity, 'entity_id': entity_id}
+        if before is not None:
+            ts, id = before
+            if not ObjectId.is_valid(id):
+                raise ValueError(f"Cursor inválido: {id}")
+            query['$or'] = [{'ts': {'$lt': ts}}, {'ts': ts, '_id': {'$lt': ObjectId(id)}}]
+        cursor = self.collection.find(query).sort([('ts', DESCENDING), ('_id', DESCENDING)]).limit(limit + 1)
+        events = list(cursor)
+        ids = [event.pop('_id') for event in events]
+        return _history_page(events, ids, limit)
+
+
+class SQLiteAuditStore:
+    """Tabela audit_log do backend SQLite (ver sqlite_db.SCHEMA)."""
+
+    INSERT = 'INSERT INTO audit_log (entity, entity_id, ts, data) VALUES (?, ?, ?, ?)'
+    SELECT = 'SELECT id, data FROM audit_log WHERE entity = ? AND entity_id = ?'
+
+    def __init__(self, db):
+        self.db = db
+
+    def ensure_indexes(self):
+        """O schema (tabela e índice) é criado na primeira conexão."""
+        self.db.connection
+
+    def insert_many(self, events):
+        # ts com microssegundos fixos: a ordenação e o cursor comparam o texto
+        rows = []
+        for event in events:
+            ts = sortable_text(event['ts'])
+            rows.append((event['entity'], event['entity_id'], ts,
+                         json.dumps(dict(event, ts=ts), ensure_ascii=False)))
+        with self.db.transaction() as conn:
+            conn.executemany(self.INSERT, rows)
+
+    def history(self, entity, entity_id, limit=DEFAULT_HISTORY_LIMIT, before=None):
+        """Mesmo contrato de MongoAuditStore.history; o id do cursor é o da linha."""
+        limit = max(1, min(int(limit), MAX_HISTORY_LIMIT))
+        sql, params = self.SELECT, [entity, entity_id]
+        if before is not None:
+            ts, id = before
+            sql += ' AND (ts < ? OR (ts = ? AND id < ?))'
+            params.extend([sortable_text(ts), sortable_text(ts), int(id)])
+        params.append(limit + 1)
+        rows = self.db.connection.execute(sql + ' ORDER BY ts DESC, id DESC LIMIT ?', params).fetchall()
+        return _history_page([json.loads(row[1]) for row in rows], [row[0] for row in rows], limit)
+
+
+def init_app(app, store_getter):
+    """Registra o AuditLog da aplicação (AUDIT_ENABLED); os modelos são envolvidos em app._get_model.
+
+    `store_getter` é chamado pelo worker a cada lote, fora do contexto da
+    aplicação, e deve devolver o store do backend atual.
+    """
+    if not app.config['AUDIT_ENABLED']:
+        return None
+    log = AuditLog(store_getter, batch_size=app.config['AUDIT_BATCH_SIZE'],
+                   flush_ms=app.config['AUDIT_FLUSH_MS'], queue_size=app.config['AUDIT_QUEUE_SIZE'])
+    app.extensions['esk_audit'] = log
+    return log
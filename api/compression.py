@@ -0,0 +1,189 @@
+import gzip
+import logging
+import mimetypes
+import os
+import zlib
+from pathlib import Path
+
+from flask import current_app, request, send_from_directory
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from werkzeug.security import safe_join
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+# Dependências opcionais: sem elas, apenas gzip é oferecido
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Tipos de conteúdo que valem a pena comprimir
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+# Arquivos estáticos servidos a partir de uma variante .gz, se existir
+PRECOMPRESSED_SUFFIXES = ('.js', '.css')
+# Níveis fixos de brotli e zstd, adequados para compressão por requisição
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+# ============================================================================
+# Compressores incrementais: (compress, sync_flush, finish)
+# ============================================================================
+
+def _gzip_encoder(level):
+    obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return obj.compress, lambda: obj.flush(zlib.Z_SYNC_FLUSH), obj.flush
+
+
+def _brotli_encoder(level):
+    obj = brotli.Compressor(quality=BROTLI_QUALITY)
+    return obj.process, obj.flush, obj.finish
+
+
+def _zstd_encoder(level):
+    obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return obj.compress, lambda: obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), obj.flush
+
+
+ENCODERS = {'gzip': _gzip_encoder}
+if brotli is not None:
+    ENCODERS['br'] = _brotli_encoder
+if zstandard is not None:
+    ENCODERS['zstd'] = _zstd_encoder
+
+
+def negotiate(accept_encoding, algorithms):
+    """Escolhe a codificação de maior qualidade aceita pelo cliente.
+
+    `algorithms` é a ordem de preferência do servidor, usada em empates;
+    codificações sem biblioteca instalada são ignoradas.
+    """
+    if not accept_encoding:
+        return None
+    if not isinstance(accept_encoding, Accept):
+        accept_encoding = parse_accept_header(accept_encoding)
+    return accept_encoding.best_match([a for a in algorithms if a in ENCODERS])
+
+
+def compress(data, encoding, level=6):
+    compress_chunk, _, finish = ENCODERS[encoding](level)
+    return compress_chunk(data) + finish()
+
+
+def compress_stream(chunks, encoding, level=6):
+    """Comprime um iterável de bytes sem acumulá-lo: cada bloco é enviado já decodificável."""
+    compress_chunk, sync_flush, finish = ENCODERS[encoding](level)
+    for chunk in chunks:
+        data = compress_chunk(chunk) + sync_flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def compress_body(data, accept_encoding, config):
+    """Comprime um corpo já montado; devolve (codificação ou None, corpo)."""
+    if not config['COMPRESS_ENABLED'] or len(data) < config['COMPRESS_MIN_SIZE']:
+        return None, data
+    encoding = negotiate(accept_encoding, config['COMPRESS_ALGORITHMS'])
+    if encoding is None:
+        return None, data
+    with timing.span('compress'):
+        compressed = compress(data, encoding, config['COMPRESS_LEVEL'])
+    if len(compressed) >= len(data):
+        return None, data
+    return encoding, compressed
+
+
+# ============================================================================
+# Integração com o Flask
+# ============================================================================
+
+def _is_compressible(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    # Já comprimida (ex.: swagger.json, variantes .gz) ou arquivo servido
+    # diretamente (send_file): nada a fazer
+    if 'Content-Encoding' in response.headers or response.direct_passthrough:
+        return False
+    if response.cache_control.no_transform:
+        return False
+    return (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)
+
+
+def _compress_response(response):
+    config = current_app.config
+    if not _is_compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    if response.is_streamed:
+        encoding = negotiate(request.accept_encodings, config['COMPRESS_ALGORITHMS'])
+        if encoding is None:
+            return response
+        response.response = compress_stream(response.iter_encoded(), encoding, config['COMPRESS_LEVEL'])
+        response.headers.pop('Content-Length', None)
+    else:
+        encoding, data = compress_body(response.get_data(), request.accept_encodings, config)
+        if encoding is None:
+            return response
+        response.set_data(data)
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    return response
+
+
+def _precompressed_static(static_view, static_folder):
+    """Serve `arquivo.js.gz`/`arquivo.css.gz` no lugar do original quando existir."""
+    def send_static_file(filename):
+        if filename.endswith(PRECOMPRESSED_SUFFIXES):
+            if request.accept_encodings['gzip'] > 0:
+                path = safe_join(static_folder, filename + '.gz')
+                if path is not None and os.path.isfile(path):
+                    response = send_from_directory(
+                        static_folder, filename + '.gz', mimetype=mimetypes.guess_type(filename)[0])
+                    response.headers['Content-Encoding'] = 'gzip'
+                    response.vary.add('Accept-Encoding')
+                    return response
+            response = static_view(filename=filename)
+            response.vary.add('Accept-Encoding')
+            return response
+        return static_view(filename=filename)
+    return send_static_file
+
+
+def precompress_static(static_folder, level=9):
+    """Gera as variantes .gz dos arquivos JS/CSS; retorna quantas foram (re)geradas.
+
+    Variantes mais novas que o original são mantidas.
+    """
+    count = 0
+    for path in sorted(Path(static_folder).rglob('*')):
+        if not path.is_file() or path.suffix not in PRECOMPRESSED_SUFFIXES:
+            continue
+        target = path.with_name(path.name + '.gz')
+        if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+            continue
+        data = path.read_bytes()
+        target.write_bytes(gzip.compress(data, compresslevel=level, mtime=0))
+        count += 1
+        logger.info(f"{path.name}: {len(data)} -> {target.stat().st_size} bytes (gzip)")
+    return count
+
+
+def init_app(app):
+    """Registra a compressão de respostas e as variantes .gz dos estáticos."""
+    if not app.config['COMPRESS_ENABLED']:
+        return
+    app.after_request(_compress_response)
+    if app.static_folder and 'static' in app.view_functions:
+        app.view_functions['static'] = _precompressed_static(app.view_functions['static'], app.static_folder)
@@ -4,8 +4,71 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Configuração de conexão com MongoDB para Flask
+# Persistência de fornecedores e usuários: "mongo" ou "sqlite" (arquivo local,
+# sem servidor; para instalações de um nó e testes)
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "mongo").lower()
+SQLITE_PATH = os.getenv(
+    "SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "eskcrud.sqlite3")
+)
+
 MONGO_URI = os.getenv("MONGO_URI", "mongodb+srv://localhost:27017/eskcrud")
 
+
+def _optional_int(name):
+    value = os.getenv(name, "")
+    return int(value) if value else None
+
+
+# Pool de conexões do MongoDB (vazio = valor da MONGO_URI ou padrão do driver)
+MONGO_MAX_POOL_SIZE = _optional_int("MONGO_MAX_POOL_SIZE")
+MONGO_MIN_POOL_SIZE = _optional_int("MONGO_MIN_POOL_SIZE")
+MONGO_MAX_IDLE_TIME_MS = _optional_int("MONGO_MAX_IDLE_TIME_MS")
+MONGO_MAX_CONNECTING = _optional_int("MONGO_MAX_CONNECTING")
+# Tempo máximo de espera por uma conexão livre quando o pool está cheio
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_CONNECT_TIMEOUT_MS = _optional_int("MONGO_CONNECT_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = _optional_int("MONGO_SERVER_SELECTION_TIMEOUT_MS")
+# Compressão do protocolo, em ordem de preferência. Desligada por padrão
+# (custa CPU e só compensa com rede lenta entre a API e o MongoDB); para
+# ativar, ex.: "zstd,zlib" (zstd e snappy exigem os pacotes opcionais
+# zstandard e python-snappy; os ausentes são ignorados)
+MONGO_COMPRESSORS = [
+    c.strip() for c in os.getenv("MONGO_COMPRESSORS", "").split(",") if c.strip()
+]
+MONGO_ZLIB_LEVEL = int(os.getenv("MONGO_ZLIB_LEVEL", "6"))
+# Abre as conexões de MONGO_MIN_POOL_SIZE na inicialização de cada worker
+MONGO_WARMUP = os.getenv("MONGO_WARMUP", "true").lower() == "true"
+MONGO_WARMUP_TIMEOUT = float(os.getenv("MONGO_WARMUP_TIMEOUT", "5"))
+# Validade (segundos) do ping em cache usado por /readyz
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+# Read preference das listagens e buscas (fornecedores e usuários); leituras
+# por id, login e leituras após escrita ficam no primário
+MONGO_LIST_READ_PREFERENCE = os.getenv("MONGO_LIST_READ_PREFERENCE", "secondaryPreferred")
+# Atraso máximo de replicação aceito nessas leituras (-1 = sem limite; mínimo 90)
+MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", "90"))
+
+# Group commit de POST /suppliers (MongoDB): criações concorrentes do mesmo
+# processo em até SUPPLIER_GROUP_COMMIT_MS ms, ou até SUPPLIER_GROUP_COMMIT_MAX
+# documentos, são gravadas com um único insert_many (0 desliga)
+SUPPLIER_GROUP_COMMIT_MS = float(os.getenv("SUPPLIER_GROUP_COMMIT_MS", "0"))
+SUPPLIER_GROUP_COMMIT_MAX = int(os.getenv("SUPPLIER_GROUP_COMMIT_MAX", "256"))
+
+# Exclusão lógica de fornecedores: excluídos há mais de ARCHIVE_RETENTION_DAYS
+# são movidos para o arquivo (suppliers_archive) a cada ARCHIVE_INTERVAL_SECONDS
+# (0 desliga o thread; `flask archive-suppliers` executa sob demanda)
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "90"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+# Trilha de auditoria de fornecedores e usuários (api/audit.py): eventos em
+# fila limitada, gravados em lote a cada AUDIT_BATCH_SIZE eventos ou
+# AUDIT_FLUSH_MS ms; com a fila cheia (AUDIT_QUEUE_SIZE) os eventos são descartados
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_MS = int(os.getenv("AUDIT_FLUSH_MS", "200"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+
 # CORS: Configurar origens permitidas por ambiente
 # DESENVOLVIMENTO: localhost:3000, localhost:5173 (Vite default)
 # PRODUÇÃO: seu domínio real
@@ -16,3 +79,80 @@ ALLOWED_ORIGINS = os.getenv(
 
 # Converter para lista, removendo espaços
 ALLOWED_ORIGINS = [origin.strip() for origin in ALLOWED_ORIGINS]
+
+# Logging
+# LOG_LEVEL: DEBUG, INFO, WARNING, ERROR (padrão: INFO)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# LOG_FORMAT: "json" (uma linha JSON por registro) ou "text"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Fração das requisições (0.0 a 1.0) com headers e corpo logados em DEBUG
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))
+# Capacidade da fila de logs; registros excedentes são descartados
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Métricas Prometheus
+# METRICS_ENABLED: coleta por rota e por comando MongoDB; /metrics exige admin
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# METRICS_BIND: "host:porta" de um servidor dedicado sem autenticação
+# (ex.: 127.0.0.1:9100, acessível apenas pela rede interna); vazio desabilita.
+# No gunicorn cada worker ouve na porta + seu índice (9100, 9101, ...)
+METRICS_BIND = os.getenv("METRICS_BIND", "")
+
+# Log de consultas lentas do MongoDB
+SLOW_QUERY_ENABLED = os.getenv("SLOW_QUERY_ENABLED", "true").lower() == "true"
+# Comandos com duração acima deste limite (ms) são registrados
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+# Arquivo JSONL rotativo com as amostras (vazio: apenas em memória)
+SLOW_QUERY_FILE = os.getenv(
+    "SLOW_QUERY_FILE",
+    os.path.join(os.path.dirname(__file__), "..", "logs", "slow_queries.jsonl")
+)
+
+# Profiler sob demanda: ativado por requisição via header X-Profile-Token
+# (gerado em POST /admin/profiles/token) ou por amostragem
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "true").lower() == "true"
+# Fração das requisições perfiladas sem token (0 desliga a amostragem)
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+# Intervalo entre amostras de pilha (ms)
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "1"))
+# Validade do token de profiling (segundos)
+PROFILER_TOKEN_TTL = int(os.getenv("PROFILER_TOKEN_TTL", "600"))
+
+# Header Server-Timing (jwt, validate, db, serialize, total), X-Request-ID
+# e access log estruturado por requisição
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+# Servidor de produção (gunicorn.conf.py)
+# Endereço de escuta
+WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:5000")
+# Quantidade de workers; 0 calcula a partir das CPUs disponíveis (2 x CPUs + 1)
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0"))
+# Worker é reciclado após este número de requisições (0 desliga), com variação aleatória
+WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "10000"))
+WEB_MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "1000"))
+# Tempo máximo (s) de uma requisição e prazo para encerrar workers em reload/parada
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", "30"))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+
+# Compressão de respostas (negociada pelo Accept-Encoding)
+COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+# Corpos menores que este tamanho (bytes) não são comprimidos
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+# Nível do gzip (1 a 9)
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+# Ordem de preferência; zstd e br exigem os pacotes opcionais zstandard e brotli
+COMPRESS_ALGORITHMS = [
+    a.strip() for a in os.getenv("COMPRESS_ALGORITHMS", "zstd,br,gzip").split(",") if a.strip()
+]
+
+# Provider JSON das respostas: "auto" (orjson se instalado), "orjson" ou "stdlib"
+JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto").lower()
+
+# Frontend: JS/CSS com hash do conteúdo na URL e Cache-Control immutable
+STATIC_FINGERPRINT = os.getenv("STATIC_FINGERPRINT", "true").lower() == "true"
+# Validade (segundos) das URLs com hash; padrão de um ano
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "31536000"))
+# Entrega dos arquivos pelo proxy: "" (Flask), "x-sendfile" ou "x-accel-redirect" (nginx)
+STATIC_OFFLOAD = os.getenv("STATIC_OFFLOAD", "").lower()
+# Location interna do nginx usada com X-Accel-Redirect
+STATIC_ACCEL_PREFIX = os.getenv("STATIC_ACCEL_PREFIX", "/_static/")
\ No newline at end of file
@@ -4,7 +4,32 @@ Desabilita rate limiting durante testes automatizados
 """
 
 import pytest
-from api.app import app, limiter
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from api.wsgi import app
+
+# Limiter da aplicação de testes (criado em create_app)
+limiter = app.extensions['esk_limiter']
+
+
+@pytest.fixture(scope='session', autouse=True)
+def prepared_database():
+    """Cria índices e executa o seed uma vez por sessão (a app não toca no banco ao importar)."""
+    runner = app.test_cli_runner()
+    runner.invoke(args=['init-db'])
+    yield
+
+
+@pytest.fixture(scope='session')
+def mongo_available():
+    """Pula o teste quando o MongoDB de MONGO_URI não responde (ver test_repository_conformance)."""
+    probe = MongoClient(app.config['MONGO_URI'], serverSelectionTimeoutMS=500)
+    try:
+        probe.admin.command('ping')
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB indisponível: {type(e).__name__}")
+    finally:
+        probe.close()
 
 
 @pytest.fixture(autouse=True)
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+
+class _Batch:
+    def __init__(self, full, done):
+        self.items = []
+        self.results = None
+        self.full = full
+        self.done = done
+
+
+def _result(batch, slot):
+    result = batch.results[slot]
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def _failed(batch, error):
+    # Falha do lote inteiro (ou líder interrompida) vale para todos os chamadores
+    if batch.results is None:
+        batch.results = [error] * len(batch.items)
+
+
+class GroupCommit:
+    """Agrupa chamadas concorrentes de threads em uma única escrita (group commit).
+
+    A primeira chamada de um lote é a líder: espera até `window_ms` ou até
+    o lote atingir `max_size` itens e executa `write(items)` no próprio
+    thread. As demais aguardam o resultado. `write` devolve uma lista com o
+    resultado de cada item, na ordem recebida, ou a exceção a levantar para
+    aquele chamador.
+
+    A latência adicional de cada chamada é limitada pela janela; sem
+    chamadas concorrentes, a líder grava sozinha ao fim da janela.
+    """
+
+    def __init__(self, write, window_ms=2.0, max_size=256):
+        self.write = write
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._pending = None
+        self.batches = 0
+
+    def submit(self, item):
+        with self._lock:
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = _Batch(threading.Event(), threading.Event())
+            slot = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_size:
+                self._pending = None
+                batch.full.set()
+        if not leader:
+            batch.done.wait()
+            return _result(batch, slot)
+        try:
+            batch.full.wait(self.window)
+            with self._lock:
+                # Chamadas a partir daqui abrem um novo lote
+                if self._pending is batch:
+                    self._pending = None
+            batch.results = self.write(batch.items)
+            self.batches += 1
+        except Exception as e:
+            _failed(batch, e)
+        finally:
+            with self._lock:
+                if self._pending is batch:
+                    self._pending = None
+            _failed(batch, RuntimeError('Lote de escrita interrompido'))
+            batch.done.set()
+        return _result(batch, slot)
+
+
+class AsyncGroupCommit:
+    """GroupCommit para corrotinas de um mesmo event loop (api/asgi.py)."""
+
+    def __init__(self, write, window_ms=2.0, max_size=256):
+        self.write = write
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._pending = None
+        self.batches = 0
+
+    async def submit(self, item):
+        batch = self._pending
+        leader = batch is None
+        if leader:
+            batch = self._pending = _Batch(asyncio.Event(), asyncio.Event())
+        slot = len(batch.items)
+        batch.items.append(item)
+        if len(batch.items) >= self.max_size:
+            self._pending = None
+            batch.full.set()
+        if not leader:
+            await batch.done.wait()
+            return _result(batch, slot)
+        try:
+            try:
+                await asyncio.wait_for(batch.full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            if self._pending is batch:
+                self._pending = None
+            batch.results = await self.write(batch.items)
+            self.batches += 1
+        except Exception as e:
+            _failed(batch, e)
+        finally:
+            # Líder cancelada (cliente desconectou): os demais não ficam esperando
+            if self._pending is batch:
+                self._pending = None
+            _failed(batch, RuntimeError('Lote de escrita interrompido'))
+            batch.done.set()
+        return _result(batch, slot)
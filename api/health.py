@@ -0,0 +1,60 @@
+import logging
+import sqlite3
+import threading
+import time
+
+import pymongo
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+def mongo_ping(client, timeout):
+    """Ping no MongoDB limitado a `timeout` segundos."""
+    def ping():
+        with pymongo.timeout(timeout):
+            client.admin.command('ping')
+    return ping
+
+
+class CachedPing:
+    """Ping no banco com resultado em cache por `ttl` segundos.
+
+    Probes de vários orquestradores/balanceadores chegam em paralelo: apenas
+    um thread executa o ping por vez, e os demais recebem o último resultado.
+    """
+
+    def __init__(self, ttl=5.0, timeout=2.0):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._result = None
+        self._checked_at = 0.0
+
+    def _ping(self, ping):
+        start = time.perf_counter()
+        try:
+            ping()
+        except (PyMongoError, sqlite3.Error) as e:
+            logger.warning(f"Readiness: ping no banco falhou: {e}")
+            return {'ok': False, 'error': type(e).__name__}
+        return {'ok': True, 'latency_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+    def check(self, ping):
+        """Executa `ping` (callable) se o cache expirou; devolve ({'ok': bool, ...}, idade em segundos)."""
+        now = time.monotonic()
+        if self._result is None or now - self._checked_at >= self.ttl:
+            # Sem resultado ainda: aguarda o ping em andamento
+            if self._lock.acquire(blocking=self._result is None):
+                try:
+                    if self._result is None or time.monotonic() - self._checked_at >= self.ttl:
+                        self._result = self._ping(ping)
+                        self._checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return self._result, round(time.monotonic() - self._checked_at, 3)
+
+    def reset(self):
+        with self._lock:
+            self._result = None
+            self._checked_at = 0.0
@@ -0,0 +1,89 @@
+import json
+from datetime import date, datetime, timezone
+
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+
+# Dependência opcional: sem orjson, usa o módulo json da biblioteca padrão
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def isoformat(value):
+    """Data/hora em ISO 8601. Datas sem fuso (como as do MongoDB) são UTC ("Z")."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    text = value.isoformat()
+    return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return isoformat(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+
+class StdlibJSONProvider(JSONProvider):
+    """Provider JSON com a biblioteca padrão.
+
+    Mesmo formato de OrjsonJSONProvider: JSON compacto em UTF-8, ObjectId
+    como string hexadecimal e datas em ISO 8601.
+    """
+
+    name = 'stdlib'
+
+    def dumps_bytes(self, obj):
+        return self.dumps(obj).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+    def loads(self, s, **kwargs):
+        return json.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype='application/json')
+
+
+class OrjsonJSONProvider(StdlibJSONProvider):
+    """Provider JSON com orjson: datetime serializado nativamente, em C."""
+
+    name = 'orjson'
+    OPTIONS = (orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=_default, option=self.OPTIONS)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+PROVIDERS = {'stdlib': StdlibJSONProvider}
+if orjson is not None:
+    PROVIDERS['orjson'] = OrjsonJSONProvider
+
+
+def get_provider_class(name='auto'):
+    """Classe do provider: 'orjson', 'stdlib' ou 'auto' (orjson se instalado)."""
+    if name == 'auto':
+        return PROVIDERS.get('orjson', StdlibJSONProvider)
+    if name not in PROVIDERS:
+        raise ValueError(f"Provider JSON indisponível: {name}")
+    return PROVIDERS[name]
+
+
+def init_app(app):
+    """Registra o provider em app.json (chamar após mongo.init_app, que define o seu)."""
+    app.json = get_provider_class(app.config['JSON_PROVIDER'])(app)
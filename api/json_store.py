@@ -0,0 +1,275 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Compacta quando o log passa deste número de operações
+COMPACT_EVERY = 1000
+
+
+class _FileLock:
+    """Lock exclusivo entre processos (arquivo .lock) e reentrante entre threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            self._file = open(self.path, 'a+b')
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+def _signature(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class JsonStore:
+    """Coleção em arquivo JSON com índices em memória e log de escritas.
+
+    - `arquivo.json`: snapshot no formato de sempre ({id: registro});
+    - `arquivo.json.log`: operações posteriores ao snapshot, uma por linha
+      ({"op": "set", "id": ..., "data": {...}} ou {"op": "del", "id": ...});
+    - `arquivo.json.lock`: lock exclusivo das escritas entre processos.
+
+    Leituras consultam o dicionário em memória (O(1) por id ou por campo
+    indexado); antes de cada uma, dois stat() detectam escritas de outros
+    processos, e apenas as linhas novas do log são aplicadas. Escritas
+    acrescentam uma linha ao log (O(registro)); a cada `compact_every`
+    operações o snapshot é regravado com os.replace e o log recomeça vazio.
+
+    Os registros em memória nunca são alterados no lugar (cada escrita grava
+    um dicionário novo): all() devolve os próprios registros, sem cópia, e
+    quem o chama não deve modificá-los; get() e find_one() devolvem cópias.
+    """
+
+    def __init__(self, path, indexes=(), compact_every=COMPACT_EVERY):
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.name + '.log')
+        self.index_fields = tuple(indexes)
+        self.compact_every = compact_every
+        self._lock = _FileLock(self.path.with_name(self.path.name + '.lock'))
+        self._records = {}
+        self._indexes = {field: {} for field in self.index_fields}
+        self._snapshot_signature = None
+        self._log_signature = None
+        self._log_offset = 0
+        self._log_entries = 0
+        self._loaded = False
+
+    # ------------------------------------------------------------------------
+    # Estado em memória
+    # ------------------------------------------------------------------------
+
+    def _index_add(self, id, record):
+        for field in self.index_fields:
+            value = record.get(field)
+            if value is not None:
+                self._indexes[field].setdefault(value, set()).add(id)
+
+    def _index_remove(self, id, record):
+        for field in self.index_fields:
+            ids = self._indexes[field].get(record.get(field))
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del self._indexes[field][record.get(field)]
+
+    def _apply(self, entry):
+        id = entry['id']
+        old = self._records.pop(id, None) if entry['op'] == 'del' else self._records.get(id)
+        if old is not None:
+            self._index_remove(id, old)
+        if entry['op'] == 'set':
+            self._records[id] = entry['data']
+            self._index_add(id, entry['data'])
+
+    def _load_snapshot(self):
+        self._records = {}
+        self._indexes = {field: {} for field in self.index_fields}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro ao decodificar JSON de {self.path.name}: {e}")
+            data = {}
+        for key, value in data.items():
+            if not value:
+                logger.warning(f"Registro inválido encontrado para a chave {key}")
+                continue
+            # Registros gravados pela API já trazem o id; só os legados são completados
+            record = value if 'id' in value else {**value, 'id': key}
+            id = record['id']
+            self._records[id] = record
+            self._index_add(id, record)
+        self._log_offset = 0
+        self._log_entries = 0
+
+    def _read_log(self):
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return
+        # Uma linha sem '\n' final ainda está sendo escrita por outro processo
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+                self._log_entries += 1
+        self._log_offset += end
+
+    def _refresh(self):
+        snapshot_signature = _signature(self.path)
+        log_signature = _signature(self.log_path)
+        if not self._loaded or snapshot_signature != self._snapshot_signature or (
+                log_signature is not None and self._log_signature is not None
+                and log_signature[0] != self._log_signature[0]):
+            # Snapshot novo (compactação) ou log recriado: recarrega tudo
+            self._load_snapshot()
+            self._read_log()
+            self._loaded = True
+        elif log_signature != self._log_signature:
+            self._read_log()
+        self._snapshot_signature = snapshot_signature
+        self._log_signature = log_signature
+
+    # ------------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------------
+
+    def get(self, id):
+        with self._lock._thread_lock:
+            self._refresh()
+            record = self._records.get(id)
+            return dict(record) if record is not None else None
+
+    def find(self, field, value):
+        """Ids dos registros com `field == value` (campo indexado)."""
+        with self._lock._thread_lock:
+            self._refresh()
+            return set(self._indexes[field].get(value, ()))
+
+    def find_one(self, field, value):
+        with self._lock._thread_lock:
+            self._refresh()
+            ids = self._indexes[field].get(value)
+            if not ids:
+                return None
+            # Com duplicatas legadas, o primeiro registro inserido
+            id = next(id for id in self._records if id in ids) if len(ids) > 1 else next(iter(ids))
+            return dict(self._records[id])
+
+    def all(self):
+        with self._lock._thread_lock:
+            self._refresh()
+            return dict(self._records)
+
+    def __len__(self):
+        with self._lock._thread_lock:
+            self._refresh()
+            return len(self._records)
+
+    # ------------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------------
+
+    @contextmanager
+    def locked(self):
+        """Lock de escrita com o estado já atualizado: verificações e gravações atômicas."""
+        with self._lock:
+            self._refresh()
+            yield self
+
+    def _append(self, entry):
+        with self._lock:
+            self._refresh()
+            line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, 'ab') as f:
+                f.write(line)
+            self._apply(entry)
+            self._log_entries += 1
+            self._log_offset += len(line)
+            self._log_signature = _signature(self.log_path)
+            if self._log_entries >= self.compact_every:
+                self.compact()
+
+    def put(self, id, record):
+        record = {**record, 'id': id}
+        self._append({'op': 'set', 'id': id, 'data': record})
+        return dict(record)
+
+    def delete(self, id):
+        with self._lock:
+            self._refresh()
+            if id not in self._records:
+                return False
+            self._append({'op': 'del', 'id': id})
+            return True
+
+    def compact(self):
+        """Regrava o snapshot com o estado atual e recomeça o log (atômico)."""
+        with self._lock:
+            self._refresh()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._records, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            # Log novo (outro inode): leitores com o offset antigo recarregam tudo.
+            # Uma queda entre os dois replace apenas reaplica operações idempotentes.
+            empty = self.log_path.with_name(self.log_path.name + '.tmp')
+            empty.write_bytes(b'')
+            os.replace(empty, self.log_path)
+            logger.info(f"{self.path.name} compactado: {len(self._records)} registro(s), "
+                        f"{self._log_entries} operação(ões) do log")
+            self._snapshot_signature = _signature(self.path)
+            self._log_signature = _signature(self.log_path)
+            self._log_offset = 0
+            self._log_entries = 0
@@ -0,0 +1,154 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import re
+from datetime import datetime, timezone
+
+from . import config
+
+
+# ============================================================================
+# Formatters com sanitização de credenciais
+# ============================================================================
+
+class SanitizedFormatter(logging.Formatter):
+    """Formatter que mascara tokens JWT e credenciais sensíveis nos logs."""
+
+    # Uma única regex (uma passada): header Authorization ou token JWT ("eyJ...")
+    SENSITIVE_PATTERN = re.compile(
+        r'(?P<auth>Authorization["\']?\s*:\s*["\']?Bearer\s+[^\s"\']+)'
+        r'|(?P<jwt>eyJ[A-Za-z0-9_-]+)'
+    )
+
+    @staticmethod
+    def _mask(match):
+        if match.group('auth'):
+            return 'Authorization: Bearer [REDACTED]'
+        return match.group(0)[:10] + '...[REDACTED]'
+
+    @classmethod
+    def sanitize(cls, text):
+        return cls.SENSITIVE_PATTERN.sub(cls._mask, text)
+
+    def format(self, record):
+        return self.sanitize(super().format(record))
+
+
+# Atributos padrão de LogRecord; o restante (passado via `extra`) vai para o JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(SanitizedFormatter):
+    """Formata cada registro como um objeto JSON por linha."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': self.sanitize(record.getMessage()),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = self.sanitize(record.exc_text)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# ============================================================================
+# Pipeline assíncrono: QueueHandler no thread da requisição, escrita no listener
+# ============================================================================
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler com fila limitada: descarta registros quando a fila enche.
+
+    No thread de origem só a mensagem é interpolada (os argumentos podem
+    referenciar objetos da requisição); sanitização, formatação e escrita
+    ocorrem no thread do QueueListener, e apenas para registros emitidos.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks não podem atravessar o thread: vira texto aqui
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler = None
+_listener = None
+
+
+def _build_formatter():
+    if config.LOG_FORMAT == 'json':
+        return JSONFormatter()
+    return SanitizedFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def configure_logging():
+    """Liga os loggers 'api' e 'werkzeug' ao pipeline assíncrono (idempotente)."""
+    global _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=config.LOG_QUEUE_SIZE))
+    for name in ('api', 'werkzeug'):
+        target = logging.getLogger(name)
+        target.setLevel(config.LOG_LEVEL)
+        target.handlers.clear()
+        target.addHandler(_queue_handler)
+    start_listener()
+    atexit.register(stop_listener)
+    return _queue_handler
+
+
+def start_listener():
+    """Inicia o thread que formata e escreve os registros enfileirados."""
+    global _listener
+    if _listener is not None or _queue_handler is None:
+        return
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(_build_formatter())
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def restart_listener_after_fork():
+    """Recria fila e listener no processo filho após um fork (workers do gunicorn).
+
+    O thread do listener não existe no filho e o lock da fila herdada pode
+    ter sido copiado em uso; registros ainda não escritos pelo pai são descartados.
+    """
+    global _listener
+    if _queue_handler is None:
+        return
+    _queue_handler.queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    _listener = None
+    start_listener()
+
+
+def stop_listener():
+    """Esvazia a fila e encerra o listener (chamado automaticamente na saída)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
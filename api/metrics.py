@@ -0,0 +1,296 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from flask import g, request
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Limites dos buckets de latência (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites dos buckets de comandos MongoDB por requisição
+MONGO_CALL_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# ============================================================================
+# Registro de métricas (formato de exposição Prometheus)
+# ============================================================================
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels):
+        # Leitura sem lock no caminho comum; o lock só protege a criação
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labels, self._new_child())
+        return child
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for labels, child in sorted(self._children.items()):
+            lines.extend(self._render_child(labels, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, labels=(), amount=1):
+        child = self._child(labels)
+        with child.lock:
+            child.value += amount
+
+    def _render_child(self, labels, child):
+        yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(child.value)}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, labels=(), value=0):
+        child = self._child(labels)
+        with child.lock:
+            child.value = value
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'sum', 'count', 'lock')
+
+    def __init__(self, size):
+        self.buckets = [0] * size
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def _new_child(self):
+        return _HistogramValue(len(self.buckets))
+
+    def observe(self, labels, value):
+        child = self._child(labels)
+        # Busca do bucket fora do lock; dentro dele, apenas somas
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with child.lock:
+            child.buckets[index] += 1
+            child.sum += value
+            child.count += 1
+
+    def _render_child(self, labels, child):
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.buckets):
+            cumulative += count
+            le = (('le', _format_value(bound)),)
+            yield f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}'
+        label_text = _format_labels(self.labelnames, labels)
+        yield f'{self.name}_sum{label_text} {_format_value(child.sum)}'
+        yield f'{self.name}_count{label_text} {child.count}'
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs):
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    'esk_http_requests_total', 'Requisições HTTP atendidas', ('route', 'method', 'status'))
+http_latency = registry.histogram(
+    'esk_http_request_duration_seconds', 'Latência das requisições HTTP', ('route', 'method'))
+http_in_flight = registry.gauge(
+    'esk_http_requests_in_flight', 'Requisições HTTP em andamento', ('route',))
+mongo_commands = registry.counter(
+    'esk_mongo_commands_total', 'Comandos enviados ao MongoDB', ('command', 'status'))
+mongo_latency = registry.histogram(
+    'esk_mongo_command_duration_seconds', 'Duração dos comandos MongoDB', ('command',))
+mongo_calls_per_request = registry.histogram(
+    'esk_mongo_commands_per_request', 'Comandos MongoDB por requisição HTTP', ('route',),
+    buckets=MONGO_CALL_BUCKETS)
+
+
+# ============================================================================
+# Comandos MongoDB (pymongo CommandListener)
+# ============================================================================
+
+# Contador de comandos da requisição atual (None fora de requisições)
+_request_mongo_calls = ContextVar('request_mongo_calls', default=None)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Conta e cronometra comandos MongoDB, atribuindo-os à requisição atual.
+
+    O driver síncrono publica os eventos no thread que executou o comando,
+    então o ContextVar identifica a requisição de origem.
+    """
+
+    def started(self, event):
+        calls = _request_mongo_calls.get()
+        if calls is not None:
+            calls[0] += 1
+
+    def succeeded(self, event):
+        mongo_commands.inc((event.command_name, 'ok'))
+        mongo_latency.observe((event.command_name,), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        mongo_commands.inc((event.command_name, 'error'))
+        mongo_latency.observe((event.command_name,), event.duration_micros / 1e6)
+
+
+command_metrics = MongoCommandMetrics()
+
+
+# ============================================================================
+# Métricas por requisição (Flask e rotas assíncronas de api/asgi.py)
+# ============================================================================
+
+def begin_request(route):
+    """Início de uma requisição na rota `route`; o token retornado vai para end_request."""
+    http_in_flight.inc((route,))
+    return _request_mongo_calls.set([0])
+
+
+def end_request(token, route, method, status, elapsed):
+    """Registra contagem, latência e comandos MongoDB da requisição iniciada com begin_request."""
+    http_in_flight.dec((route,))
+    http_requests.inc((route, method, str(status)))
+    http_latency.observe((route, method), elapsed)
+    mongo_calls_per_request.observe((route,), _request_mongo_calls.get()[0])
+    _request_mongo_calls.reset(token)
+
+
+# ============================================================================
+# Integração com o Flask
+# ============================================================================
+
+def _route():
+    # A regra da rota (ex.: /suppliers/<id>) mantém a cardinalidade baixa
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_route = _route()
+    g.metrics_mongo_token = begin_request(g.metrics_route)
+
+
+def _record_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    end_request(g.pop('metrics_mongo_token'), g.pop('metrics_route'), request.method,
+                g.pop('metrics_status', 500), elapsed)
+
+
+def init_app(app):
+    """Registra a coleta de métricas por rota na aplicação."""
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+
+
+# ============================================================================
+# Servidor dedicado (METRICS_BIND), sem autenticação, para a rede interna
+# ============================================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug('Metrics: ' + format, *args)
+
+
+def start_metrics_server(bind):
+    """Expõe /metrics em 'host:porta' num thread daemon; retorna o servidor."""
+    host, _, port = bind.rpartition(':')
+    server = ThreadingHTTPServer((host or '127.0.0.1', int(port)), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    logger.info(f"Servidor de métricas ouvindo em {host or '127.0.0.1'}:{server.server_address[1]}")
+    return server
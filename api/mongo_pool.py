@@ -0,0 +1,160 @@
+import importlib.util
+import logging
+import threading
+import time
+
+import pymongo
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Compressores do protocolo e o pacote opcional de que cada um depende
+COMPRESSOR_PACKAGES = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': None}
+
+# Opções do MongoClient definidas pela configuração (None = padrão do driver/URI)
+POOL_OPTIONS = {
+    'maxPoolSize': 'MONGO_MAX_POOL_SIZE',
+    'minPoolSize': 'MONGO_MIN_POOL_SIZE',
+    'maxIdleTimeMS': 'MONGO_MAX_IDLE_TIME_MS',
+    'maxConnecting': 'MONGO_MAX_CONNECTING',
+    'waitQueueTimeoutMS': 'MONGO_WAIT_QUEUE_TIMEOUT_MS',
+    'connectTimeoutMS': 'MONGO_CONNECT_TIMEOUT_MS',
+    'serverSelectionTimeoutMS': 'MONGO_SERVER_SELECTION_TIMEOUT_MS',
+}
+
+pool_checkout_wait = metrics.registry.histogram(
+    'esk_mongo_pool_checkout_wait_seconds', 'Espera por uma conexão livre do pool MongoDB', ('address',))
+pool_checkout_failures = metrics.registry.counter(
+    'esk_mongo_pool_checkout_failures_total', 'Falhas ao obter conexão do pool MongoDB', ('address', 'reason'))
+pool_connections = metrics.registry.gauge(
+    'esk_mongo_pool_connections', 'Conexões do pool MongoDB por estado', ('address', 'state'))
+
+
+def available_compressors(names):
+    """Filtra os compressores cujo pacote opcional não está instalado."""
+    available = []
+    for name in names:
+        if name not in COMPRESSOR_PACKAGES:
+            raise ValueError(f"Compressor MongoDB desconhecido: {name}")
+        package = COMPRESSOR_PACKAGES[name]
+        if package is None or importlib.util.find_spec(package) is not None:
+            available.append(name)
+    return available
+
+
+def client_options(config):
+    """Opções de pool e compressão do MongoClient a partir da configuração.
+
+    Valores None são omitidos: valem os da MONGO_URI ou os padrões do driver.
+    """
+    options = {option: config[key] for option, key in POOL_OPTIONS.items() if config[key] is not None}
+    compressors = available_compressors(config['MONGO_COMPRESSORS'])
+    if compressors:
+        options['compressors'] = compressors
+        if 'zlib' in compressors:
+            options['zlibCompressionLevel'] = config['MONGO_ZLIB_LEVEL']
+    return options
+
+
+def _address(address):
+    return f'{address[0]}:{address[1]}'
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Publica o tempo de espera no checkout e as conexões abertas/em uso.
+
+    O tempo de espera vem do próprio driver (ConnectionCheckedOutEvent.duration),
+    e inclui o estabelecimento de uma conexão nova quando o pool está vazio.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open = {}
+
+    def open_connections(self, address=None):
+        with self._lock:
+            if address is not None:
+                return self._open.get(_address(address), 0)
+            return sum(self._open.values())
+
+    def reset(self):
+        """Zera as contagens (pools do processo mestre, descartados após o fork)."""
+        with self._lock:
+            for address in self._open:
+                pool_connections.set((address, 'open'), 0)
+                pool_connections.set((address, 'in_use'), 0)
+            self._open.clear()
+
+    def _count_open(self, event, amount):
+        address = _address(event.address)
+        with self._lock:
+            self._open[address] = self._open.get(address, 0) + amount
+        pool_connections.inc((address, 'open'), amount)
+
+    def connection_created(self, event):
+        self._count_open(event, 1)
+
+    def connection_closed(self, event):
+        self._count_open(event, -1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        address = _address(event.address)
+        pool_connections.inc((address, 'in_use'))
+        if event.duration is not None:
+            pool_checkout_wait.observe((address,), event.duration)
+
+    def connection_check_out_failed(self, event):
+        address = _address(event.address)
+        pool_checkout_failures.inc((address, event.reason))
+        if event.duration is not None:
+            pool_checkout_wait.observe((address,), event.duration)
+
+    def connection_checked_in(self, event):
+        pool_connections.dec((_address(event.address), 'in_use'))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+pool_monitor = PoolMonitor()
+
+
+def warm_up(client, min_pool_size, timeout):
+    """Abre as conexões de minPoolSize antes da primeira requisição.
+
+    O ping faz a descoberta do servidor e abre a primeira conexão; as demais
+    são criadas em segundo plano pelo driver (manutenção de minPoolSize), e
+    aqui apenas aguardamos, até `timeout` segundos. Retorna True se o pool
+    ficou pronto.
+    """
+    deadline = time.monotonic() + timeout
+    start = time.perf_counter()
+    try:
+        with pymongo.timeout(timeout):
+            client.admin.command('ping')
+    except PyMongoError as e:
+        logger.warning(f"Aquecimento do pool MongoDB falhou: {e}")
+        return False
+    while pool_monitor.open_connections() < min_pool_size and time.monotonic() < deadline:
+        time.sleep(0.05)
+    opened = pool_monitor.open_connections()
+    logger.info(f"Pool MongoDB aquecido: {opened} conexão(ões) em {(time.perf_counter() - start) * 1000:.0f} ms")
+    return opened >= min_pool_size
@@ -0,0 +1,196 @@
+import hashlib
+import hmac
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Token'
+# Limite de pilhas distintas guardadas por rota
+MAX_STACKS_PER_ROUTE = 5000
+
+
+# ============================================================================
+# Token assinado (HMAC) que habilita o profiling de uma requisição
+# ============================================================================
+
+def _signature(secret, expires):
+    return hmac.new(secret.encode('utf-8'), str(expires).encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def create_token(secret, ttl_seconds):
+    """Gera o valor do header X-Profile-Token válido por ttl_seconds."""
+    expires = int(time.time()) + int(ttl_seconds)
+    return f"{expires}.{_signature(secret, expires)}", expires
+
+
+def verify_token(secret, token):
+    expires, _, signature = token.partition('.')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(secret, int(expires)))
+
+
+# ============================================================================
+# Amostrador de pilha
+# ============================================================================
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class _StackSampler(threading.Thread):
+    """Captura periodicamente a pilha do thread da requisição.
+
+    As pilhas são cortadas no frame do wrapper, para conter apenas a
+    execução da view, e acumuladas no formato "collapsed" (a;b;c N).
+    """
+
+    def __init__(self, thread_id, root_frame, interval):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and frame is not self.root_frame:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ============================================================================
+# Armazenamento agregado por rota
+# ============================================================================
+
+class ProfileStore:
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def add(self, route, stacks, elapsed, interval):
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                'requests': 0, 'elapsed': 0.0, 'interval': interval, 'stacks': Counter()})
+            entry['requests'] += 1
+            entry['elapsed'] += elapsed
+            for stack, count in stacks.items():
+                if stack in entry['stacks'] or len(entry['stacks']) < MAX_STACKS_PER_ROUTE:
+                    entry['stacks'][stack] += count
+
+    def collapsed(self, route=None):
+        """Pilhas no formato collapsed (flamegraph.pl, speedscope)."""
+        with self._lock:
+            routes = {r: Counter(e['stacks']) for r, e in self._routes.items() if route in (None, r)}
+        lines = []
+        for name, stacks in sorted(routes.items()):
+            for stack, count in stacks.most_common():
+                lines.append(f"{name};{stack} {count}")
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def report(self, route=None, limit=20):
+        """Funções com mais amostras por rota (self = no topo da pilha)."""
+        with self._lock:
+            routes = {r: dict(e, stacks=Counter(e['stacks']))
+                      for r, e in self._routes.items() if route in (None, r)}
+        report = {}
+        for name, entry in routes.items():
+            own, total = Counter(), Counter()
+            for stack, count in entry['stacks'].items():
+                frames = stack.split(';')
+                own[frames[-1]] += count
+                for frame in set(frames):
+                    total[frame] += count
+            samples = sum(entry['stacks'].values())
+            interval_ms = entry['interval'] * 1000
+
+            def top(counter):
+                return [{
+                    'function': function,
+                    'samples': count,
+                    'percent': round(100 * count / samples, 1) if samples else 0.0,
+                    'estimated_ms': round(count * interval_ms, 1),
+                } for function, count in counter.most_common(limit)]
+
+            report[name] = {
+                'requests': entry['requests'],
+                'avg_ms': round(entry['elapsed'] * 1000 / entry['requests'], 2),
+                'samples': samples,
+                'top_self': top(own),
+                'top_total': top(total),
+            }
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+profiles = ProfileStore()
+
+
+# ============================================================================
+# Integração com o Flask
+# ============================================================================
+
+def _should_profile():
+    token = request.headers.get(PROFILE_HEADER)
+    if token:
+        return verify_token(current_app.config['PROFILER_SECRET'], token)
+    rate = current_app.config['PROFILER_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def _profile(view, args, kwargs):
+    interval = current_app.config['PROFILER_INTERVAL_MS'] / 1000
+    sampler = _StackSampler(threading.get_ident(), sys._getframe(), interval)
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        return view(*args, **kwargs)
+    finally:
+        sampler.stop()
+        route = request.url_rule.rule if request.url_rule else request.path
+        profiles.add(f"{request.method} {route}", sampler.stacks, time.perf_counter() - start, interval)
+
+
+def _wrap(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _should_profile():
+            return view(*args, **kwargs)
+        return _profile(view, args, kwargs)
+    return wrapper
+
+
+def init_app(app):
+    """Envolve as views registradas com o amostrador (chamar após registrar as rotas).
+
+    Com PROFILER_ENABLED desligado nada é envolvido: as views não têm custo extra.
+    """
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+    if not app.config.get('PROFILER_SECRET'):
+        app.config['PROFILER_SECRET'] = app.config['JWT_SECRET_KEY']
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint != 'static':
+            app.view_functions[endpoint] = _wrap(view)
+    logger.info("Profiler de requisições habilitado")
@@ -0,0 +1,180 @@
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from bson.timestamp import Timestamp
+from flask import request
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+# Menor maxStalenessSeconds aceito pelo driver (-1 = sem limite)
+MIN_MAX_STALENESS = 90
+
+# Token "segundos.incremento" do operationTime da última escrita do cliente
+READ_AFTER_HEADER = 'X-Read-After'
+READ_AFTER_COOKIE = 'esk_read_after'
+READ_AFTER_MAX_AGE = 600
+
+# Topologias em que o servidor aceita readConcern afterClusterTime
+_CAUSAL_TOPOLOGIES = ('ReplicaSetWithPrimary', 'ReplicaSetNoPrimary', 'Sharded')
+
+# operationTime a aguardar nas leituras e da última escrita (por requisição)
+_read_after = ContextVar('read_after', default=None)
+_last_write = ContextVar('last_write', default=None)
+
+
+def list_read_preference(name, max_staleness=-1):
+    """Read preference das listagens/buscas; None para 'primary' (padrão da collection)."""
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Read preference inválida: {name}")
+    if name == 'primary':
+        return None
+    if max_staleness != -1 and max_staleness < MIN_MAX_STALENESS:
+        raise ValueError(f"MONGO_MAX_STALENESS_SECONDS deve ser -1 ou >= {MIN_MAX_STALENESS}")
+    return READ_PREFERENCES[name](max_staleness=max_staleness)
+
+
+def encode_operation_time(timestamp):
+    return f'{timestamp.time}.{timestamp.inc}'
+
+
+def decode_operation_time(text):
+    """Converte o token do cliente em Timestamp; None se ausente ou inválido."""
+    seconds, _, inc = (text or '').partition('.')
+    if not (seconds.isdigit() and inc.isdigit()):
+        return None
+    try:
+        return Timestamp(int(seconds), int(inc))
+    except (ValueError, OverflowError):
+        return None
+
+
+def read_after():
+    """operationTime que as leituras desta requisição devem enxergar (ou None)."""
+    return _read_after.get()
+
+
+def record_write(session):
+    """Guarda o operationTime de uma escrita para devolvê-lo ao cliente."""
+    record_operation_time(session.operation_time)
+
+
+def record_operation_time(operation_time):
+    """record_write a partir do operationTime (escritas feitas em outra requisição, no group commit)."""
+    if operation_time is not None:
+        last = _last_write.get()
+        if last is None or operation_time > last:
+            _last_write.set(operation_time)
+
+
+def begin_request(token_text):
+    """Inicia o contexto da requisição a partir do token recebido; devolve os tokens do ContextVar."""
+    return _read_after.set(decode_operation_time(token_text)), _last_write.set(None)
+
+
+def end_request(tokens):
+    """Encerra o contexto; devolve o operationTime da última escrita (ou None)."""
+    last_write = _last_write.get()
+    _read_after.reset(tokens[0])
+    _last_write.reset(tokens[1])
+    return last_write
+
+
+def supports_causal_reads(client):
+    # Antes da primeira operação a topologia é Unknown: a leitura segue sem sessão
+    return client.topology_description.topology_type_name in _CAUSAL_TOPOLOGIES
+
+
+@contextmanager
+def causal_session(client, after):
+    """Sessão causal avançada até `after`, ou None se não houver o que aguardar.
+
+    Com ela, o driver envia readConcern afterClusterTime e o secundário só
+    responde depois de aplicar a escrita correspondente.
+    """
+    if after is None or not supports_causal_reads(client):
+        yield None
+        return
+    with client.start_session(causal_consistency=True) as session:
+        session.advance_operation_time(after)
+        yield session
+
+
+@contextmanager
+def write_session(client, enabled=True):
+    """Sessão para escritas, registrando o operationTime ao final (None se desativada)."""
+    if not enabled:
+        yield None
+        return
+    with client.start_session(causal_consistency=True) as session:
+        yield session
+        record_write(session)
+
+
+@asynccontextmanager
+async def async_causal_session(client, after):
+    """Versão de causal_session para o AsyncMongoClient (api/asgi.py)."""
+    if after is None or not supports_causal_reads(client):
+        yield None
+        return
+    async with client.start_session(causal_consistency=True) as session:
+        session.advance_operation_time(after)
+        yield session
+
+
+@asynccontextmanager
+async def async_write_session(client, enabled=True):
+    """Versão de write_session para o AsyncMongoClient (api/asgi.py)."""
+    if not enabled:
+        yield None
+        return
+    async with client.start_session(causal_consistency=True) as session:
+        yield session
+        record_write(session)
+
+
+# ============================================================================
+# Integração com o Flask
+# ============================================================================
+
+def _begin():
+    request.environ['esk.read_routing'] = begin_request(
+        request.headers.get(READ_AFTER_HEADER) or request.cookies.get(READ_AFTER_COOKIE))
+
+
+def _finish(response):
+    tokens = request.environ.pop('esk.read_routing', None)
+    if tokens is None:
+        return response
+    last_write = end_request(tokens)
+    if last_write is not None:
+        token = encode_operation_time(last_write)
+        response.headers[READ_AFTER_HEADER] = token
+        response.set_cookie(READ_AFTER_COOKIE, token, max_age=READ_AFTER_MAX_AGE,
+                            httponly=True, samesite='Lax', secure=request.is_secure)
+    return response
+
+
+def init_app(app):
+    """Listagens com a read preference configurada e leituras causais após escritas.
+
+    A resposta de uma escrita leva o operationTime (header X-Read-After e
+    cookie); as listagens seguintes do mesmo cliente usam uma sessão causal
+    até ele, e não deixam de ver a própria escrita num secundário atrasado.
+    """
+    preference = list_read_preference(app.config['MONGO_LIST_READ_PREFERENCE'],
+                                      app.config['MONGO_MAX_STALENESS_SECONDS'])
+    app.extensions['esk_list_read_preference'] = preference
+    if preference is None:
+        return
+    logger.info(f"Listagens com read preference {preference}")
+    app.before_request(_begin)
+    app.after_request(_finish)
@@ -0,0 +1,202 @@
+"""Interface comum dos repositórios de fornecedores e usuários.
+
+Os três backends herdam destas classes: JSON (supplier.py, user.py),
+MongoDB (supplier_mongo.py, user_mongo.py) e SQLite (supplier_sqlite.py,
+user_sqlite.py). As regras abaixo valem para todos e são verificadas por
+api/test_repository_conformance.py:
+
+- fornecedores são gravados com cnpj em maiúsculas só com letras e dígitos,
+  phone só com dígitos e email sem espaços nas pontas (utils.normalize_supplier);
+- usuários são gravados com username e email em minúsculas
+  (utils.normalize_user); get_by_username/get_by_email/authenticate
+  normalizam o valor procurado;
+- CNPJ duplicado gera ValueError('CNPJ já cadastrado') na criação e na
+  atualização; username/email duplicados geram ValueError com as mensagens
+  de DUPLICATE_MESSAGES;
+- update/get de id inexistente (ou excluído) devolvem None e delete devolve
+  False;
+- fornecedores têm exclusão lógica no MongoDB e no SQLite: delete marca
+  deleted_at, as leituras e o índice único de CNPJ consideram apenas os
+  ativos e archive() move os excluídos há mais tempo que a retenção para o
+  arquivo, consultado por get_archive(). O backend JSON remove fisicamente;
+- leituras em lote (get_many) e páginas (get_page) aceitam `fields`, a
+  lista de campos a devolver ('id' sempre incluído); o hash de senha
+  nunca sai dessas leituras;
+- a normalização acontece só na escrita: os registros são gravados já na
+  forma devolvida pela API e as leituras não os transformam. migrate()
+  converte, uma única vez, registros gravados em formatos anteriores.
+
+As implementações padrão de get_many, get_page e create_many usam as
+operações unitárias; os backends as substituem por consultas em lote.
+"""
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from .utils import DEFAULT_PAGE_SIZE, page_limit, paginate, project
+
+# Mensagens de duplicidade por campo com índice único
+DUPLICATE_MESSAGES = {
+    'username': 'Nome de usuário já cadastrado',
+    'email': 'Email já cadastrado',
+}
+DUPLICATE_CNPJ_MESSAGE = 'CNPJ já cadastrado'
+
+# Fornecedores excluídos há mais tempo que isto vão para o arquivo
+DEFAULT_ARCHIVE_RETENTION = timedelta(days=90)
+
+# Campos nunca devolvidos em listagens de usuários
+PRIVATE_USER_FIELDS = ('password',)
+# Campos da busca por prefixo da listagem de usuários: gravados em minúsculas
+# e com índice único, a busca é um prefixo exato sobre os índices (role tem
+# filtro próprio, exato)
+SEARCH_FIELDS = ('username', 'email')
+
+
+class SupplierRepository(ABC):
+    """Operações de fornecedores comuns a todos os backends."""
+
+    def ensure_indexes(self):
+        pass
+
+    def migrate(self):
+        """Regrava registros antigos na forma canônica; retorna quantos foram alterados."""
+        return 0
+
+    def pending_migration(self):
+        """True se há registros sem 'id', que as leituras não aceitam até o migrate()."""
+        return False
+
+    @abstractmethod
+    def get_all(self, after=None):
+        """Todos os fornecedores ({id: fornecedor}); 'after' é o token de leitura causal."""
+
+    @abstractmethod
+    def get(self, id):
+        pass
+
+    @abstractmethod
+    def create(self, data):
+        pass
+
+    @abstractmethod
+    def update(self, id, data):
+        pass
+
+    @abstractmethod
+    def delete(self, id):
+        pass
+
+    def get_many(self, ids, fields=None):
+        """Leitura em lote: {id: fornecedor} dos ids existentes (os demais são omitidos)."""
+        found = {}
+        for id in ids:
+            supplier = self.get(id)
+            if supplier is not None:
+                found[supplier['id']] = project(supplier, fields)
+        return found
+
+    def get_page(self, limit=DEFAULT_PAGE_SIZE, after=None, fields=None, read_after=None):
+        """Página ordenada por id (keyset): (fornecedores, próximo cursor).
+
+        'after' é o cursor devolvido pela página anterior; 'read_after', o
+        token de leitura causal.
+        """
+        limit = page_limit(limit)
+        suppliers = sorted((s for s in self.get_all(after=read_after).values()
+                            if after is None or s['id'] > after), key=lambda s: s['id'])
+        return paginate((project(s, fields) for s in suppliers[:limit + 1]), limit)
+
+    def archive(self, retention=DEFAULT_ARCHIVE_RETENTION, batch_size=500):
+        """Move para o arquivo os excluídos há mais de `retention`; retorna quantos foram movidos."""
+        return 0
+
+    def get_archive(self, limit=DEFAULT_PAGE_SIZE, after=None, cnpj=None):
+        """Página de fornecedores arquivados (com deleted_at e archived_at): (itens, próximo cursor)."""
+        return {}, None
+
+    def create_many(self, records):
+        """Cria vários fornecedores; CNPJs já cadastrados são ignorados. Retorna quantos foram criados."""
+        created = 0
+        for record in records:
+            try:
+                self.create(dict(record))
+            except ValueError:
+                continue
+            created += 1
+        return created
+
+
+class UserRepository(ABC):
+    """Operações de usuários comuns a todos os backends."""
+
+    def ensure_indexes(self):
+        pass
+
+    def migrate(self):
+        """Regrava registros antigos na forma canônica; retorna quantos foram alterados."""
+        return 0
+
+    def pending_migration(self):
+        """True se há registros sem 'id', que as leituras não aceitam até o migrate()."""
+        return False
+
+    @abstractmethod
+    def get_all(self, after=None):
+        pass
+
+    @abstractmethod
+    def get(self, id):
+        pass
+
+    @abstractmethod
+    def get_by_username(self, username):
+        pass
+
+    @abstractmethod
+    def get_by_email(self, email):
+        pass
+
+    @abstractmethod
+    def authenticate(self, username, password):
+        pass
+
+    @abstractmethod
+    def create(self, data):
+        pass
+
+    @abstractmethod
+    def update(self, id, data):
+        pass
+
+    @abstractmethod
+    def delete(self, id):
+        pass
+
+    def get_many(self, ids, fields=None):
+        """Leitura em lote: {id: usuário} dos ids existentes, sem o hash de senha."""
+        found = {}
+        for id in ids:
+            user = self.get(id)
+            if user is not None:
+                found[user['id']] = project(user, fields, exclude=PRIVATE_USER_FIELDS)
+        return found
+
+    def get_page(self, limit=DEFAULT_PAGE_SIZE, after=None, role=None, active=None, search=None,
+                 read_after=None, fields=None):
+        """Página ordenada por id (keyset): (usuários, próximo cursor).
+
+        'search' é um prefixo de username ou email, sem diferenciar
+        maiúsculas; o hash de senha nunca é devolvido.
+        """
+        limit = page_limit(limit)
+        search = search.lower() if search else None
+
+        def matches(u):
+            return ((after is None or u['id'] > after)
+                    and (not role or u.get('role') == role)
+                    and (active is None or u.get('active') == active)
+                    and (not search or any(str(u.get(field, '')).startswith(search)
+                                           for field in SEARCH_FIELDS)))
+
+        users = sorted((u for u in self.get_all(after=read_after).values() if matches(u)), key=lambda u: u['id'])
+        return paginate((project(u, fields, exclude=PRIVATE_USER_FIELDS) for u in users[:limit + 1]), limit)
@@ -0,0 +1,9 @@
+from marshmallow import Schema, fields, ValidationError
+from .validators import CNPJValidator
+
+
+class SupplierSchema(Schema):
+    name = fields.Str(required=True)
+    cnpj = fields.Str(required=True, validate=CNPJValidator())
+    email = fields.Email(required=True)
+    phone = fields.Str(required=True)
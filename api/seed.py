@@ -0,0 +1,228 @@
+import json
+import logging
+from pathlib import Path
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .supplier_mongo import LIVE, _bson_now
+from .utils import normalize_supplier, normalize_user
+
+logger = logging.getLogger(__name__)
+
+# Operações acumuladas por chamada de bulk_write
+SEED_BATCH_SIZE = 10000
+# Fornecedores por bulk_write na migração (db/migrar_fornecedores.py)
+SUPPLIER_BATCH_SIZE = 1000
+# Campos do cadastro copiados da origem para o fornecedor existente
+SUPPLIER_FIELDS = ('name', 'email', 'phone')
+# Tamanho dos blocos lidos do arquivo de seed
+READ_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_records(path, chunk_size=READ_CHUNK_SIZE):
+    """Itera os registros de um arquivo de seed sem carregá-lo inteiro na memória.
+
+    Aceita JSON Lines (.jsonl), uma lista JSON ou um objeto no formato
+    {id: registro}, como db/users.json. No formato de objeto, a chave é
+    devolvida no campo 'id' quando o registro não o possui.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix == '.jsonl':
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+        yield from _iter_container(f, chunk_size)
+
+
+def _iter_container(f, chunk_size):
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        # Descarta o que já foi consumido para manter o buffer pequeno
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # Um número no fim do buffer pode estar truncado: lê mais e repete
+            if end == len(buf) and not eof:
+                fill()
+                continue
+            pos = end
+            return value
+
+    def expect(char):
+        nonlocal pos
+        skip(_WHITESPACE)
+        if pos >= len(buf) or buf[pos] != char:
+            raise ValueError(f"Arquivo de seed inválido: esperado '{char}'")
+        pos += 1
+
+    skip(_WHITESPACE)
+    if pos >= len(buf):
+        return
+    opening = buf[pos]
+    if opening not in '{[':
+        raise ValueError("Arquivo de seed deve conter um objeto ou uma lista JSON")
+    closing = '}' if opening == '{' else ']'
+    pos += 1
+    while True:
+        skip(_WHITESPACE + ',')
+        if pos >= len(buf):
+            raise ValueError("Arquivo de seed truncado")
+        if buf[pos] == closing:
+            return
+        if opening == '{':
+            key = decode()
+            expect(':')
+            skip(_WHITESPACE)
+            record = decode()
+            if isinstance(record, dict):
+                record.setdefault('id', key)
+        else:
+            record = decode()
+        yield record
+
+
+def seed_users(collection, records, batch_size=SEED_BATCH_SIZE):
+    """Insere usuários de forma idempotente, chaveados por username.
+
+    Cada registro vira um UpdateOne com upsert e $setOnInsert: usuários já
+    existentes não são alterados, e os novos entram em um único bulk_write
+    por lote (um round trip para milhares de registros).
+
+    username e email são gravados em minúsculas (utils.normalize_user).
+    Registros sem username são ignorados (com aviso no log). Retorna a
+    quantidade de usuários inseridos.
+    """
+    inserted = 0
+    ops = []
+    for position, record in enumerate(records, 1):
+        doc = normalize_user(record)
+        doc.pop('id', None)
+        doc.pop('_id', None)
+        # O username do filtro já é gravado no documento criado pelo upsert
+        username = doc.pop('username', None)
+        if not username:
+            logger.warning(f"Usuário sem username ignorado (registro {position})")
+            continue
+        # _id e id público definidos aqui, como em user_mongo.User.create
+        oid = ObjectId()
+        doc.update(_id=oid, id=str(oid))
+        ops.append(UpdateOne({'username': username}, {'$setOnInsert': doc}, upsert=True))
+        if len(ops) >= batch_size:
+            inserted += _flush(collection, ops)
+            ops = []
+    if ops:
+        inserted += _flush(collection, ops)
+    return inserted
+
+
+def _flush(collection, ops):
+    # ordered=False: um registro com problema não interrompe o restante do lote
+    try:
+        result = collection.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        # Ex.: email já usado por outro username (índice único)
+        errors = e.details.get('writeErrors', [])
+        logger.warning(f"Seed: {len(errors)} registro(s) rejeitado(s) no lote: {errors[:3]}")
+        return e.details.get('nUpserted', 0)
+    logger.debug(f"Seed: lote de {len(ops)} operação(ões), {result.upserted_count} inserida(s)")
+    return result.upserted_count
+
+
+def supplier_upsert(data, timestamp):
+    """UpdateOne com upsert pelo CNPJ entre os fornecedores ativos (`data` já normalizado).
+
+    O fornecedor existente recebe nome, email, telefone e original_id (o id
+    do registro de origem); um novo é criado no formato de
+    supplier_mongo.Supplier.create. Registros sem id ficam com original_id
+    igual ao id público, definido na mesma escrita.
+    """
+    oid = ObjectId()
+    fields = {field: data[field] for field in SUPPLIER_FIELDS if field in data}
+    fields['updated_at'] = timestamp
+    on_insert = {'_id': oid, 'id': f"sup_{oid}", 'created_at': timestamp, 'deleted_at': None}
+    if data.get('id') is not None:
+        fields['original_id'] = data['id']
+    else:
+        on_insert['original_id'] = on_insert['id']
+    # O filtro usa o índice único parcial de CNPJ; o cnpj do filtro é gravado no documento inserido
+    return UpdateOne({'cnpj': data['cnpj'], **LIVE}, {'$set': fields, '$setOnInsert': on_insert}, upsert=True)
+
+
+def migrate_suppliers(collection, records, batch_size=SUPPLIER_BATCH_SIZE, skip=0, on_batch=None):
+    """Upsert em lote de fornecedores, chaveado por CNPJ (idempotente).
+
+    Os registros são consumidos de forma incremental; os `skip` primeiros
+    (já gravados em uma execução anterior) são apenas lidos. CNPJs repetidos
+    no mesmo lote são combinados, valendo o último registro, como em uma
+    gravação sequencial. Após cada bulk_write, `on_batch(stats)` recebe os
+    totais, com 'position' = registros da origem já gravados (checkpoint).
+    """
+    stats = {'position': 0, 'inserted': 0, 'updated': 0, 'invalid': 0, 'failed': 0}
+    batch = {}
+    for record in records:
+        stats['position'] += 1
+        if stats['position'] <= skip:
+            continue
+        data = normalize_supplier(record)
+        if not data.get('cnpj'):
+            stats['invalid'] += 1
+            logger.warning(f"Fornecedor sem CNPJ ignorado (registro {stats['position']})")
+            continue
+        # Mesmo CNPJ no lote: o último registro substitui o anterior
+        batch[data['cnpj']] = supplier_upsert(data, _bson_now())
+        if len(batch) >= batch_size:
+            _write_suppliers(collection, list(batch.values()), stats)
+            batch = {}
+            if on_batch:
+                on_batch(stats)
+    if batch:
+        _write_suppliers(collection, list(batch.values()), stats)
+    if on_batch and stats['position'] > skip:
+        on_batch(stats)
+    return stats
+
+
+def _write_suppliers(collection, ops, stats):
+    try:
+        result = collection.bulk_write(ops, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        errors = details.get('writeErrors', [])
+        stats['failed'] += len(errors)
+        logger.warning(f"Migração: {len(errors)} fornecedor(es) rejeitado(s) no lote: {errors[:3]}")
+    stats['inserted'] += details.get('nUpserted', 0)
+    stats['updated'] += details.get('nMatched', 0)
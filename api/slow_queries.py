@@ -0,0 +1,257 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Campos de sessão/roteamento removidos antes de reexecutar o comando com explain
+_EXPLAIN_STRIP = {
+    'lsid', '$clusterTime', '$db', 'txnNumber', '$readPreference',
+    'readConcern', 'writeConcern', 'autocommit', 'startTransaction', 'cursor',
+}
+# Comandos que aceitam explain
+_EXPLAINABLE = {'find', 'aggregate', 'count', 'distinct', 'update', 'delete', 'findAndModify'}
+
+
+def query_shape(value):
+    """Substitui valores por '?' mantendo campos e operadores (sem dados sensíveis)."""
+    if isinstance(value, dict):
+        return {key: query_shape(value[key]) for key in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        # Listas (ex.: $in com milhares de valores) viram as formas distintas
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return '?'
+
+
+def _command_shape(name, command):
+    """Extrai filtro, ordenação e projeção relevantes de um comando."""
+    if name == 'find':
+        parts = {'filter': command.get('filter', {}), 'sort': command.get('sort'),
+                 'projection': command.get('projection')}
+    elif name == 'aggregate':
+        parts = {'pipeline': command.get('pipeline', [])}
+    elif name in ('count', 'distinct'):
+        parts = {'query': command.get('query', {}), 'key': command.get('key')}
+    elif name == 'update':
+        parts = {'q': (command.get('updates') or [{}])[0].get('q', {})}
+    elif name == 'delete':
+        parts = {'q': (command.get('deletes') or [{}])[0].get('q', {})}
+    elif name == 'findAndModify':
+        parts = {'query': command.get('query', {}), 'sort': command.get('sort')}
+    else:
+        parts = {}
+    return {key: query_shape(value) for key, value in parts.items() if value is not None}
+
+
+def _plan_summary(explain_result):
+    """Resume o plano: estágios (ex.: IXSCAN, COLLSCAN) e índices usados."""
+    stages, indexes = [], []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if 'rejectedPlans' in node:
+                node = {k: v for k, v in node.items() if k != 'rejectedPlans'}
+            stage = node.get('stage')
+            if isinstance(stage, str) and stage not in stages:
+                stages.append(stage)
+            index = node.get('indexName')
+            if isinstance(index, str) and index not in indexes:
+                indexes.append(index)
+            for child in node.values():
+                walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+
+    walk(explain_result.get('queryPlanner', explain_result))
+    return {'stages': stages, 'indexes': indexes}
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Registra comandos MongoDB acima de um limite de duração.
+
+    No thread da requisição apenas o comando é guardado no início e a
+    duração é comparada no fim. Amostras lentas vão para um thread de
+    fundo, que grava um arquivo JSONL rotativo e captura o plano (explain)
+    uma vez por forma de consulta nova. O agregado por forma alimenta o
+    endpoint administrativo.
+    """
+
+    def __init__(self, threshold_ms=100, path=None, max_bytes=10 * 1024 * 1024,
+                 backup_count=5, queue_size=1000, max_shapes=500):
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_shapes = max_shapes
+        self.client_getter = None
+        self._pending = {}
+        self._shapes = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._worker = None
+        self._worker_pid = None
+        self._file_logger = None
+        self.dropped = 0
+
+    # ------------------------------------------------------------------------
+    # CommandListener
+    # ------------------------------------------------------------------------
+
+    def started(self, event):
+        if getattr(self._local, 'internal', False):
+            return
+        self._pending[(event.connection_id, event.request_id)] = (event.command, event.database_name)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+        command, database = pending
+        name = event.command_name
+        collection = command.get(name)
+        sample = {
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'database': database,
+            'collection': collection if isinstance(collection, str) else None,
+            'command': name,
+            'shape': _command_shape(name, command),
+            'duration_ms': round(duration_ms, 3),
+            'failed': failed,
+        }
+        key = json.dumps([database, sample['collection'], name, sample['shape']], sort_keys=True)
+        is_new = self._aggregate(key, sample)
+        explain_command = None
+        if is_new and name in _EXPLAINABLE and not failed:
+            explain_command = {k: v for k, v in command.items() if k not in _EXPLAIN_STRIP}
+            for field in ('updates', 'deletes'):
+                if field in explain_command:
+                    explain_command[field] = explain_command[field][:1]
+        self._submit((key, sample, explain_command))
+
+    # ------------------------------------------------------------------------
+    # Agregação por forma de consulta
+    # ------------------------------------------------------------------------
+
+    def _aggregate(self, key, sample):
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    # Limite de memória: formas excedentes só vão para o arquivo
+                    return False
+                self._shapes[key] = {
+                    'database': sample['database'],
+                    'collection': sample['collection'],
+                    'command': sample['command'],
+                    'shape': sample['shape'],
+                    'count': 1,
+                    'total_ms': sample['duration_ms'],
+                    'max_ms': sample['duration_ms'],
+                    'last_seen': sample['ts'],
+                    'plan': None,
+                }
+                return True
+            entry['count'] += 1
+            entry['total_ms'] += sample['duration_ms']
+            entry['max_ms'] = max(entry['max_ms'], sample['duration_ms'])
+            entry['last_seen'] = sample['ts']
+            return False
+
+    def top_shapes(self, limit=20):
+        """Formas de consulta ordenadas pelo tempo total acumulado."""
+        with self._lock:
+            entries = [dict(entry) for entry in self._shapes.values()]
+        entries.sort(key=lambda e: e['total_ms'], reverse=True)
+        for entry in entries:
+            entry['total_ms'] = round(entry['total_ms'], 3)
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+        return entries[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+    # ------------------------------------------------------------------------
+    # Thread de fundo: arquivo rotativo e explain
+    # ------------------------------------------------------------------------
+
+    def _submit(self, item):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self):
+        # Reinicia o thread após fork (threads não sobrevivem ao fork)
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='slow-query-log', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        self._local.internal = True
+        while True:
+            key, sample, explain_command = self._queue.get()
+            try:
+                self._write(sample)
+                if explain_command is not None:
+                    self._explain(key, sample, explain_command)
+            except Exception as e:
+                logger.error(f"Erro ao processar consulta lenta: {e}")
+
+    def _write(self, sample):
+        if not self.path:
+            return
+        if self._file_logger is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            file_logger = logging.Logger('slow_queries.samples')
+            file_logger.addHandler(handler)
+            self._file_logger = file_logger
+        self._file_logger.info(json.dumps(sample, ensure_ascii=False, default=str))
+
+    def _explain(self, key, sample, command):
+        client = self.client_getter() if self.client_getter else None
+        if client is None:
+            return
+        start = time.perf_counter()
+        result = client[sample['database']].command({'explain': command, 'verbosity': 'queryPlanner'})
+        plan = _plan_summary(result)
+        with self._lock:
+            if key in self._shapes:
+                self._shapes[key]['plan'] = plan
+        logger.info(
+            f"Plano capturado para consulta lenta em {sample['collection']} ({sample['command']}): "
+            f"{plan['stages']} índices={plan['indexes']} ({(time.perf_counter() - start) * 1000:.1f} ms)"
+        )
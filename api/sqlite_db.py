@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+
+from .json_provider import isoformat
+
+logger = logging.getLogger(__name__)
+
+# Instruções compiladas mantidas em cache por conexão (prepared statements)
+STATEMENT_CACHE_SIZE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppliers (
+    id TEXT PRIMARY KEY,
+    cnpj TEXT,
+    name TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    deleted_at TEXT,
+    data TEXT NOT NULL
+);
+
+-- Fornecedores excluídos há mais que a retenção (Supplier.archive)
+CREATE TABLE IF NOT EXISTS suppliers_archive (
+    id TEXT PRIMARY KEY,
+    cnpj TEXT,
+    deleted_at TEXT NOT NULL,
+    archived_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_archive_cnpj ON suppliers_archive (cnpj, id);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    email TEXT,
+    role TEXT,
+    active INTEGER,
+    created_at TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_username ON users (username);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_email ON users (email);
+CREATE INDEX IF NOT EXISTS idx_user_role_active ON users (role, active, id);
+
+-- Trilha de auditoria (api/audit.py), gravada em lote pelo AuditLog
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY,
+    entity TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_entity ON audit_log (entity, entity_id, ts);
+"""
+
+# Índices parciais: só fornecedores ativos (deleted_at nulo) ocupam os índices
+# de CNPJ e nome; o do arquivador contém apenas os excluídos
+SUPPLIER_INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_supplier_cnpj ON suppliers (cnpj) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_supplier_name ON suppliers (name) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_supplier_deleted_at ON suppliers (deleted_at) WHERE deleted_at IS NOT NULL;
+"""
+
+
+def to_text(value):
+    """datetime (UTC, sem fuso) -> texto ISO 8601 no formato das respostas da API; demais valores inalterados."""
+    return isoformat(value) if isinstance(value, datetime) else value
+
+
+def sortable_text(value):
+    """datetime -> ISO 8601 com microssegundos fixos: comparável como texto (deleted_at)."""
+    return value.isoformat(timespec='microseconds') + 'Z'
+
+
+def from_legacy_text(value):
+    """Timestamp em texto das versões anteriores (ISO sem fuso) -> formato de to_text."""
+    if isinstance(value, str) and not value.endswith('Z'):
+        return to_text(datetime.fromisoformat(value))
+    return value
+
+
+def load_documents(connection, sql, params=()):
+    """Documentos JSON da primeira coluna do resultado, decodificados com um único json.loads.
+
+    As linhas já guardam o documento público: os textos são concatenados
+    em C (join) e não há transformação por registro em Python.
+    """
+    rows = connection.execute(sql, params).fetchall()
+    return json.loads('[' + ','.join(map(itemgetter(0), rows)) + ']')
+
+
+def _upgrade_suppliers(conn):
+    # Bancos anteriores à exclusão lógica: nova coluna e índices recriados como parciais
+    # (BEGIN IMMEDIATE: outro processo abrindo o mesmo arquivo espera e não repete a alteração)
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(suppliers)')}
+        if 'deleted_at' not in columns:
+            conn.execute('ALTER TABLE suppliers ADD COLUMN deleted_at TEXT')
+            conn.execute('DROP INDEX IF EXISTS idx_supplier_cnpj')
+            conn.execute('DROP INDEX IF EXISTS idx_supplier_name')
+            logger.info("Tabela suppliers atualizada para exclusão lógica (deleted_at)")
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+class SQLiteDatabase:
+    """Banco SQLite em modo WAL, com uma conexão por thread e por processo.
+
+    WAL permite leitores simultâneos a um escritor; synchronous=NORMAL é
+    seguro nesse modo (uma queda de energia pode perder apenas as últimas
+    transações, sem corromper o arquivo). As conexões não atravessam fork:
+    após o fork, cada processo abre as suas.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self):
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: autocommit; transações explícitas em transaction()
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.timeout * 1000)}')
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    _upgrade_suppliers(conn)
+                    conn.executescript(SUPPLIER_INDEXES)
+                    self._schema_ready = True
+                    logger.info(f"Banco SQLite pronto: {self.path}")
+        return conn
+
+    @property
+    def connection(self):
+        pid, conn = getattr(self._local, 'connection', (None, None))
+        if pid != os.getpid():
+            conn = self._connect()
+            self._local.connection = (os.getpid(), conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Transação com lock de escrita desde o início (BEGIN IMMEDIATE)."""
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def ping(self):
+        self.connection.execute('SELECT 1').fetchone()
+
+    def close(self):
+        pid, conn = getattr(self._local, 'connection', (None, None))
+        if conn is not None and pid == os.getpid():
+            conn.close()
+        self._local.connection = (None, None)
@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import mimetypes
+import posixpath
+import re
+import threading
+from pathlib import Path
+
+from flask import current_app, request
+
+from .compression import compress_body
+
+logger = logging.getLogger(__name__)
+
+# Arquivos que recebem URL com hash do conteúdo
+FINGERPRINT_SUFFIXES = ('.js', '.css')
+HASH_LENGTH = 12
+_FINGERPRINTED = re.compile(rf'^(?P<base>.+)\.(?P<hash>[0-9a-f]{{{HASH_LENGTH}}})(?P<ext>\.(?:js|css))$')
+_ASSET_REFERENCE = re.compile(r'(?P<attr>\b(?:src|href)=")(?P<url>[^"#?:]+)(?P<end>")')
+
+
+class AssetManifest:
+    """Mapa arquivo -> hash do conteúdo dos JS/CSS do frontend, e HTML reescrito.
+
+    Calculado uma vez; em modo debug, é refeito quando algum arquivo muda.
+    """
+
+    def __init__(self, static_folder):
+        self.static_folder = Path(static_folder)
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _signature(self):
+        return tuple(
+            (str(path), path.stat().st_mtime_ns)
+            for path in sorted(self.static_folder.rglob('*'))
+            if path.is_file() and path.suffix in FINGERPRINT_SUFFIXES + ('.html',)
+        )
+
+    def _build(self, signature):
+        hashes = {}
+        for path in self.static_folder.rglob('*'):
+            if path.is_file() and path.suffix in FINGERPRINT_SUFFIXES:
+                name = path.relative_to(self.static_folder).as_posix()
+                hashes[name] = hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+        logger.info(f"Manifesto de assets: {len(hashes)} arquivo(s) com hash")
+        return {'signature': signature, 'hashes': hashes, 'html': {}}
+
+    def _current(self, check=False):
+        state = self._state
+        if state is None or check:
+            signature = self._signature() if check or state is None else state['signature']
+            if state is None or state['signature'] != signature:
+                with self._lock:
+                    if self._state is None or self._state['signature'] != signature:
+                        self._state = self._build(signature)
+                    state = self._state
+        return state
+
+    def url_for(self, filename, check=False):
+        """Nome com hash (css/styles.<hash>.css) ou None se o arquivo não tem hash."""
+        digest = self._current(check)['hashes'].get(filename)
+        if digest is None:
+            return None
+        base, ext = posixpath.splitext(filename)
+        return f'{base}.{digest}{ext}'
+
+    def resolve(self, filename, check=False):
+        """Converte um nome com hash no arquivo real; devolve (arquivo, hash confere)."""
+        match = _FINGERPRINTED.match(filename)
+        if match is None:
+            return filename, False
+        original = match.group('base') + match.group('ext')
+        digest = self._current(check)['hashes'].get(original)
+        if digest is None:
+            return filename, False
+        return original, digest == match.group('hash')
+
+    def html(self, filename, check=False):
+        """HTML com as referências a JS/CSS trocadas pelas URLs com hash (em cache)."""
+        state = self._current(check)
+        cached = state['html'].get(filename)
+        if cached is None:
+            directory = posixpath.dirname(filename)
+            text = (self.static_folder / filename).read_text(encoding='utf-8')
+
+            def rewrite(match):
+                url = match.group('url')
+                target = self.url_for(posixpath.normpath(posixpath.join(directory, url)))
+                if target is None:
+                    return match.group(0)
+                return f"{match.group('attr')}{posixpath.join(posixpath.dirname(url), posixpath.basename(target))}{match.group('end')}"
+
+            body = _ASSET_REFERENCE.sub(rewrite, text).encode('utf-8')
+            cached = state['html'][filename] = (body, hashlib.sha256(body).hexdigest()[:32])
+        return cached
+
+
+def _accel_redirect(filename):
+    # O proxy entrega o arquivo (location interna); o worker só envia headers
+    response = current_app.response_class(
+        mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    prefix = current_app.config['STATIC_ACCEL_PREFIX'].rstrip('/')
+    response.headers['X-Accel-Redirect'] = f'{prefix}/{filename}'
+    return response
+
+
+def _static_view(static_view, manifest):
+    def send_static_file(filename):
+        config = current_app.config
+        check = current_app.debug
+
+        if filename.endswith('.html') and config['STATIC_FINGERPRINT']:
+            path = manifest.static_folder / filename
+            if path.is_file():
+                body, etag = manifest.html(filename, check)
+                # Comprimido aqui, como o swagger.json: o ETag da variante
+                # ("<hash>-gzip") precisa existir antes do make_conditional
+                encoding = None
+                if config.get('COMPRESS_ENABLED'):
+                    encoding, body = compress_body(body, request.accept_encodings, config)
+                response = current_app.response_class(body, mimetype='text/html')
+                if encoding is not None:
+                    response.headers['Content-Encoding'] = encoding
+                    etag = f'{etag}-{encoding}'
+                response.set_etag(etag)
+                response.vary.add('Accept-Encoding')
+                # Páginas sempre revalidadas: é delas que vêm as URLs novas
+                response.cache_control.no_cache = True
+                return response.make_conditional(request)
+
+        original, immutable = manifest.resolve(filename, check)
+        if config['STATIC_OFFLOAD'] == 'x-accel-redirect' and (manifest.static_folder / original).is_file():
+            response = _accel_redirect(original)
+        else:
+            response = static_view(filename=original)
+        if immutable:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = config['STATIC_MAX_AGE']
+            response.cache_control.immutable = True
+        return response
+    return send_static_file
+
+
+def init_app(app):
+    """URLs com hash do conteúdo, cache imutável e entrega pelo proxy (opcional).
+
+    - STATIC_FINGERPRINT: reescreve os HTML para apontar para nome.<hash>.js/css,
+      servidos com Cache-Control immutable por STATIC_MAX_AGE segundos;
+    - STATIC_OFFLOAD: 'x-sendfile' (Apache/lighttpd) ou 'x-accel-redirect' (nginx,
+      location interna em STATIC_ACCEL_PREFIX): o worker não lê os arquivos.
+    """
+    if not app.static_folder or 'static' not in app.view_functions:
+        return
+    offload = app.config['STATIC_OFFLOAD']
+    if offload not in ('', 'x-sendfile', 'x-accel-redirect'):
+        raise ValueError(f"STATIC_OFFLOAD inválido: {offload}")
+    if offload == 'x-sendfile':
+        app.config['USE_X_SENDFILE'] = True
+    manifest = AssetManifest(app.static_folder)
+    app.extensions['esk_asset_manifest'] = manifest
+    app.view_functions['static'] = _static_view(app.view_functions['static'], manifest)
@@ -1,17 +1,21 @@
-import json
-import os
 import uuid
 from pathlib import Path
 import logging
 
+from .json_store import COMPACT_EVERY, JsonStore
+from .repository import DUPLICATE_CNPJ_MESSAGE, SupplierRepository
+from .utils import normalize_supplier
+
 logger = logging.getLogger(__name__)
 
-class Supplier:
-    def __init__(self, db_path=None):
+class Supplier(SupplierRepository):
+    def __init__(self, db_path=None, compact_every=COMPACT_EVERY):
         if db_path:
             self.db_file = Path(db_path)
         else:
             self.db_file = Path(__file__).parent.parent / 'db' / 'suppliers.json'
+        # Índice primário (id) e secundário (cnpj) em memória; escritas em log
+        self.store = JsonStore(self.db_file, indexes=('cnpj',), compact_every=compact_every)
         self._init_db()
 
     def _init_db(self):
@@ -39,145 +43,107 @@ class Supplier:
             ]:
                 id = f'sup_{uuid.uuid4()}'
                 suppliers[id] = {'id': id, **company}
-            
-            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
             self._write_db(suppliers)
-        else:
-            # Validar e corrigir dados existentes
-            suppliers = self._read_db()
-            self._write_db(suppliers)  # Reescreve para garantir consistência
 
     def _clean_data(self, data):
-        """Remove caracteres especiais dos dados"""
+        """Remove caracteres especiais dos dados (ver utils.normalize_supplier)"""
         if isinstance(data, dict):
-            cleaned = {}
-            for key, value in data.items():
-                if key in ['cnpj', 'phone']:
-                    # Remove qualquer caractere não numérico
-                    cleaned[key] = ''.join(filter(str.isdigit, str(value)))
-                elif key == 'email':
-                    # Remove espaços do email
-                    cleaned[key] = str(value).strip()
-                else:
-                    cleaned[key] = value
-            return cleaned
+            return normalize_supplier(data)
         return data
 
     def _read_db(self):
-        try:
-            with open(self.db_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Corrige possíveis inconsistências entre chaves e IDs
-                fixed_data = {}
-                for key, value in data.items():
-                    if not value:
-                        logger.warning(f"Registro inválido encontrado para a chave {key}")
-                        continue
-                    
-                    correct_id = value.get('id', key)
-                    cleaned_value = self._clean_data(value)
-                    fixed_data[correct_id] = {**cleaned_value, 'id': correct_id}
-                return fixed_data
-        except FileNotFoundError:
-            logger.warning("Arquivo de banco de dados não encontrado, criando novo...")
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON: {e}")
-            return {}
-        except Exception as e:
-            logger.error(f"Erro ao ler banco de dados: {e}")
-            return {}
+        """Todos os fornecedores, já normalizados na escrita (registros compartilhados: não alterar)."""
+        return self.store.all()
 
     def _write_db(self, data):
-        try:
-            # Garantir que os IDs estejam sincronizados e dados limpos
-            fixed_data = {}
+        """Substitui todo o conteúdo (usado apenas na criação do banco)."""
+        with self.store.locked():
+            for id in set(self.store.all()) - set(data):
+                self.store.delete(id)
             for key, value in data.items():
                 if not value:
                     logger.warning(f"Tentativa de salvar registro inválido para a chave {key}")
                     continue
-                    
-                cleaned_value = self._clean_data(value)
-                cleaned_value['id'] = key  # Garante que o ID interno seja igual à chave
-                fixed_data[key] = cleaned_value
-            
-            # Criar diretório se não existir
-            self.db_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.db_file, 'w', encoding='utf-8') as f:
-                json.dump(fixed_data, f, indent=4, ensure_ascii=False)
-                
-        except Exception as e:
-            logger.error(f"Erro ao escrever no banco de dados: {e}")
-            raise
+                self.store.put(key, self._clean_data(value))
+            self.store.compact()
+
+    def migrate(self):
+        """Normaliza, uma única vez, os registros gravados antes da normalização na escrita."""
+        changed = 0
+        with self.store.locked():
+            for id, record in self.store.all().items():
+                cleaned = self._clean_data(record)
+                if cleaned != record:
+                    self.store.put(id, cleaned)
+                    changed += 1
+            if changed:
+                self.store.compact()
+        logger.info(f"Migração de fornecedores: {changed} registro(s) atualizado(s)")
+        return changed
 
-    def get_all(self):
+    def get_all(self, after=None):
         return self._read_db()
 
     def get(self, id):
-        suppliers = self._read_db()
-        return suppliers.get(id)
+        return self.store.get(id)
 
     def create(self, data):
         logger.debug(f"Criando novo fornecedor com dados: {data}")
-        suppliers = self._read_db()
-        
+
         # Limpar e validar dados
         cleaned_data = self._clean_data(data)
-        
-        # Verificar CNPJ duplicado
-        cnpj = cleaned_data.get('cnpj')
-        if any(s['cnpj'] == cnpj for s in suppliers.values()):
-            raise ValueError("CNPJ já cadastrado")
-        
-        # Gerar ID único
-        id = f'sup_{uuid.uuid4()}'
-        suppliers[id] = {'id': id, **cleaned_data}
-        
-        self._write_db(suppliers)
+
+        with self.store.locked():
+            # Verificar CNPJ duplicado
+            cnpj = cleaned_data.get('cnpj')
+            if self.store.find('cnpj', cnpj):
+                raise ValueError(DUPLICATE_CNPJ_MESSAGE)
+
+            # Gerar ID único
+            id = f'sup_{uuid.uuid4()}'
+            supplier = self.store.put(id, cleaned_data)
+
         logger.info(f"Fornecedor criado com ID: {id}")
-        return suppliers[id]
+        return supplier
 
     def update(self, id, data):
         logger.debug(f"Atualizando fornecedor {id} com dados: {data}")
-        suppliers = self._read_db()
-        
-        if id not in suppliers:
-            logger.warning(f"Fornecedor {id} não encontrado para atualização")
-            return None
-            
+
         # Limpar e validar dados
         cleaned_data = self._clean_data(data)
-        
-        # Verificar CNPJ duplicado (exceto para o mesmo registro)
-        cnpj = cleaned_data.get('cnpj')
-        if any(s['cnpj'] == cnpj and s['id'] != id for s in suppliers.values()):
-            raise ValueError("CNPJ já cadastrado")
-            
-        suppliers[id] = {**suppliers[id], **cleaned_data, 'id': id}
-        self._write_db(suppliers)
-        
+
+        with self.store.locked():
+            current = self.store.get(id)
+            if current is None:
+                logger.warning(f"Fornecedor {id} não encontrado para atualização")
+                return None
+
+            # Verificar CNPJ duplicado (exceto para o mesmo registro)
+            cnpj = cleaned_data.get('cnpj')
+            if self.store.find('cnpj', cnpj) - {id}:
+                raise ValueError(DUPLICATE_CNPJ_MESSAGE)
+
+            supplier = self.store.put(id, {**current, **cleaned_data})
+
         logger.info(f"Fornecedor {id} atualizado com sucesso")
-        return suppliers[id]
+        return supplier
 
     def delete(self, id):
         try:
             logger.debug(f"Tentando excluir fornecedor com ID: {id}")
-            suppliers = self._read_db()
-            
+
             if not id:
                 logger.warning("ID fornecido está vazio")
                 return False
-                
-            if id in suppliers:
+
+            if self.store.delete(id):
                 logger.info(f"Excluindo fornecedor {id}")
-                del suppliers[id]
-                self._write_db(suppliers)
                 return True
-            
+
             logger.warning(f"Fornecedor {id} não encontrado para exclusão")
             return False
-            
+
         except Exception as e:
             logger.error(f"Erro ao excluir fornecedor: {str(e)}")
             raise
\ No newline at end of file
@@ -1,88 +1,482 @@
 import logging
 from bson import ObjectId
-from pymongo import ASCENDING # Importar ASCENDING
+from pymongo import ASCENDING, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, WriteError
 from datetime import datetime
 
+from . import read_routing
+from .group_commit import AsyncGroupCommit, GroupCommit
+from .repository import DEFAULT_ARCHIVE_RETENTION, DUPLICATE_CNPJ_MESSAGE, SupplierRepository
+from .utils import DEFAULT_PAGE_SIZE, normalize_cnpj, normalize_supplier, page_limit, paginate
+
 logger = logging.getLogger(__name__)
 
-class Supplier:
-    def __init__(self, mongo):
+# Os documentos guardam o id público ('sup_<ObjectId>') no campo 'id': as
+# leituras excluem o _id na projeção e devolvem o documento como veio do banco
+PUBLIC_PROJECTION = {'_id': 0, 'deleted_at': 0}
+# Documentos por bulk_write na migração
+MIGRATION_BATCH_SIZE = 1000
+
+# Exclusão lógica: fornecedores ativos têm deleted_at nulo; excluídos, a data
+# da exclusão. Os índices da coleção são parciais sobre LIVE, e as consultas
+# repetem o mesmo filtro para que o planner possa usá-los.
+LIVE = {'deleted_at': {'$type': 'null'}}
+DELETED = {'deleted_at': {'$type': 'date'}}
+# Lote do arquivador (coleção suppliers_archive)
+ARCHIVE_BATCH_SIZE = 500
+
+
+def _mongo_id(id):
+    # Remove o prefixo "sup_" se presente
+    return id.replace("sup_", "") if id.startswith("sup_") else id
+
+
+def _object_ids(ids):
+    # Ids públicos -> ObjectId; ids em formato inválido não existem no banco
+    return [ObjectId(_mongo_id(id)) for id in ids if ObjectId.is_valid(_mongo_id(id))]
+
+
+def _projection(fields):
+    if fields is None:
+        return PUBLIC_PROJECTION
+    return {'_id': 0, 'id': 1, **{field: 1 for field in fields}}
+
+
+def _new_document(data, timestamp):
+    # _id gerado no cliente: o id público é gravado junto, na mesma inserção
+    oid = ObjectId()
+    data.update(_id=oid, id=f"sup_{oid}", created_at=timestamp, updated_at=timestamp, deleted_at=None)
+    return data
+
+
+def _live(mongo_id):
+    return {'_id': ObjectId(mongo_id), **LIVE}
+
+
+def _archive_query(after=None, cnpj=None):
+    query = {}
+    if after:
+        query['_id'] = {'$gt': ObjectId(_mongo_id(after))}
+    if cnpj:
+        query['cnpj'] = cnpj
+    return query
+
+
+def _duplicate_cnpj(cnpj):
+    logger.warning(f"CNPJ duplicado detectado: {cnpj}")
+    return ValueError(DUPLICATE_CNPJ_MESSAGE)
+
+
+# ============================================================================
+# Group commit: criações concorrentes gravadas em um único insert_many
+# ============================================================================
+
+def _bson_now():
+    # Precisão de milissegundos do BSON: o documento devolvido sem nova leitura
+    # é igual ao que um GET posterior retorna
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def _batch_plan(documents, existing):
+    """Resultados já conhecidos do lote (CNPJ cadastrado ou repetido no lote) e posições a inserir."""
+    results = [None] * len(documents)
+    pending = []
+    taken = set(existing)
+    for i, document in enumerate(documents):
+        cnpj = document.get('cnpj')
+        if cnpj is not None and cnpj in taken:
+            results[i] = _duplicate_cnpj(cnpj)
+            continue
+        if cnpj is not None:
+            taken.add(cnpj)
+        pending.append(i)
+    return results, pending
+
+
+def _batch_results(documents, results, pending, write_errors, operation_time):
+    """Um resultado por chamador: (documento público, operationTime) ou a exceção da sua inserção."""
+    errors = {error['index']: error for error in write_errors}
+    for position, i in enumerate(pending):
+        error = errors.get(position)
+        if error is None:
+            results[i] = ({k: v for k, v in documents[i].items() if k not in PUBLIC_PROJECTION}, operation_time)
+        elif error.get('code') == 11000:
+            # Índice único: CNPJ inserido em paralelo por outro processo
+            results[i] = _duplicate_cnpj(documents[i].get('cnpj'))
+        else:
+            results[i] = WriteError(error.get('errmsg'), error.get('code'), error)
+    return results
+
+
+def _grouped_result(result):
+    document, operation_time = result
+    read_routing.record_operation_time(operation_time)
+    return document
+
+
+class Supplier(SupplierRepository):
+    def __init__(self, mongo, read_preference=None, group_commit_ms=0, group_commit_max=256):
         self.mongo = mongo
         self.collection = self.mongo.db.suppliers
-        # Criar índice no campo 'name' se não existir
-        self.collection.create_index([("name", ASCENDING)], name="idx_supplier_name")
-        logger.info("Índice 'idx_supplier_name' garantido na coleção 'suppliers'.")
+        self.archive_collection = self.mongo.db.suppliers_archive
+        # Listagens podem ir para secundários; leituras por id seguem no primário
+        self.list_collection = self.collection.with_options(read_preference=read_preference) \
+            if read_preference is not None else self.collection
+        # Com leituras fora do primário, as escritas registram o operationTime
+        self.causal = read_preference is not None
+        # group_commit_ms > 0: criações concorrentes agrupadas (ver create)
+        self.group_commit = GroupCommit(self._insert_batch, group_commit_ms, group_commit_max) \
+            if group_commit_ms > 0 else None
+
+    def ensure_indexes(self):
+        """Garante os índices da coleção (executado via `flask create-indexes`).
 
-    def get_all(self):
+        Antes, grava deleted_at nulo nos documentos anteriores à exclusão
+        lógica: sem o campo eles ficariam fora de LIVE e dos índices parciais.
+        """
+        result = self.collection.update_many({'deleted_at': {'$exists': False}}, {'$set': {'deleted_at': None}})
+        if result.modified_count:
+            logger.info(f"deleted_at nulo gravado em {result.modified_count} fornecedor(es) antigo(s)")
+        # Índices parciais: apenas fornecedores ativos (excluídos não ocupam o índice)
+        self._create_index([("name", ASCENDING)], name="idx_supplier_name", partialFilterExpression=LIVE)
+        # CNPJ único entre os ativos, inclusive entre criações concorrentes; um
+        # CNPJ excluído pode ser cadastrado de novo
         try:
-            logger.debug("Buscando todos os fornecedores")
-            suppliers = list(self.collection.find())
-            suppliers_dict = {}
-            for s in suppliers:
-                # Transforma o _id em string e adiciona o prefixo "sup_"
-                id_str = f"sup_{str(s['_id'])}"
-                s['id'] = id_str
-                del s['_id']
-                suppliers_dict[id_str] = s
-            logger.debug(f"Fornecedores encontrados: {len(suppliers_dict)}")
-            return suppliers_dict
-        except Exception as e:
-            logger.error(f"Erro ao buscar fornecedores: {e}")
-            return {}
+            self._create_index([("cnpj", ASCENDING)], name="idx_supplier_cnpj", unique=True,
+                               partialFilterExpression=LIVE)
+        except OperationFailure as e:
+            # Ex.: CNPJs duplicados pré-existentes impedem a criação do índice
+            logger.error(f"Não foi possível criar o índice 'idx_supplier_cnpj': {e}")
+        # Varredura do arquivador: só os excluídos, por data de exclusão
+        self._create_index([("deleted_at", ASCENDING)], name="idx_supplier_deleted_at",
+                           partialFilterExpression=DELETED)
+        self.archive_collection.create_index([("cnpj", ASCENDING), ("_id", ASCENDING)], name="idx_archive_cnpj")
+        logger.info("Índice 'idx_archive_cnpj' garantido na coleção 'suppliers_archive'.")
+
+    def _create_index(self, keys, name, **options):
+        try:
+            self.collection.create_index(keys, name=name, **options)
+        except OperationFailure as e:
+            # IndexOptionsConflict/IndexKeySpecsConflict: índice de versão anterior
+            # (sem filtro parcial) com o mesmo nome; é recriado com as opções atuais
+            if e.code not in (85, 86):
+                raise
+            logger.warning(f"Recriando o índice '{name}' com novas opções")
+            self.collection.drop_index(name)
+            self.collection.create_index(keys, name=name, **options)
+        logger.info(f"Índice '{name}' garantido na coleção 'suppliers'.")
+
+    def get_all(self, after=None):
+        # Erros (banco indisponível, documento sem 'id' antes do migrate-data)
+        # chegam à rota: uma lista vazia esconderia a falha
+        logger.debug("Buscando todos os fornecedores")
+        # 'after': operationTime da última escrita do cliente (leitura causal)
+        with read_routing.causal_session(self.mongo.cx, after) as session:
+            suppliers_dict = {s['id']: s for s in self.list_collection.find(LIVE, PUBLIC_PROJECTION,
+                                                                               session=session)}
+        logger.debug(f"Fornecedores encontrados: {len(suppliers_dict)}")
+        return suppliers_dict
 
     def get(self, id):
-        # Remove o prefixo "sup_" se presente
-        mongo_id = id.replace("sup_", "") if id.startswith("sup_") else id
+        mongo_id = _mongo_id(id)
         try:
-            supplier = self.collection.find_one({'_id': ObjectId(mongo_id)})
-            if supplier:
-                supplier['id'] = f"sup_{str(supplier['_id'])}"
-                del supplier['_id']
-            return supplier
+            return self.collection.find_one(_live(mongo_id), PUBLIC_PROJECTION)
         except Exception as e:
             logger.error(f"Erro ao obter fornecedor: {e}")
             return None
 
+    def get_many(self, ids, fields=None):
+        """Leitura em lote com uma única consulta ($in sobre _id)."""
+        cursor = self.collection.find({'_id': {'$in': _object_ids(ids)}, **LIVE}, _projection(fields))
+        return {s['id']: s for s in cursor}
+
+    def get_page(self, limit=DEFAULT_PAGE_SIZE, after=None, fields=None, read_after=None):
+        """Página por cursor sobre o _id (ver SupplierRepository.get_page)."""
+        limit = page_limit(limit)
+        query = {'_id': {'$gt': ObjectId(_mongo_id(after))}, **LIVE} if after else LIVE
+        with read_routing.causal_session(self.mongo.cx, read_after) as session:
+            cursor = self.list_collection.find(query, _projection(fields), session=session) \
+                .sort('_id', ASCENDING).limit(limit + 1)
+            return paginate(cursor, limit)
+
     def create(self, data):
+        """Cria um fornecedor; com group commit, entra no lote da janela atual.
+
+        No modo agrupado, as criações concorrentes do processo que chegam em
+        até group_commit_ms (ou até group_commit_max documentos) são gravadas
+        com uma consulta de CNPJs e um insert_many, e cada chamador recebe o
+        próprio documento ou o próprio erro.
+        """
+        data = normalize_supplier(data)
         try:
-            # Adiciona timestamps de criação e atualização
-            timestamp = datetime.utcnow()
-            data['created_at'] = timestamp
-            data['updated_at'] = timestamp
-            result = self.collection.insert_one(data)
+            if self.group_commit is not None:
+                return _grouped_result(self.group_commit.submit(_new_document(data, _bson_now())))
+            # Verifica CNPJ duplicado; o índice único cobre criações concorrentes
+            if 'cnpj' in data and self.collection.find_one({'cnpj': data['cnpj'], **LIVE}, {'_id': 1}):
+                raise _duplicate_cnpj(data['cnpj'])
+            # Adiciona id público e timestamps de criação e atualização
+            _new_document(data, datetime.utcnow())
+            with read_routing.write_session(self.mongo.cx, self.causal) as session:
+                result = self.collection.insert_one(data, session=session)
             supplier = self.get(str(result.inserted_id))
             return supplier
+        except DuplicateKeyError:
+            raise _duplicate_cnpj(data.get('cnpj'))
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao criar fornecedor: {e}")
             raise
 
+    def _insert_batch(self, documents):
+        """Escrita de um lote do group commit: um resultado por documento."""
+        cnpjs = [d['cnpj'] for d in documents if d.get('cnpj') is not None]
+        existing = [s['cnpj'] for s in self.collection.find({'cnpj': {'$in': cnpjs}, **LIVE}, {'cnpj': 1, '_id': 0})] \
+            if cnpjs else []
+        results, pending = _batch_plan(documents, existing)
+        write_errors, operation_time = [], None
+        if pending:
+            with read_routing.write_session(self.mongo.cx, self.causal) as session:
+                try:
+                    self.collection.insert_many([documents[i] for i in pending], ordered=False, session=session)
+                except BulkWriteError as e:
+                    write_errors = e.details['writeErrors']
+                operation_time = session.operation_time if session is not None else None
+        return _batch_results(documents, results, pending, write_errors, operation_time)
+
+    def create_many(self, records):
+        """Cria vários fornecedores com um insert_many; CNPJs já cadastrados são ignorados."""
+        timestamp = datetime.utcnow()
+        batch = {}
+        for record in records:
+            record = normalize_supplier(record)
+            batch.setdefault(record.get('cnpj'), record)
+        for existing in self.collection.find({'cnpj': {'$in': list(batch)}, **LIVE}, {'cnpj': 1, '_id': 0}):
+            batch.pop(existing['cnpj'], None)
+        if not batch:
+            return 0
+        try:
+            with read_routing.write_session(self.mongo.cx, self.causal) as session:
+                documents = [_new_document(record, timestamp) for record in batch.values()]
+                return len(self.collection.insert_many(documents, ordered=False, session=session).inserted_ids)
+        except BulkWriteError as e:
+            # Duplicatas inseridas em paralelo por outro cliente
+            return e.details['nInserted']
+
+    def pending_migration(self):
+        """True se há documentos sem 'id' (anteriores ao formato atual)."""
+        return self.collection.find_one({'id': {'$exists': False}}, {'_id': 1}) is not None
+
+    def migrate(self, batch_size=MIGRATION_BATCH_SIZE):
+        """Migração única dos documentos antigos: grava 'id' e 'deleted_at' e normaliza cnpj/phone/email.
+
+        Executada por `flask migrate-data` (e `flask init-db`); documentos já
+        no formato atual não são regravados. Retorna quantos foram alterados.
+        """
+        fields = {'id': 1, 'cnpj': 1, 'phone': 1, 'email': 1, 'deleted_at': 1}
+        changed = 0
+        ops = []
+        for doc in self.collection.find({}, fields):
+            current = {k: v for k, v in doc.items() if k != '_id'}
+            target = normalize_supplier(current)
+            target['id'] = f"sup_{doc['_id']}"
+            # Sem o campo, o documento ficaria fora dos índices parciais e das leituras
+            target.setdefault('deleted_at', None)
+            if target != current:
+                ops.append(UpdateOne({'_id': doc['_id']}, {'$set': target}))
+            if len(ops) >= batch_size:
+                changed += self._flush_migration(ops)
+                ops = []
+        if ops:
+            changed += self._flush_migration(ops)
+        logger.info(f"Migração de fornecedores: {changed} documento(s) atualizado(s)")
+        return changed
+
+    def _flush_migration(self, ops):
+        try:
+            return self.collection.bulk_write(ops, ordered=False).modified_count
+        except BulkWriteError as e:
+            # Ex.: dois CNPJs que ficam iguais após a normalização (índice único)
+            errors = e.details.get('writeErrors', [])
+            logger.error(f"Migração: {len(errors)} fornecedor(es) não atualizado(s): {errors[:3]}")
+            return e.details.get('nModified', 0)
+
     def update(self, id, data):
-        # Remove o prefixo "sup_" se presente
-        mongo_id = id.replace("sup_", "") if id.startswith("sup_") else id
+        mongo_id = _mongo_id(id)
+        data = normalize_supplier(data)
         try:
             # Atualiza timestamp de atualização
             data['updated_at'] = datetime.utcnow()
             # Verifica CNPJ duplicado (exceto para o mesmo registro)
-            if self.collection.find_one({'cnpj': data['cnpj'], '_id': {'$ne': ObjectId(mongo_id)}}):
-                logger.warning(f"CNPJ duplicado detectado: {data['cnpj']}")
-                raise ValueError('CNPJ já cadastrado')
-            result = self.collection.update_one({'_id': ObjectId(mongo_id)}, {'$set': data})
+            if 'cnpj' in data and self.collection.find_one(
+                    {'cnpj': data['cnpj'], '_id': {'$ne': ObjectId(mongo_id)}, **LIVE}, {'_id': 1}):
+                raise _duplicate_cnpj(data['cnpj'])
+            with read_routing.write_session(self.mongo.cx, self.causal) as session:
+                result = self.collection.update_one(_live(mongo_id), {'$set': data}, session=session)
             if result.matched_count == 0:
                 logger.error(f"Fornecedor com ID {id} não encontrado para atualização.")
                 return None
             logger.info(f"Fornecedor com ID {id} atualizado com sucesso.")
             return self.get(id)
+        except DuplicateKeyError:
+            raise _duplicate_cnpj(data.get('cnpj'))
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao atualizar fornecedor com ID {id}: {e}")
             return None
 
     def delete(self, id):
-        # Remove o prefixo "sup_" se presente
-        mongo_id = id.replace("sup_", "") if id.startswith("sup_") else id
+        """Exclusão lógica: marca deleted_at; o arquivador move o documento depois."""
+        mongo_id = _mongo_id(id)
         try:
             logger.debug(f"Excluindo fornecedor com ID Mongo: {mongo_id}")
-            result = self.collection.delete_one({'_id': ObjectId(mongo_id)})
-            if result.deleted_count == 0:
+            timestamp = datetime.utcnow()
+            with read_routing.write_session(self.mongo.cx, self.causal) as session:
+                result = self.collection.update_one(
+                    _live(mongo_id), {'$set': {'deleted_at': timestamp, 'updated_at': timestamp}}, session=session)
+            if result.matched_count == 0:
+                logger.error(f"Fornecedor com ID {id} não encontrado para exclusão.")
+                return False
+            logger.info(f"Fornecedor com ID {id} excluído com sucesso.")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao excluir fornecedor com ID {id}: {e}")
+            return False
+
+    def archive(self, retention=DEFAULT_ARCHIVE_RETENTION, batch_size=ARCHIVE_BATCH_SIZE):
+        """Move para suppliers_archive os fornecedores excluídos há mais de `retention`.
+
+        Trabalha em lotes: cada lote é copiado com ReplaceOne/upsert por _id e
+        só então removido da coleção principal, de modo que uma interrupção
+        entre as duas etapas apenas repete a cópia. Retorna quantos foram movidos.
+        """
+        cutoff = datetime.utcnow() - retention
+        # Contém o filtro de DELETED: usa o índice parcial idx_supplier_deleted_at
+        query = {'deleted_at': {'$type': 'date', '$lt': cutoff}}
+        moved = 0
+        while True:
+            batch = list(self.collection.find(query).sort('deleted_at', ASCENDING).limit(batch_size))
+            if not batch:
+                break
+            archived_at = datetime.utcnow()
+            self.archive_collection.bulk_write(
+                [ReplaceOne({'_id': doc['_id']}, {**doc, 'archived_at': archived_at}, upsert=True) for doc in batch],
+                ordered=False)
+            result = self.collection.delete_many({'_id': {'$in': [doc['_id'] for doc in batch]}, **DELETED})
+            moved += result.deleted_count
+            if len(batch) < batch_size:
+                break
+        if moved:
+            logger.info(f"Arquivamento: {moved} fornecedor(es) movido(s) para 'suppliers_archive'")
+        return moved
+
+    def get_archive(self, limit=DEFAULT_PAGE_SIZE, after=None, cnpj=None):
+        """Página de fornecedores arquivados por cursor sobre o _id, com filtro opcional por CNPJ."""
+        limit = page_limit(limit)
+        query = _archive_query(after, normalize_cnpj(cnpj) if cnpj else None)
+        cursor = self.archive_collection.find(query, {'_id': 0}).sort('_id', ASCENDING).limit(limit + 1)
+        return paginate(cursor, limit)
+
+
+class AsyncSupplier:
+    """Versão assíncrona de Supplier (AsyncMongoClient), usada por api/asgi.py.
+
+    Mesmo comportamento e mesmos formatos de retorno da classe síncrona.
+    """
+
+    def __init__(self, db, read_preference=None, group_commit_ms=0, group_commit_max=256):
+        self.client = db.client
+        self.collection = db.suppliers
+        self.list_collection = self.collection.with_options(read_preference=read_preference) \
+            if read_preference is not None else self.collection
+        self.causal = read_preference is not None
+        self.group_commit = AsyncGroupCommit(self._insert_batch, group_commit_ms, group_commit_max) \
+            if group_commit_ms > 0 else None
+
+    async def get_all(self, after=None):
+        logger.debug("Buscando todos os fornecedores")
+        suppliers_dict = {}
+        async with read_routing.async_causal_session(self.client, after) as session:
+            async for s in self.list_collection.find(LIVE, PUBLIC_PROJECTION, session=session):
+                suppliers_dict[s['id']] = s
+        logger.debug(f"Fornecedores encontrados: {len(suppliers_dict)}")
+        return suppliers_dict
+
+    async def get(self, id):
+        try:
+            return await self.collection.find_one(_live(_mongo_id(id)), PUBLIC_PROJECTION)
+        except Exception as e:
+            logger.error(f"Erro ao obter fornecedor: {e}")
+            return None
+
+    async def create(self, data):
+        data = normalize_supplier(data)
+        try:
+            if self.group_commit is not None:
+                return _grouped_result(await self.group_commit.submit(_new_document(data, _bson_now())))
+            if 'cnpj' in data and await self.collection.find_one({'cnpj': data['cnpj'], **LIVE}, {'_id': 1}):
+                raise _duplicate_cnpj(data['cnpj'])
+            _new_document(data, datetime.utcnow())
+            async with read_routing.async_write_session(self.client, self.causal) as session:
+                result = await self.collection.insert_one(data, session=session)
+            return await self.get(str(result.inserted_id))
+        except DuplicateKeyError:
+            raise _duplicate_cnpj(data.get('cnpj'))
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao criar fornecedor: {e}")
+            raise
+
+    async def _insert_batch(self, documents):
+        cnpjs = [d['cnpj'] for d in documents if d.get('cnpj') is not None]
+        existing = [s['cnpj'] async for s in self.collection.find({'cnpj': {'$in': cnpjs}, **LIVE},
+                                                                  {'cnpj': 1, '_id': 0})] if cnpjs else []
+        results, pending = _batch_plan(documents, existing)
+        write_errors, operation_time = [], None
+        if pending:
+            async with read_routing.async_write_session(self.client, self.causal) as session:
+                try:
+                    await self.collection.insert_many([documents[i] for i in pending], ordered=False,
+                                                      session=session)
+                except BulkWriteError as e:
+                    write_errors = e.details['writeErrors']
+                operation_time = session.operation_time if session is not None else None
+        return _batch_results(documents, results, pending, write_errors, operation_time)
+
+    async def update(self, id, data):
+        mongo_id = _mongo_id(id)
+        data = normalize_supplier(data)
+        try:
+            data['updated_at'] = datetime.utcnow()
+            if 'cnpj' in data and await self.collection.find_one(
+                    {'cnpj': data['cnpj'], '_id': {'$ne': ObjectId(mongo_id)}, **LIVE}, {'_id': 1}):
+                raise _duplicate_cnpj(data['cnpj'])
+            async with read_routing.async_write_session(self.client, self.causal) as session:
+                result = await self.collection.update_one(_live(mongo_id), {'$set': data}, session=session)
+            if result.matched_count == 0:
+                logger.error(f"Fornecedor com ID {id} não encontrado para atualização.")
+                return None
+            logger.info(f"Fornecedor com ID {id} atualizado com sucesso.")
+            return await self.get(id)
+        except DuplicateKeyError:
+            raise _duplicate_cnpj(data.get('cnpj'))
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao atualizar fornecedor com ID {id}: {e}")
+            return None
+
+    async def delete(self, id):
+        try:
+            timestamp = datetime.utcnow()
+            async with read_routing.async_write_session(self.client, self.causal) as session:
+                result = await self.collection.update_one(
+                    _live(_mongo_id(id)), {'$set': {'deleted_at': timestamp, 'updated_at': timestamp}},
+                    session=session)
+            if result.matched_count == 0:
                 logger.error(f"Fornecedor com ID {id} não encontrado para exclusão.")
                 return False
             logger.info(f"Fornecedor com ID {id} excluído com sucesso.")
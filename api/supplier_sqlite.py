@@ -0,0 +1,227 @@
+import json
+import logging
+import sqlite3
+from datetime import datetime
+
+from bson import ObjectId
+
+from .repository import DEFAULT_ARCHIVE_RETENTION, DUPLICATE_CNPJ_MESSAGE, SupplierRepository
+from .sqlite_db import from_legacy_text, load_documents, sortable_text, to_text
+from .utils import DEFAULT_PAGE_SIZE, normalize_cnpj, normalize_supplier, page_limit, paginate, project
+from .supplier_mongo import _mongo_id
+
+logger = logging.getLogger(__name__)
+
+# Lotes da migração (executemany) e do arquivador
+MIGRATION_BATCH_SIZE = 1000
+ARCHIVE_BATCH_SIZE = 500
+
+# A coluna data guarda o documento público completo (id "sup_", timestamps
+# em texto ISO 8601): as leituras devolvem o JSON gravado, sem transformação.
+# Exclusão lógica: só linhas com deleted_at nulo são lidas ou alteradas
+SELECT_ALL = 'SELECT data FROM suppliers WHERE deleted_at IS NULL ORDER BY id'
+SELECT_ONE = 'SELECT data FROM suppliers WHERE id = ? AND deleted_at IS NULL'
+# Lista de ids em um único parâmetro JSON: a mesma instrução compilada serve para qualquer lote
+SELECT_MANY = ('SELECT data FROM suppliers WHERE id IN (SELECT value FROM json_each(?)) AND deleted_at IS NULL '
+               'ORDER BY id')
+SELECT_PAGE = 'SELECT data FROM suppliers WHERE id > ? AND deleted_at IS NULL ORDER BY id LIMIT ?'
+SELECT_FOR_UPDATE = 'SELECT created_at, data FROM suppliers WHERE id = ? AND deleted_at IS NULL'
+SELECT_RAW = 'SELECT id, created_at, updated_at, data FROM suppliers'
+SELECT_PENDING = "SELECT 1 FROM suppliers WHERE json_extract(data, '$.id') IS NULL LIMIT 1"
+INSERT = ('INSERT INTO suppliers (id, cnpj, name, created_at, updated_at, data) '
+          'VALUES (?, ?, ?, ?, ?, ?)')
+INSERT_IGNORE = INSERT.replace('INSERT', 'INSERT OR IGNORE', 1)
+UPDATE = 'UPDATE suppliers SET cnpj = ?, name = ?, created_at = ?, updated_at = ?, data = ? WHERE id = ?'
+SOFT_DELETE = ("UPDATE suppliers SET deleted_at = ?, updated_at = ?, data = json_set(data, '$.updated_at', ?) "
+               "WHERE id = ? AND deleted_at IS NULL")
+# Arquivador: excluídos antes do corte, em ordem de exclusão (índice idx_supplier_deleted_at)
+SELECT_EXPIRED = ('SELECT id FROM suppliers WHERE deleted_at IS NOT NULL AND deleted_at < ? '
+                  'ORDER BY deleted_at LIMIT ?')
+ARCHIVE_ROWS = ("INSERT OR REPLACE INTO suppliers_archive (id, cnpj, deleted_at, archived_at, data) "
+                "SELECT id, cnpj, deleted_at, ?, json_set(data, '$.deleted_at', deleted_at, '$.archived_at', ?) "
+                "FROM suppliers WHERE id IN (SELECT value FROM json_each(?)) AND deleted_at IS NOT NULL")
+DELETE_ARCHIVED = 'DELETE FROM suppliers WHERE id IN (SELECT value FROM json_each(?)) AND deleted_at IS NOT NULL'
+SELECT_ARCHIVE = 'SELECT data FROM suppliers_archive WHERE id > ?'
+
+
+def _document(id, data):
+    # Documento no formato de supplier_mongo.Supplier.get, pronto para serializar
+    document = {k: v for k, v in data.items() if k != '_id'}
+    document['id'] = f"sup_{id}"
+    document['created_at'] = to_text(document.get('created_at'))
+    document['updated_at'] = to_text(document.get('updated_at'))
+    return document
+
+
+def _row(id, document):
+    return (id, document.get('cnpj'), document.get('name'), document['created_at'], document['updated_at'],
+            json.dumps(document, ensure_ascii=False))
+
+
+class Supplier(SupplierRepository):
+    """Fornecedores no SQLite, com os mesmos métodos e retornos de supplier_mongo.Supplier.
+
+    Os ids seguem o formato do MongoDB (ObjectId com prefixo "sup_"), de
+    modo que os dados podem ser migrados entre os backends.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def ensure_indexes(self):
+        """O schema (tabela e índices) é criado na primeira conexão."""
+        self.db.connection
+        logger.info("Índices 'idx_supplier_cnpj' e 'idx_supplier_name' garantidos no SQLite.")
+
+    def get_all(self, after=None):
+        # Como em supplier_mongo: erros chegam à rota em vez de virar lista vazia
+        logger.debug("Buscando todos os fornecedores")
+        suppliers_dict = {s['id']: s for s in load_documents(self.db.connection, SELECT_ALL)}
+        logger.debug(f"Fornecedores encontrados: {len(suppliers_dict)}")
+        return suppliers_dict
+
+    def get(self, id):
+        try:
+            row = self.db.connection.execute(SELECT_ONE, (_mongo_id(id),)).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"Erro ao obter fornecedor: {e}")
+            return None
+
+    def get_many(self, ids, fields=None):
+        """Leitura em lote com uma única consulta (IN sobre json_each)."""
+        documents = load_documents(self.db.connection, SELECT_MANY, (json.dumps([_mongo_id(id) for id in ids]),))
+        return {s['id']: project(s, fields) for s in documents}
+
+    def get_page(self, limit=DEFAULT_PAGE_SIZE, after=None, fields=None, read_after=None):
+        """Página por cursor sobre o id (ver SupplierRepository.get_page)."""
+        limit = page_limit(limit)
+        documents = load_documents(self.db.connection, SELECT_PAGE, (_mongo_id(after) if after else '', limit + 1))
+        return paginate(documents if fields is None else (project(s, fields) for s in documents), limit)
+
+    def create(self, data):
+        data = normalize_supplier(data)
+        try:
+            # Adiciona timestamps de criação e atualização
+            timestamp = datetime.utcnow()
+            data['created_at'] = timestamp
+            data['updated_at'] = timestamp
+            id = str(ObjectId())
+            document = _document(id, data)
+            self.db.connection.execute(INSERT, _row(id, document))
+            return document
+        except sqlite3.IntegrityError:
+            logger.warning(f"CNPJ duplicado detectado: {data.get('cnpj')}")
+            raise ValueError(DUPLICATE_CNPJ_MESSAGE)
+        except Exception as e:
+            logger.error(f"Erro ao criar fornecedor: {e}")
+            raise
+
+    def create_many(self, records):
+        """Insere vários fornecedores em uma transação (executemany).
+
+        CNPJs já cadastrados são ignorados; retorna quantos foram inseridos.
+        """
+        timestamp = datetime.utcnow()
+        rows = []
+        for record in records:
+            id = str(ObjectId())
+            data = {**normalize_supplier(record), 'created_at': timestamp, 'updated_at': timestamp}
+            rows.append(_row(id, _document(id, data)))
+        with self.db.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(INSERT_IGNORE, rows)
+            return conn.total_changes - before
+
+    def pending_migration(self):
+        """True se há linhas no formato anterior (id só na coluna)."""
+        return self.db.connection.execute(SELECT_PENDING).fetchone() is not None
+
+    def migrate(self, batch_size=MIGRATION_BATCH_SIZE):
+        """Migração única das linhas antigas para o documento público completo.
+
+        Grava id e timestamps no JSON e normaliza cnpj/phone/email; linhas já
+        no formato atual não são regravadas. Retorna quantas foram alteradas.
+        """
+        changed = 0
+        with self.db.transaction() as conn:
+            rows = []
+            for row in conn.execute(SELECT_RAW).fetchall():
+                current = json.loads(row['data'])
+                data = {'created_at': from_legacy_text(row['created_at']),
+                        'updated_at': from_legacy_text(row['updated_at']),
+                        **normalize_supplier(current)}
+                document = _document(row['id'], data)
+                if document != current:
+                    rows.append(_row(row['id'], document)[1:] + (row['id'],))
+                if len(rows) >= batch_size:
+                    conn.executemany(UPDATE, rows)
+                    changed += len(rows)
+                    rows = []
+            conn.executemany(UPDATE, rows)
+            changed += len(rows)
+        logger.info(f"Migração de fornecedores: {changed} linha(s) atualizada(s)")
+        return changed
+
+    def update(self, id, data):
+        mongo_id = _mongo_id(id)
+        data = normalize_supplier(data)
+        try:
+            with self.db.transaction() as conn:
+                row = conn.execute(SELECT_FOR_UPDATE, (mongo_id,)).fetchone()
+                if row is None:
+                    logger.error(f"Fornecedor com ID {id} não encontrado para atualização.")
+                    return None
+                # Atualiza timestamp de atualização
+                data['updated_at'] = datetime.utcnow()
+                document = _document(mongo_id, {'created_at': row['created_at'], **json.loads(row['data']), **data})
+                conn.execute(UPDATE, _row(mongo_id, document)[1:] + (mongo_id,))
+            logger.info(f"Fornecedor com ID {id} atualizado com sucesso.")
+            return document
+        except sqlite3.IntegrityError:
+            logger.warning(f"CNPJ duplicado detectado: {data['cnpj']}")
+            raise ValueError(DUPLICATE_CNPJ_MESSAGE)
+
+    def delete(self, id):
+        """Exclusão lógica: marca deleted_at; archive() move a linha depois."""
+        try:
+            logger.debug(f"Excluindo fornecedor com ID: {id}")
+            timestamp = datetime.utcnow()
+            cursor = self.db.connection.execute(
+                SOFT_DELETE, (sortable_text(timestamp), to_text(timestamp), to_text(timestamp), _mongo_id(id)))
+            if cursor.rowcount == 0:
+                logger.error(f"Fornecedor com ID {id} não encontrado para exclusão.")
+                return False
+            logger.info(f"Fornecedor com ID {id} excluído com sucesso.")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao excluir fornecedor com ID {id}: {e}")
+            return False
+
+    def archive(self, retention=DEFAULT_ARCHIVE_RETENTION, batch_size=ARCHIVE_BATCH_SIZE):
+        """Move para suppliers_archive os excluídos há mais de `retention`, um lote por transação."""
+        cutoff = sortable_text(datetime.utcnow() - retention)
+        moved = 0
+        while True:
+            with self.db.transaction() as conn:
+                ids = [row[0] for row in conn.execute(SELECT_EXPIRED, (cutoff, batch_size))]
+                if ids:
+                    archived_at = sortable_text(datetime.utcnow())
+                    batch = json.dumps(ids)
+                    conn.execute(ARCHIVE_ROWS, (archived_at, archived_at, batch))
+                    moved += conn.execute(DELETE_ARCHIVED, (batch,)).rowcount
+            if len(ids) < batch_size:
+                break
+        if moved:
+            logger.info(f"Arquivamento: {moved} fornecedor(es) movido(s) para 'suppliers_archive'")
+        return moved
+
+    def get_archive(self, limit=DEFAULT_PAGE_SIZE, after=None, cnpj=None):
+        """Página de fornecedores arquivados por cursor sobre o id, com filtro opcional por CNPJ."""
+        limit = page_limit(limit)
+        sql, params = SELECT_ARCHIVE, [_mongo_id(after) if after else '']
+        if cnpj:
+            sql += ' AND cnpj = ?'
+            params.append(normalize_cnpj(cnpj))
+        params.append(limit + 1)
+        return paginate(load_documents(self.db.connection, sql + ' ORDER BY id LIMIT ?', params), limit)
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import pytest
+from flask_jwt_extended import create_access_token, create_refresh_token
+from api.wsgi import app
+from api.asgi import app as asgi_app
+from api import metrics
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def asgi_request(method, path, headers=None, body=None):
+    """Executa uma requisição na aplicação ASGI e devolve (status, headers, corpo)."""
+    raw = json.dumps(body).encode() if body is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'scheme': 'http', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+        'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': raw, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start = messages[0]
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    return start['status'], {k.decode(): v.decode() for k, v in start['headers']}, body
+
+
+def auth_header(token_factory=create_access_token):
+    with app.app_context():
+        return {'Authorization': f'Bearer {token_factory(identity="teste")}'}
+
+
+def test_missing_token_same_as_flask(client):
+    status, _, body = asgi_request('GET', '/suppliers')
+    flask_response = client.get('/suppliers')
+    assert status == flask_response.status_code == 401
+    assert json.loads(body) == flask_response.get_json()
+
+
+def test_invalid_and_refresh_tokens_rejected():
+    status, _, body = asgi_request('GET', '/suppliers', {'Authorization': 'Bearer lixo'})
+    assert status == 422
+    status, _, body = asgi_request('GET', '/suppliers/sup_1', auth_header(create_refresh_token))
+    assert status == 422
+    assert json.loads(body) == {'msg': 'Only non-refresh tokens are allowed'}
+
+
+def test_validation_error_same_as_flask(client):
+    headers = auth_header()
+    payload = {'name': '', 'cnpj': '123'}
+    status, response_headers, body = asgi_request('POST', '/suppliers', headers, payload)
+    flask_response = client.post('/suppliers', json=payload, headers=headers)
+    assert status == flask_response.status_code == 400
+    assert json.loads(body) == flask_response.get_json()
+    assert response_headers['x-content-type-options'] == 'nosniff'
+    assert 'jwt;dur=' in response_headers['server-timing']
+    assert 'validate;dur=' in response_headers['server-timing']
+
+
+def test_async_routes_record_metrics():
+    if not asgi_app.enabled:
+        pytest.skip('Rotas assíncronas desligadas (DATABASE_BACKEND=sqlite)')
+    status, _, _ = asgi_request('PUT', '/suppliers/sup_1', auth_header(), {'name': ''})
+    assert status == 400
+    text = metrics.registry.render()
+    assert 'esk_http_requests_total{route="/suppliers/<id>",method="PUT",status="400"}' in text
+    assert 'esk_http_requests_in_flight{route="/suppliers/<id>"} 0' in text
+
+
+def test_other_routes_served_by_flask():
+    status, headers, body = asgi_request('GET', '/api/swagger.json')
+    assert status == 200
+    assert 'openapi' in json.loads(body)
@@ -0,0 +1,201 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.app import create_app
+from api.audit import AuditLog, Audited, SQLiteAuditStore, acting_as, format_cursor, parse_cursor
+from api.sqlite_db import SQLiteDatabase
+
+
+class ListStore:
+    """Store em memória: guarda cada lote recebido."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.written = threading.Event()
+
+    def insert_many(self, events):
+        if self.fail:
+            raise RuntimeError('banco indisponível')
+        self.batches.append(list(events))
+        self.written.set()
+
+
+def test_flushes_when_batch_is_full():
+    store = ListStore()
+    log = AuditLog(lambda: store, batch_size=3, flush_ms=60000)
+    for i in range(3):
+        log.record('supplier', f'sup_{i}', 'update', ['name'])
+    assert store.written.wait(2)
+    assert [len(batch) for batch in store.batches] == [3]
+    log.close()
+
+
+def test_flushes_after_interval():
+    store = ListStore()
+    log = AuditLog(lambda: store, batch_size=100, flush_ms=20)
+    start = time.monotonic()
+    log.record('user', 'u1', 'create', ['username'])
+    assert store.written.wait(2)
+    assert time.monotonic() - start >= 0.015
+    assert store.batches[0][0]['entity_id'] == 'u1'
+    log.close()
+
+
+def test_drops_when_queue_is_full_and_close_flushes():
+    store = ListStore()
+    release = threading.Event()
+    writing = threading.Event()
+
+    def blocked_store():
+        # O worker fica preso no primeiro lote enquanto a fila enche
+        writing.set()
+        release.wait(2)
+        return store
+
+    log = AuditLog(blocked_store, batch_size=1, flush_ms=60000, queue_size=2)
+    log.record('supplier', 'sup_0', 'delete')
+    assert writing.wait(2)
+    for i in range(1, 5):
+        log.record('supplier', f'sup_{i}', 'delete')
+    assert log.dropped == 2
+    release.set()
+    assert log.close() is True
+    assert [e['entity_id'] for batch in store.batches for e in batch] == ['sup_0', 'sup_1', 'sup_2']
+    assert log.written == 3
+
+
+def test_dropped_counted_across_threads():
+    release = threading.Event()
+    writing = threading.Event()
+
+    def blocked_store():
+        writing.set()
+        release.wait(5)
+        return ListStore()
+
+    log = AuditLog(blocked_store, batch_size=1, flush_ms=60000, queue_size=1)
+    log.record('supplier', 'sup_0', 'delete')
+    assert writing.wait(2)
+
+    def producer():
+        for _ in range(500):
+            log.record('supplier', 'sup_1', 'update')
+
+    threads = [threading.Thread(target=producer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Um evento cabe na fila; os demais são descartados e contados sem perda de incrementos
+    assert log.dropped == 8 * 500 - 1
+    release.set()
+    assert log.close() is True
+
+
+def test_failed_batch_is_dropped():
+    store = ListStore(fail=True)
+    log = AuditLog(lambda: store, batch_size=1, flush_ms=60000)
+    log.record('supplier', 'sup_1', 'create')
+    assert log.flush() is True
+    assert log.dropped == 1 and log.written == 0
+    log.close()
+
+
+def test_audited_records_field_names_and_actor():
+    store = ListStore()
+    log = AuditLog(lambda: store)
+
+    class Model:
+        def update(self, id, data):
+            return {'id': id, **data}
+
+        def delete(self, id):
+            return False
+
+        def get(self, id):
+            return {'id': id}
+
+    model = Audited(Model(), 'user', log)
+    with acting_as('admin-1'):
+        model.update('u1', {'password': 'segredo', 'email': 'a@b.com'})
+        model.delete('u2')
+    assert model.get('u3') == {'id': 'u3'}
+    log.close()
+    [event] = store.batches[0]
+    assert event['actor'] == 'admin-1' and event['action'] == 'update'
+    assert event['fields'] == ['email', 'password'] and 'segredo' not in str(event)
+
+
+def test_sqlite_history_pagination(tmp_path):
+    db = SQLiteDatabase(tmp_path / 'audit.sqlite3')
+    store = SQLiteAuditStore(db)
+    base = datetime(2026, 1, 1)
+    store.insert_many([{'ts': base + timedelta(seconds=i), 'entity': 'supplier', 'entity_id': 'sup_1',
+                        'action': 'update', 'actor': 'a', 'fields': ['name']} for i in range(3)])
+    events, cursor = store.history('supplier', 'sup_1', limit=2)
+    assert [e['ts'] for e in events] == ['2026-01-01T00:00:02.000000Z', '2026-01-01T00:00:01.000000Z']
+    assert cursor == '2026-01-01T00:00:01.000000Z_2'
+    events, cursor = store.history('supplier', 'sup_1', limit=2, before=parse_cursor(cursor))
+    assert len(events) == 1 and cursor is None
+    db.close()
+
+
+def test_sqlite_history_pagination_same_ts(tmp_path):
+    db = SQLiteDatabase(tmp_path / 'audit.sqlite3')
+    store = SQLiteAuditStore(db)
+    ts = datetime(2026, 1, 1)
+    # Lote gravado no mesmo instante: o cursor (ts, id) não pula eventos
+    store.insert_many([{'ts': ts, 'entity': 'supplier', 'entity_id': 'sup_1', 'action': 'update',
+                        'actor': 'a', 'fields': [f'campo{i}']} for i in range(5)])
+    seen, cursor = [], None
+    while True:
+        events, cursor = store.history('supplier', 'sup_1', limit=2,
+                                       before=parse_cursor(cursor) if cursor else None)
+        seen += [e['fields'][0] for e in events]
+        if cursor is None:
+            break
+    assert seen == [f'campo{i}' for i in reversed(range(5))]
+    db.close()
+
+
+def test_parse_cursor():
+    assert parse_cursor(format_cursor(datetime(2026, 1, 1, 12), 'abc')) == (datetime(2026, 1, 1, 12), 'abc')
+    for cursor in ('ontem', '2026-01-01T00:00:00Z', 'x_1'):
+        with pytest.raises(ValueError):
+            parse_cursor(cursor)
+
+
+def test_audit_endpoint(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE_BACKEND': 'sqlite', 'AUDIT_FLUSH_MS': 1,
+                      'SQLITE_PATH': str(tmp_path / 'app.sqlite3')})
+    client = app.test_client()
+    with app.app_context():
+        from api.app import user
+        admin = user.create({'username': 'chefe', 'email': 'chefe@teste.com', 'password': 'senha123',
+                             'role': 'admin', 'active': True})
+    token = client.post('/auth/login', json={'username': 'chefe', 'password': 'senha123'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    payload = {'name': 'Fornecedor 1', 'cnpj': '00000000000001', 'email': 'f1@teste.com', 'phone': '11999999999'}
+    created = client.post('/suppliers', json=payload, headers=headers).get_json()['data']
+    client.put(f"/suppliers/{created['id']}", json={**payload, 'name': 'Novo'}, headers=headers)
+    assert app.extensions['esk_audit'].flush()
+
+    body = client.get(f"/admin/audit/supplier/{created['id']}", headers=headers).get_json()
+    assert [e['action'] for e in body['data']] == ['update', 'create']
+    assert {e['actor'] for e in body['data']} == {admin['id']}
+    assert body['next_cursor'] is None
+    user_events = client.get(f"/admin/audit/user/{admin['id']}", headers=headers).get_json()['data']
+    assert [e['action'] for e in user_events] == ['create'] and user_events[0]['actor'] is None
+    assert client.get('/admin/audit/pedido/1', headers=headers).status_code == 404
+    assert client.get('/admin/audit/user/1?before=ontem', headers=headers).status_code == 400
+    assert client.get('/admin/audit/user/1?before=2026-01-01T00:00:00.000000Z_x', headers=headers).status_code == 400
+    first = client.get(f"/admin/audit/supplier/{created['id']}?limit=1", headers=headers).get_json()
+    assert [e['action'] for e in first['data']] == ['update'] and first['next_cursor']
+    rest = client.get(f"/admin/audit/supplier/{created['id']}?limit=1&before={first['next_cursor']}",
+                      headers=headers).get_json()
+    assert [e['action'] for e in rest['data']] == ['create'] and rest['next_cursor'] is None
+    app.extensions['esk_audit'].close()
@@ -103,7 +103,7 @@ def test_create_supplier_unauthenticated(client):
     assert "msg" in data or "message" in data
 import pytest
 import random
-from api.app import app
+from api.wsgi import app
 
 @pytest.fixture
 def client():
@@ -0,0 +1,90 @@
+import gzip
+import zlib
+import pytest
+from flask import Flask, stream_with_context
+from api import compression
+
+LARGE = {'success': True, 'data': [
+    {'name': f'Fornecedor {i}', 'email': f'contato{i}@exemplo.com.br', 'created_at': '2025-07-30T12:00:00'}
+    for i in range(200)
+]}
+
+
+@pytest.fixture
+def compress_app(tmp_path):
+    (tmp_path / 'app.js').write_text('console.log("original");\n' * 50)
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path='/frontend')
+    app.config.update(COMPRESS_ENABLED=True, COMPRESS_MIN_SIZE=500, COMPRESS_LEVEL=6,
+                      COMPRESS_ALGORITHMS=['zstd', 'br', 'gzip'])
+
+    @app.route('/large')
+    def large():
+        return LARGE
+
+    @app.route('/small')
+    def small():
+        return {'success': True}
+
+    @app.route('/stream')
+    def stream():
+        def generate():
+            for i in range(100):
+                yield f'linha {i}\n'
+        return app.response_class(stream_with_context(generate()), mimetype='text/plain')
+
+    compression.init_app(app)
+    return app
+
+
+def test_negotiate_respects_quality_and_server_preference():
+    assert compression.negotiate('gzip', ['zstd', 'br', 'gzip']) == 'gzip'
+    assert compression.negotiate('gzip;q=0.5, identity', ['gzip']) == 'gzip'
+    assert compression.negotiate('gzip;q=0', ['gzip']) is None
+    assert compression.negotiate('', ['gzip']) is None
+    assert compression.negotiate('br, gzip', ['gzip', 'br']) == 'gzip'
+
+
+def test_large_json_compressed_with_gzip(compress_app):
+    response = compress_app.test_client().get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) == len(response.data)
+    raw = gzip.decompress(response.data)
+    assert b'Fornecedor 199' in raw
+    assert len(response.data) * 5 < len(raw)
+
+
+def test_small_or_unsupported_not_compressed(compress_app):
+    client = compress_app.test_client()
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/large').headers
+
+
+def test_streamed_response_compressed_incrementally(compress_app):
+    response = compress_app.test_client().get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert zlib.decompress(response.data, 31).decode().endswith('linha 99\n')
+
+
+def test_optional_encoders_when_installed(compress_app):
+    pytest.importorskip('brotli')
+    import brotli
+    response = compress_app.test_client().get('/large', headers={'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert b'Fornecedor 199' in brotli.decompress(response.data)
+
+
+def test_precompressed_static_variant(compress_app, tmp_path):
+    assert compression.precompress_static(tmp_path) == 1
+    assert compression.precompress_static(tmp_path) == 0
+    client = compress_app.test_client()
+    response = client.get('/frontend/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype in ('text/javascript', 'application/javascript')
+    assert gzip.decompress(response.data).startswith(b'console.log("original");')
+    response.close()
+    response = client.get('/frontend/app.js')
+    assert 'Content-Encoding' not in response.headers
+    assert response.data.startswith(b'console.log')
+    response.close()
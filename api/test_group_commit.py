@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from api.group_commit import AsyncGroupCommit, GroupCommit
+from api.supplier_mongo import _batch_plan, _batch_results
+
+
+def _echo(batches):
+    def write(items):
+        batches.append(list(items))
+        return [ValueError(item) if item < 0 else item * 10 for item in items]
+    return write
+
+
+def test_concurrent_calls_share_one_write():
+    batches = []
+    group = GroupCommit(_echo(batches), window_ms=200, max_size=8)
+    results, errors = {}, {}
+
+    def call(i):
+        try:
+            results[i] = group.submit(i)
+        except ValueError as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in (1, 2, -3, 4, 5, 6, 7, 8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    # Lote cheio (max_size) antes do fim da janela: uma única escrita
+    assert group.batches == 1 and sorted(batches[0]) == [-3, 1, 2, 4, 5, 6, 7, 8]
+    assert results == {i: i * 10 for i in (1, 2, 4, 5, 6, 7, 8)}
+    assert list(errors) == [-3]
+
+
+def test_lone_call_waits_only_the_window():
+    batches = []
+    group = GroupCommit(_echo(batches), window_ms=5)
+    assert group.submit(1) == 10
+    assert group.submit(2) == 20
+    assert batches == [[1], [2]]
+
+
+def test_failed_write_reaches_every_caller():
+    def write(items):
+        raise ConnectionError('banco indisponível')
+
+    group = GroupCommit(write, window_ms=1)
+    with pytest.raises(ConnectionError):
+        group.submit(1)
+
+
+def test_async_group_commit():
+    batches = []
+
+    async def write(items):
+        return _echo(batches)(items)
+
+    async def main():
+        group = AsyncGroupCommit(write, window_ms=50, max_size=256)
+        return await asyncio.gather(*(group.submit(i) for i in (1, 2, -3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert results[:2] == [10, 20] and isinstance(results[2], ValueError)
+    assert batches == [[1, 2, -3]]
+
+
+def test_batch_results_per_document():
+    documents = [{'_id': i, 'id': f'sup_{i}', 'cnpj': cnpj, 'deleted_at': None}
+                 for i, cnpj in enumerate(['1', '2', '1', '3', '4'])]
+    # '3' já cadastrado; '1' repetido no próprio lote
+    results, pending = _batch_plan(documents, ['3'])
+    assert pending == [0, 1, 4]
+    # '4' inserido em paralelo por outro processo (índice único)
+    results = _batch_results(documents, results, pending, [{'index': 2, 'code': 11000}], 'op')
+    assert results[0] == ({'id': 'sup_0', 'cnpj': '1'}, 'op')
+    assert results[1][0]['id'] == 'sup_1'
+    assert all(isinstance(results[i], ValueError) for i in (2, 3, 4))
@@ -0,0 +1,52 @@
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from bson import ObjectId
+from flask import Flask
+from api.app import create_app, reset_mongo_client
+from api.wsgi import app
+from api import json_provider
+
+DOCUMENT = {
+    'id': 'sup_64c6b7f0a1b2c3d4e5f60718',
+    'name': 'Fornecedor Ação',
+    'owner_id': ObjectId('64c6b7f0a1b2c3d4e5f60718'),
+    'created_at': datetime(2025, 7, 30, 12, 0, 0, 123000),
+    'updated_at': datetime(2025, 7, 30, 12, 0, 0),
+    'local': datetime(2025, 7, 30, 9, 0, tzinfo=timezone(timedelta(hours=-3))),
+    'day': date(2025, 7, 30),
+    'count': 3,
+}
+EXPECTED = (
+    '{"id":"sup_64c6b7f0a1b2c3d4e5f60718","name":"Fornecedor Ação",'
+    '"owner_id":"64c6b7f0a1b2c3d4e5f60718","created_at":"2025-07-30T12:00:00.123000Z",'
+    '"updated_at":"2025-07-30T12:00:00Z","local":"2025-07-30T09:00:00-03:00",'
+    '"day":"2025-07-30","count":3}'
+)
+
+
+@pytest.mark.parametrize('name', sorted(json_provider.PROVIDERS))
+def test_providers_share_the_same_format(name):
+    provider = json_provider.get_provider_class(name)(Flask(__name__))
+    assert provider.dumps(DOCUMENT) == EXPECTED
+    assert provider.dumps_bytes(DOCUMENT) == EXPECTED.encode('utf-8')
+    assert provider.loads(EXPECTED)['owner_id'] == '64c6b7f0a1b2c3d4e5f60718'
+
+
+def test_unknown_type_raises_type_error():
+    provider = json_provider.StdlibJSONProvider(Flask(__name__))
+    with pytest.raises(TypeError):
+        provider.dumps({'valor': object()})
+
+
+def test_unknown_provider_rejected():
+    with pytest.raises(ValueError):
+        json_provider.get_provider_class('simplejson')
+
+
+def test_app_uses_configured_provider():
+    assert isinstance(app.json, json_provider.get_provider_class('auto'))
+    stdlib_app = create_app({'JSON_PROVIDER': 'stdlib'})
+    assert type(stdlib_app.json) is json_provider.StdlibJSONProvider
+    # O Flask-PyMongo redefine app.json ao recriar o cliente após o fork
+    reset_mongo_client(stdlib_app)
+    assert type(stdlib_app.json) is json_provider.StdlibJSONProvider
@@ -0,0 +1,93 @@
+import json
+import pytest
+from api.json_store import JsonStore
+from api.supplier import Supplier
+from api.user import User
+
+
+def test_store_indexes_and_log(tmp_path):
+    path = tmp_path / 'itens.json'
+    store = JsonStore(path, indexes=('cnpj',))
+    store.put('a', {'name': 'A', 'cnpj': '1'})
+    store.put('b', {'name': 'B', 'cnpj': '2'})
+    store.put('a', {'name': 'A2', 'cnpj': '3'})
+    assert store.find('cnpj', '1') == set()
+    assert store.find_one('cnpj', '3')['name'] == 'A2'
+    assert store.delete('b') and not store.delete('b')
+    # Escritas só acrescentam linhas ao log; o snapshot não é regravado
+    assert not path.exists()
+    assert len(store.log_path.read_text().splitlines()) == 4
+    assert store.all() == {'a': {'name': 'A2', 'cnpj': '3', 'id': 'a'}}
+
+
+def test_compaction_is_atomic_and_visible_to_other_instances(tmp_path):
+    path = tmp_path / 'itens.json'
+    writer = JsonStore(path, indexes=('cnpj',), compact_every=3)
+    reader = JsonStore(path, indexes=('cnpj',))
+    writer.put('a', {'cnpj': '1'})
+    assert reader.get('a') == {'cnpj': '1', 'id': 'a'}
+    writer.put('b', {'cnpj': '2'})
+    writer.put('c', {'cnpj': '3'})
+    # Terceira operação: snapshot regravado e log reiniciado
+    assert json.loads(path.read_text(encoding='utf-8')) == writer.all()
+    assert writer.log_path.read_bytes() == b''
+    writer.delete('a')
+    assert set(reader.all()) == {'b', 'c'}
+    assert reader.find('cnpj', '1') == set()
+
+
+def test_partial_log_line_ignored_until_complete(tmp_path):
+    path = tmp_path / 'itens.json'
+    store = JsonStore(path)
+    store.put('a', {'name': 'A'})
+    with open(store.log_path, 'ab') as f:
+        f.write(b'{"op":"set","id":"b","data":{"name":"B","id":"b"}')
+    assert store.get('b') is None
+    with open(store.log_path, 'ab') as f:
+        f.write(b'}\n')
+    assert store.get('b') == {'name': 'B', 'id': 'b'}
+
+
+def test_supplier_json_backend(tmp_path):
+    path = tmp_path / 'suppliers.json'
+    suppliers = Supplier(path)
+    assert len(suppliers.get_all()) == 3
+    created = suppliers.create({'name': 'Nova', 'cnpj': '11.222.333/0001-81', 'email': ' a@b.com ',
+                                'phone': '(11) 99999-0000'})
+    assert created['cnpj'] == '11222333000181' and created['email'] == 'a@b.com'
+    with pytest.raises(ValueError):
+        suppliers.create({'name': 'Outra', 'cnpj': '11222333000181'})
+    other = Supplier(path)
+    assert other.get(created['id'])['name'] == 'Nova'
+    assert other.update(created['id'], {'name': 'Renomeada', 'cnpj': '11222333000181'})['name'] == 'Renomeada'
+    with pytest.raises(ValueError):
+        other.update(created['id'], {'cnpj': '12345678000190'})
+    assert suppliers.get(created['id'])['name'] == 'Renomeada'
+    assert suppliers.delete(created['id']) and suppliers.get(created['id']) is None
+
+
+def test_user_json_backend(tmp_path):
+    users = User(tmp_path / 'users.json')
+    created = users.create({'username': 'maria', 'email': 'maria@exemplo.com', 'password': 'segredo123'})
+    with pytest.raises(ValueError):
+        users.create({'username': 'maria', 'email': 'outra@exemplo.com', 'password': 'x'})
+    assert users.get_by_email('maria@exemplo.com')['id'] == created['id']
+    assert users.authenticate('maria', 'segredo123')['id'] == created['id']
+    assert users.authenticate('admin', 'admin123') is not None
+    users.update(created['id'], {'role': 'admin'})
+    assert users.get_by_username('maria')['role'] == 'admin'
+    assert users.delete(created['id']) and users.get_by_username('maria') is None
+
+
+def test_supplier_json_migrate_normalizes_legacy_records(tmp_path):
+    path = tmp_path / 'suppliers.json'
+    path.write_text(json.dumps({'sup_1': {'name': 'Antiga', 'cnpj': '11.222.333/0001-81',
+                                          'phone': '(11) 9999-0000'}}), encoding='utf-8')
+    suppliers = Supplier(path)
+    # Leituras devolvem o registro como gravado; a normalização é feita uma única vez
+    assert suppliers.get('sup_1')['cnpj'] == '11.222.333/0001-81'
+    assert suppliers.migrate() == 1
+    assert suppliers.get_all() == {'sup_1': {'id': 'sup_1', 'name': 'Antiga', 'cnpj': '11222333000181',
+                                             'phone': '1199990000'}}
+    assert json.loads(path.read_text(encoding='utf-8')) == suppliers.get_all()
+    assert suppliers.migrate() == 0
@@ -0,0 +1,90 @@
+import urllib.request
+import pytest
+from api.app import create_app, start_metrics_server
+from api.wsgi import app
+from api import app as app_module, metrics
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def get_jwt_token(client, username="admin", password="admin123"):
+    response = client.post('/auth/login', json={"username": username, "password": password})
+    assert response.status_code == 200
+    return response.get_json()['token']
+
+
+def test_histogram_render():
+    registry = metrics.Registry()
+    hist = registry.histogram('t_latency_seconds', 'Teste', ('route',), buckets=(0.1, 1.0))
+    hist.observe(('/a',), 0.05)
+    hist.observe(('/a',), 0.5)
+    hist.observe(('/a',), 5)
+    text = registry.render()
+    assert 't_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 't_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 't_latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_label_escaping():
+    registry = metrics.Registry()
+    counter = registry.counter('t_total', 'Teste', ('path',))
+    counter.inc(('a"b',), 2)
+    assert 't_total{path="a\\"b"} 2' in registry.render()
+
+
+def test_request_metrics_recorded_per_route(client):
+    client.get('/api/swagger.json')
+    text = metrics.registry.render()
+    assert 'esk_http_requests_total{route="/api/swagger.json",method="GET",status="200"}' in text
+    assert 'esk_http_request_duration_seconds_count{route="/api/swagger.json",method="GET"}' in text
+    assert 'esk_http_requests_in_flight{route="/api/swagger.json"} 0' in text
+
+
+def test_metrics_requires_auth(client):
+    response = client.get('/metrics')
+    assert response.status_code == 401
+
+
+def test_metrics_admin(client, mongo_available):
+    token = get_jwt_token(client)
+    client.get('/suppliers', headers={"Authorization": f"Bearer {token}"})
+    response = client.get('/metrics', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    assert 'esk_mongo_commands_total{command="find",status="ok"}' in text
+    assert 'esk_mongo_commands_per_request_count{route="/suppliers"}' in text
+
+
+def test_metrics_server_bind():
+    server = metrics.start_metrics_server('127.0.0.1:0')
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            assert response.status == 200
+            assert b'esk_http_requests_total' in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_server_started_per_process_with_offset():
+    # create_app não abre a porta (o mestre do gunicorn carrega a aplicação)
+    metrics_app = create_app({'METRICS_BIND': '127.0.0.1:0'})
+    assert app_module._metrics_server is None
+    try:
+        server = start_metrics_server(metrics_app)
+        assert server is not None and start_metrics_server(metrics_app, 1) is server
+        busy = server.server_address[1]
+        app_module._metrics_server = None
+        # Porta ocupada: registra o erro sem derrubar o processo
+        assert start_metrics_server(create_app({'METRICS_BIND': f'127.0.0.1:{busy - 1}'}), 1) is None
+    finally:
+        server.shutdown()
+        server.server_close()
+        app_module._metrics_server = None
@@ -0,0 +1,94 @@
+import threading
+import pytest
+from pymongo import monitoring
+from pymongo.errors import ServerSelectionTimeoutError
+from api.app import create_app
+from api.wsgi import app
+from api import metrics, mongo_pool
+from api.health import CachedPing, mongo_ping
+
+ADDRESS = ('db.exemplo', 27017)
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_client_options_from_config():
+    test_app = create_app({'MONGO_MAX_POOL_SIZE': 50, 'MONGO_MIN_POOL_SIZE': 5,
+                           'MONGO_WAIT_QUEUE_TIMEOUT_MS': 2000, 'MONGO_COMPRESSORS': ['snappy', 'zlib'],
+                           'MONGO_ZLIB_LEVEL': 1})
+    options = mongo_pool.client_options(test_app.config)
+    assert options['maxPoolSize'] == 50
+    assert options['waitQueueTimeoutMS'] == 2000
+    assert 'connectTimeoutMS' not in options
+    assert options['zlibCompressionLevel'] == 1
+    # O cliente criado pelo Flask-PyMongo recebe as opções
+    pool_options = test_app.extensions['esk_mongo'].cx.options.pool_options
+    assert (pool_options.max_pool_size, pool_options.min_pool_size) == (50, 5)
+
+
+def test_unavailable_compressors_skipped():
+    assert 'zlib' in mongo_pool.available_compressors(['snappy', 'zlib'])
+    with pytest.raises(ValueError):
+        mongo_pool.available_compressors(['lz4'])
+
+
+def test_pool_monitor_records_checkout_wait():
+    monitor = mongo_pool.PoolMonitor()
+    monitor.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+    monitor.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.2))
+    monitor.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(ADDRESS, 'timeout', 1.5))
+    assert monitor.open_connections(ADDRESS) == 1
+    text = metrics.registry.render()
+    assert 'esk_mongo_pool_checkout_wait_seconds_bucket{address="db.exemplo:27017",le="0.25"}' in text
+    assert 'esk_mongo_pool_checkout_failures_total{address="db.exemplo:27017",reason="timeout"} 1' in text
+    assert 'esk_mongo_pool_connections{address="db.exemplo:27017",state="in_use"} 1' in text
+    monitor.reset()
+    assert monitor.open_connections() == 0
+
+
+class _Admin:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def command(self, name):
+        self.calls += 1
+        if self.fail:
+            raise ServerSelectionTimeoutError('sem servidor')
+        return {'ok': 1}
+
+
+class _Client:
+    def __init__(self, fail=False):
+        self.admin = _Admin(fail)
+
+
+def test_cached_ping_single_flight():
+    fake = _Client()
+    ping = CachedPing(ttl=60)
+    threads = [threading.Thread(target=ping.check, args=(mongo_ping(fake, 1),)) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result, _ = ping.check(mongo_ping(fake, 1))
+    assert result['ok'] and fake.admin.calls == 1
+    failing = mongo_ping(_Client(fail=True), 1)
+    assert CachedPing(ttl=60).check(failing)[0] == {'ok': False, 'error': 'ServerSelectionTimeoutError'}
+
+
+def test_healthz(client):
+    response = client.get('/healthz')
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'ok'}
+
+
+def test_readyz_reports_unreachable_database(client):
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['mongo']['ok'] is False
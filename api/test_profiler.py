@@ -0,0 +1,58 @@
+import sys
+import threading
+import time
+import pytest
+from api.wsgi import app
+from api import profiler
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    profiler.profiles.reset()
+    with app.test_client() as client:
+        yield client
+
+
+def slow_function():
+    time.sleep(0.05)
+
+
+def test_token_sign_and_verify():
+    token, _ = profiler.create_token('segredo', 60)
+    assert profiler.verify_token('segredo', token)
+    assert not profiler.verify_token('outro', token)
+    expired, _ = profiler.create_token('segredo', -1)
+    assert not profiler.verify_token('segredo', expired)
+    assert not profiler.verify_token('segredo', 'lixo')
+
+
+def test_stack_sampler_collapsed_output():
+    sampler = profiler._StackSampler(threading.get_ident(), sys._getframe(), 0.001)
+    sampler.start()
+    slow_function()
+    sampler.stop()
+    assert any(stack.endswith('slow_function') for stack in sampler.stacks)
+
+
+def test_request_profiled_with_signed_header(client):
+    token, _ = profiler.create_token(app.config['PROFILER_SECRET'], 60)
+    client.get('/api/swagger.json', headers={profiler.PROFILE_HEADER: token})
+    report = profiler.profiles.report()
+    assert report['GET /api/swagger.json']['requests'] == 1
+
+
+def test_request_not_profiled_with_invalid_header(client):
+    client.get('/api/swagger.json', headers={profiler.PROFILE_HEADER: '1.invalido'})
+    assert profiler.profiles.report() == {}
+
+
+def test_sampled_profiling(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILER_SAMPLE_RATE', 1.0)
+    client.get('/api/swagger.json')
+    assert profiler.profiles.report()['GET /api/swagger.json']['requests'] == 1
+
+
+def test_profiles_endpoint_requires_auth(client):
+    assert client.get('/admin/profiles').status_code == 401
+    assert client.post('/admin/profiles/token').status_code == 401
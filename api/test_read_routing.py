@@ -0,0 +1,85 @@
+import os
+from types import SimpleNamespace
+import pytest
+from bson.timestamp import Timestamp
+from flask import Flask
+from pymongo import MongoClient
+from pymongo.read_preferences import SecondaryPreferred
+from api import read_routing
+from api.supplier_mongo import Supplier
+
+# Testes de integração: MONGO_REPLSET_URI=mongodb://localhost:27017,localhost:27018,localhost:27019/eskcrud_rs?replicaSet=rs0
+REPLSET_URI = os.getenv('MONGO_REPLSET_URI')
+
+
+def test_list_read_preference_from_config():
+    assert read_routing.list_read_preference('primary') is None
+    preference = read_routing.list_read_preference('secondaryPreferred', 120)
+    assert preference == SecondaryPreferred(max_staleness=120)
+    with pytest.raises(ValueError):
+        read_routing.list_read_preference('secondaryPreferred', 30)
+    with pytest.raises(ValueError):
+        read_routing.list_read_preference('secondario')
+
+
+def test_operation_time_token_round_trip():
+    timestamp = Timestamp(1753876800, 7)
+    assert read_routing.decode_operation_time(read_routing.encode_operation_time(timestamp)) == timestamp
+    for invalid in (None, '', 'abc', '1.', '-1.2', '99999999999.1'):
+        assert read_routing.decode_operation_time(invalid) is None
+
+
+@pytest.fixture
+def routing_app():
+    app = Flask(__name__)
+    app.config.update(MONGO_LIST_READ_PREFERENCE='secondaryPreferred', MONGO_MAX_STALENESS_SECONDS=90)
+    read_routing.init_app(app)
+
+    @app.route('/write', methods=['POST'])
+    def write():
+        read_routing.record_write(SimpleNamespace(operation_time=Timestamp(1753876800, 3)))
+        return {'success': True}
+
+    @app.route('/list')
+    def list_():
+        after = read_routing.read_after()
+        return {'after': [after.time, after.inc] if after else None}
+
+    return app
+
+
+def test_write_returns_token_and_reads_use_it(routing_app):
+    client = routing_app.test_client()
+    response = client.post('/write')
+    assert response.headers[read_routing.READ_AFTER_HEADER] == '1753876800.3'
+    assert 'HttpOnly' in response.headers['Set-Cookie']
+    # O cookie volta automaticamente; o header tem prioridade
+    assert client.get('/list').get_json() == {'after': [1753876800, 3]}
+    response = client.get('/list', headers={read_routing.READ_AFTER_HEADER: '1753876900.1'})
+    assert response.get_json() == {'after': [1753876900, 1]}
+    assert read_routing.READ_AFTER_HEADER not in response.headers
+
+
+def test_no_causal_session_before_topology_is_known():
+    client = MongoClient('mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=300', connect=False)
+    with read_routing.causal_session(client, Timestamp(1753876800, 1)) as session:
+        assert session is None
+    client.close()
+
+
+@pytest.mark.skipif(not REPLSET_URI, reason='MONGO_REPLSET_URI não definida')
+def test_replica_set_reads_own_write_from_secondary():
+    client = MongoClient(REPLSET_URI)
+    mongo = SimpleNamespace(cx=client, db=client.get_default_database())
+    model = Supplier(mongo, read_preference=read_routing.list_read_preference('secondaryPreferred', 90))
+    tokens = read_routing.begin_request(None)
+    try:
+        created = model.create({'name': 'Fornecedor RS', 'cnpj': '00000000000191'})
+    finally:
+        last_write = read_routing.end_request(tokens)
+    assert last_write is not None
+    try:
+        assert created['id'] in model.get_all(after=last_write)
+    finally:
+        model.delete(created['id'])
+        client.close()
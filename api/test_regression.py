@@ -7,7 +7,7 @@ Deve ser executada antes de cada fase de implementação.
 import pytest
 import random
 import json
-from api.app import app
+from api.wsgi import app
 
 
 @pytest.fixture
@@ -227,7 +227,7 @@ class TestSupplierCRUD:
         assert data["success"] is False
 
     def test_create_supplier_duplicate_cnpj(self, client):
-        """Cria fornecedor com CNPJ duplicado (sem validação de unicidade na API)."""
+        """Rejeita fornecedor com CNPJ duplicado (todos os backends, ver api/repository.py)."""
         token = get_jwt_token(client)
         supplier_id, supplier_data = self._create_supplier(client, token)
         
@@ -243,11 +243,10 @@ class TestSupplierCRUD:
             json=new_supplier,
             headers={"Authorization": f"Bearer {token}"}
         )
-        # NOTA: A API atual não valida CNPJ duplicado, então permite (201)
-        # TODO: Adicionar validação de unicidade de CNPJ em supplier_mongo.py
-        assert response.status_code == 201  # API permite duplicado
+        assert response.status_code == 400
         data = response.get_json()
-        assert data["success"] is True
+        assert data["success"] is False
+        assert data["message"] == "CNPJ já cadastrado"
 
     def test_create_supplier_unauthenticated(self, client):
         """Rejeita criação sem autenticação."""
@@ -0,0 +1,254 @@
+"""Suíte de conformidade: as mesmas regras (api/repository.py) em todos os backends.
+
+JSON e SQLite rodam sempre, em diretório temporário; o MongoDB usa a
+MONGO_URI (banco <padrão>_conformance) e é ignorado se não responder.
+"""
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from api import supplier, supplier_mongo, supplier_sqlite, user, user_mongo, user_sqlite
+from api.repository import SupplierRepository, UserRepository
+from api.sqlite_db import SQLiteDatabase
+
+BACKENDS = ['json', 'sqlite', 'mongo']
+
+
+@pytest.fixture(scope='module')
+def mongo():
+    client = MongoClient(os.environ.get('MONGO_URI', 'mongodb://localhost:27017/eskcrud_test'),
+                         serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB indisponível: {type(e).__name__}")
+    db = client.get_database(f"{client.get_default_database('eskcrud_test').name}_conformance")
+    yield SimpleNamespace(db=db, cx=client)
+    client.drop_database(db.name)
+    client.close()
+
+
+def _repositories(request, tmp_path):
+    backend = request.param
+    if backend == 'json':
+        suppliers = supplier.Supplier(tmp_path / 'suppliers.json')
+        users = user.User(tmp_path / 'users.json')
+    elif backend == 'sqlite':
+        db = SQLiteDatabase(tmp_path / 'eskcrud.sqlite3')
+        request.addfinalizer(db.close)
+        suppliers, users = supplier_sqlite.Supplier(db), user_sqlite.User(db)
+    else:
+        mongo = request.getfixturevalue('mongo')
+        mongo.db.suppliers.drop()
+        mongo.db.users.drop()
+        suppliers, users = supplier_mongo.Supplier(mongo), user_mongo.User(mongo)
+    suppliers.ensure_indexes()
+    users.ensure_indexes()
+    # Os backends JSON criam registros de exemplo em um banco novo
+    for id in list(suppliers.get_all()):
+        suppliers.delete(id)
+    for id in list(users.get_all()):
+        users.delete(id)
+    return suppliers, users
+
+
+@pytest.fixture(params=BACKENDS)
+def suppliers(request, tmp_path):
+    return _repositories(request, tmp_path)[0]
+
+
+@pytest.fixture(params=BACKENDS)
+def users(request, tmp_path):
+    return _repositories(request, tmp_path)[1]
+
+
+def _supplier(i, **extra):
+    return {'name': f'Fornecedor {i}', 'cnpj': f'{i:014d}', 'email': f'f{i}@teste.com',
+            'phone': '11999999999', **extra}
+
+
+def test_supplier_interface(suppliers):
+    assert isinstance(suppliers, SupplierRepository)
+
+
+def test_interfaces_are_abstract():
+    # Backend incompleto falha na criação, não na primeira chamada
+    for interface in (SupplierRepository, UserRepository):
+        with pytest.raises(TypeError):
+            interface()
+    assert UserRepository.__abstractmethods__ == {'get_all', 'get', 'get_by_username', 'get_by_email',
+                                                  'authenticate', 'create', 'update', 'delete'}
+
+
+def test_supplier_create_normalizes_fields(suppliers):
+    created = suppliers.create({'name': 'Nova', 'cnpj': '11.222.333/0001-81', 'email': ' a@b.com ',
+                                'phone': '(11) 99999-0000'})
+    assert (created['cnpj'], created['phone'], created['email']) == ('11222333000181', '11999990000', 'a@b.com')
+    assert suppliers.get(created['id']) == created
+    # CNPJ alfanumérico: letras mantidas, em maiúsculas
+    assert suppliers.create(_supplier(2, cnpj='12.abc.345/01de-35'))['cnpj'] == '12ABC34501DE35'
+
+
+def test_supplier_duplicate_cnpj(suppliers):
+    first = suppliers.create(_supplier(1))
+    with pytest.raises(ValueError, match='CNPJ já cadastrado'):
+        suppliers.create(_supplier(1, cnpj='00.000.000/0000-01'))
+    second = suppliers.create(_supplier(2))
+    with pytest.raises(ValueError, match='CNPJ já cadastrado'):
+        suppliers.update(second['id'], _supplier(2, cnpj=first['cnpj']))
+    assert suppliers.update(first['id'], _supplier(1, name='Renomeado'))['name'] == 'Renomeado'
+
+
+def test_supplier_migrate_keeps_current_records(suppliers):
+    created = suppliers.create(_supplier(1))
+    stored = suppliers.get(created['id'])
+    # Registros gravados pela versão atual já estão na forma canônica
+    assert suppliers.migrate() == 0
+    assert suppliers.get(created['id']) == stored
+
+
+def test_supplier_missing_ids(suppliers):
+    created = suppliers.create(_supplier(1))
+    assert suppliers.delete(created['id'])
+    assert suppliers.get(created['id']) is None
+    assert suppliers.update(created['id'], _supplier(1)) is None
+    assert suppliers.delete(created['id']) is False
+
+
+def test_supplier_soft_delete_and_archive(suppliers):
+    deleted = suppliers.create(_supplier(1))
+    kept = suppliers.create(_supplier(2))
+    assert suppliers.delete(deleted['id'])
+    # O CNPJ de um fornecedor excluído pode ser cadastrado de novo
+    recreated = suppliers.create(_supplier(1))
+    assert set(suppliers.get_all()) == {kept['id'], recreated['id']}
+    assert suppliers.get_many([deleted['id'], kept['id']]).keys() == {kept['id']}
+    if isinstance(suppliers, supplier.Supplier):
+        pytest.skip('o backend JSON remove fisicamente (sem arquivo)')
+    # Dentro da retenção o registro permanece na coleção principal
+    assert suppliers.archive() == 0 and suppliers.get_archive() == ({}, None)
+    assert suppliers.archive(retention=timedelta(0), batch_size=1) == 1
+    archive, cursor = suppliers.get_archive(cnpj='00.000.000/0000-01')
+    assert list(archive) == [deleted['id']] and cursor is None
+    assert archive[deleted['id']]['name'] == 'Fornecedor 1'
+    assert archive[deleted['id']]['deleted_at'] and archive[deleted['id']]['archived_at']
+    assert suppliers.get_archive(cnpj=kept['cnpj']) == ({}, None)
+    assert suppliers.archive(retention=timedelta(0)) == 0
+
+
+def test_supplier_bulk_and_projected_reads(suppliers):
+    assert suppliers.create_many([_supplier(i) for i in range(5)] + [_supplier(0)]) == 5
+    assert suppliers.create_many([_supplier(4), _supplier(5)]) == 1
+    ids = sorted(suppliers.get_all())
+    assert len(ids) == 6
+    deleted = ids.pop()
+    suppliers.delete(deleted)
+    many = suppliers.get_many(ids[:3] + [deleted], fields=['name'])
+    assert set(many) == set(ids[:3])
+    assert all(set(s) == {'id', 'name'} for s in many.values())
+    assert suppliers.get_many(ids[:1])[ids[0]] == suppliers.get(ids[0])
+
+
+def test_supplier_pages_cover_all_records(suppliers):
+    suppliers.create_many([_supplier(i) for i in range(7)])
+    seen, cursor = [], None
+    while True:
+        page, cursor = suppliers.get_page(limit=3, after=cursor, fields=['cnpj'])
+        assert len(page) <= 3 and all(set(s) == {'id', 'cnpj'} for s in page.values())
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == sorted(suppliers.get_all())
+
+
+def test_user_interface(users):
+    assert isinstance(users, UserRepository)
+
+
+def test_user_migrate_keeps_current_records(users):
+    ana = users.create({'username': 'ana', 'email': 'ana@teste.com', 'password': 'senha123'})
+    stored = users.get(ana['id'])
+    assert users.migrate() == 0
+    assert users.get(ana['id']) == stored
+
+
+def test_user_login_fields_stored_lowercase(users):
+    ana = users.create({'username': ' Ana ', 'email': 'Ana@Teste.com', 'password': 'senha123'})
+    assert (ana['username'], ana['email']) == ('ana', 'ana@teste.com')
+    assert users.get_by_username('ANA')['id'] == ana['id']
+    assert users.get_by_email('ANA@teste.com')['id'] == ana['id']
+    assert users.authenticate('Ana', 'senha123')['id'] == ana['id']
+    with pytest.raises(ValueError, match='Nome de usuário já cadastrado'):
+        users.create({'username': 'ANA', 'email': 'outra@teste.com', 'password': 'x'})
+    assert users.update(ana['id'], {'email': 'NOVO@teste.com'})['email'] == 'novo@teste.com'
+    assert list(users.get_page(search='No')[0]) == [ana['id']]
+    assert users.get_page(search='a*')[0] == {}
+
+
+def test_user_update_hashes_password(users):
+    ana = users.create({'username': 'ana', 'email': 'ana@teste.com', 'password': 'senha123'})
+    users.update(ana['id'], {'password': 'nova456'})
+    assert users.get(ana['id'])['password'] != 'nova456'
+    assert users.authenticate('ana', 'nova456')['id'] == ana['id']
+    assert users.authenticate('ana', 'senha123') is None
+
+
+def test_user_duplicates_and_authentication(users):
+    ana = users.create({'username': 'ana', 'email': 'ana@teste.com', 'password': 'senha123',
+                        'role': 'user', 'active': True})
+    bia = users.create({'username': 'bia', 'email': 'bia@teste.com', 'password': 'senha123',
+                        'role': 'admin', 'active': True})
+    with pytest.raises(ValueError, match='Nome de usuário já cadastrado'):
+        users.create({'username': 'ana', 'email': 'outra@teste.com', 'password': 'x'})
+    with pytest.raises(ValueError, match='Email já cadastrado'):
+        users.update(bia['id'], {'email': 'ana@teste.com'})
+    assert users.authenticate('ana', 'senha123')['id'] == ana['id']
+    assert users.authenticate('ana', 'errada') is None
+    assert users.get_by_email('bia@teste.com')['username'] == 'bia'
+
+    page, cursor = users.get_page(limit=1)
+    rest, last = users.get_page(limit=1, after=cursor)
+    assert cursor is not None and last is None
+    assert set(page) | set(rest) == {ana['id'], bia['id']}
+    assert all('password' not in u for u in list(page.values()) + list(rest.values()))
+    assert list(users.get_page(role='admin')[0]) == [bia['id']]
+    assert list(users.get_page(search='an')[0]) == [ana['id']]
+    # Busca sem diferenciar maiúsculas; o role tem filtro próprio
+    assert list(users.get_page(search='ANA@')[0]) == [ana['id']]
+    assert users.get_page(search='adm')[0] == {}
+    assert users.get_page(search='a%')[0] == {}
+    many = users.get_many([ana['id'], bia['id']], fields=['username', 'password'])
+    assert many == {ana['id']: {'id': ana['id'], 'username': 'ana'},
+                    bia['id']: {'id': bia['id'], 'username': 'bia'}}
+    assert users.delete(ana['id']) and users.get(ana['id']) is None
+
+
+def test_mongo_ensure_indexes_backfills_deleted_at(mongo):
+    mongo.db.suppliers.drop()
+    # Documento gravado antes da exclusão lógica, sem deleted_at
+    mongo.db.suppliers.insert_one({'id': 'sup_antigo', **_supplier(1)})
+    suppliers = supplier_mongo.Supplier(mongo)
+    suppliers.ensure_indexes()
+    assert mongo.db.suppliers.find_one({'id': 'sup_antigo'})['deleted_at'] is None
+    assert list(suppliers.get_all()) == ['sup_antigo']
+    with pytest.raises(ValueError, match='CNPJ já cadastrado'):
+        suppliers.create(_supplier(1))
+
+
+def test_mongo_group_commit_create(mongo):
+    from concurrent.futures import ThreadPoolExecutor
+    mongo.db.suppliers.drop()
+    suppliers = supplier_mongo.Supplier(mongo, group_commit_ms=50, group_commit_max=16)
+    suppliers.ensure_indexes()
+    records = [_supplier(i) for i in range(8)] + [_supplier(3)]
+    with ThreadPoolExecutor(len(records)) as pool:
+        futures = [pool.submit(suppliers.create, record) for record in records]
+    created = [f.result() for f in futures if f.exception() is None]
+    errors = [f.exception() for f in futures if f.exception() is not None]
+    assert len(created) == 8 and [str(e) for e in errors] == ['CNPJ já cadastrado']
+    assert suppliers.group_commit.batches == 1
+    # O documento devolvido sem nova leitura é o mesmo do banco
+    assert all(suppliers.get(s['id']) == s for s in created)
@@ -9,7 +9,7 @@ import random
 import re
 import io
 import logging
-from api.app import app, limiter
+from api.wsgi import app
 
 
 @pytest.fixture
@@ -158,6 +158,35 @@ class TestLogSanitization:
         assert '[REDACTED]' in formatted
 
 
+    def test_json_formatter_structured_and_sanitized(self):
+        """JSONFormatter deve gerar JSON válido com a mensagem sanitizada."""
+        import json
+        from api.logging_setup import JSONFormatter
+
+        fake_token = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiIxMjM0NTY3ODkwIn0.sig"
+        record = logging.LogRecord(
+            name='api.app', level=logging.INFO, pathname='', lineno=0,
+            msg="Authorization: Bearer %s", args=(fake_token,), exc_info=None
+        )
+        record.request_id = 'abc123'
+        entry = json.loads(JSONFormatter().format(record))
+        assert entry['level'] == 'INFO'
+        assert entry['logger'] == 'api.app'
+        assert entry['request_id'] == 'abc123'
+        assert fake_token not in entry['message']
+        assert '[REDACTED]' in entry['message']
+
+    def test_request_body_not_read_when_not_sampled(self, client, monkeypatch):
+        """Com taxa de amostragem 0, headers e corpo não são logados."""
+        from api import app as app_module
+        calls = []
+        monkeypatch.setitem(app.config, 'LOG_REQUEST_SAMPLE_RATE', 0.0)
+        monkeypatch.setattr(app_module.logger, 'debug', lambda *args, **kwargs: calls.append(args))
+        monkeypatch.setattr(app_module.logger, 'isEnabledFor', lambda level: True)
+        client.get('/api/swagger.json')
+        assert not any('Request Body' in str(args[0]) for args in calls)
+
+
 # ============================================================================
 # TESTS: RATE LIMITING
 # ============================================================================
@@ -0,0 +1,150 @@
+import json
+import random
+import pytest
+from types import SimpleNamespace
+from pymongo.errors import AutoReconnect
+from api.seed import iter_json_records, migrate_suppliers, seed_users
+
+
+@pytest.fixture
+def users_records():
+    return {
+        f"usr_{i}": {"id": f"usr_{i}", "username": f"seed{i}", "email": f"seed{i}@test.com", "role": "user"}
+        for i in range(50)
+    }
+
+
+def test_iter_json_records_object_format(tmp_path, users_records):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps(users_records, indent=4), encoding='utf-8')
+    # Blocos pequenos forçam registros divididos entre leituras
+    records = list(iter_json_records(path, chunk_size=7))
+    assert records == list(users_records.values())
+
+
+def test_iter_json_records_list_and_jsonl(tmp_path, users_records):
+    values = list(users_records.values())
+    list_path = tmp_path / "users_list.json"
+    list_path.write_text(json.dumps(values), encoding='utf-8')
+    assert list(iter_json_records(list_path, chunk_size=16)) == values
+    jsonl_path = tmp_path / "users.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(v) for v in values) + "\n", encoding='utf-8')
+    assert list(iter_json_records(jsonl_path)) == values
+
+
+def test_iter_json_records_key_becomes_id(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text('{"usr_1": {"username": "a"}, "usr_2": {"username": "b"}}', encoding='utf-8')
+    assert [r['id'] for r in iter_json_records(path, chunk_size=3)] == ['usr_1', 'usr_2']
+
+
+def test_iter_json_records_truncated(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text('{"usr_1": {"username": "a"', encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_json_records(path, chunk_size=4))
+
+
+def test_seed_users_idempotent(client, mongo_available):
+    from api.app import mongo
+    prefix = f"bulk{random.randint(10000, 99999)}"
+    records = [
+        {"username": f"{prefix}_{i}", "email": f"{prefix}_{i}@test.com", "password": "x", "role": "user"}
+        for i in range(100)
+    ]
+    with client.application.app_context():
+        assert seed_users(mongo.db.users, records) == 100
+        # Segunda execução não duplica nem altera registros
+        assert seed_users(mongo.db.users, records) == 0
+        assert mongo.db.users.count_documents({'username': {'$regex': f'^{prefix}_'}}) == 100
+
+
+class RecordingCollection:
+    """Coleção que só registra os lotes de bulk_write (opcionalmente falha no lote `fail_at`)."""
+
+    def __init__(self, fail_at=None):
+        self.batches = []
+        self.fail_at = fail_at
+
+    def bulk_write(self, ops, ordered=True):
+        if len(self.batches) == self.fail_at:
+            self.fail_at = None
+            raise AutoReconnect('conexão perdida')
+        self.batches.append(ops)
+        return SimpleNamespace(bulk_api_result={'nUpserted': len(ops), 'nMatched': 0}, upserted_count=len(ops))
+
+
+def test_seed_users_skips_records_without_username(caplog):
+    collection = RecordingCollection()
+    records = [{'username': 'ana', 'email': 'ana@t.com'}, {'email': 'sem@t.com'}, {'username': '', 'email': 'x@t.com'},
+               {'username': 'bia', 'email': 'bia@t.com'}]
+    assert seed_users(collection, records) == 2
+    assert [len(batch) for batch in collection.batches] == [2]
+    assert 'registro 2' in caplog.text and 'registro 3' in caplog.text
+
+
+def test_seed_users_command_fails_on_error(tmp_path):
+    from api.app import create_app
+    app = create_app({'TESTING': True, 'DATABASE_BACKEND': 'sqlite', 'SQLITE_PATH': str(tmp_path / 'app.sqlite3')})
+    runner = app.test_cli_runner()
+    good = tmp_path / 'users.json'
+    good.write_text(json.dumps([{'username': 'ana', 'email': 'ana@t.com', 'password': 'x'}]), encoding='utf-8')
+    result = runner.invoke(args=['seed-users', '--file', str(good)])
+    assert result.exit_code == 0 and 'concluído' in result.output
+    # Arquivo corrompido: erro e código de saída 1, não "concluído"
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{"usr_1": {"username": "a"', encoding='utf-8')
+    result = runner.invoke(args=['seed-users', '--file', str(broken)])
+    assert result.exit_code == 1
+    assert 'Erro no seed de usuários' in result.output and 'concluído' not in result.output
+
+
+def _suppliers(count):
+    return [{'id': f'sup_{i}', 'name': f'F{i}', 'cnpj': f'{i:014d}', 'email': f'f{i}@t.com', 'phone': '11 9999'}
+            for i in range(count)]
+
+
+def test_migrate_suppliers_upserts_by_cnpj():
+    collection = RecordingCollection()
+    records = _suppliers(3) + [{'id': 'sup_x', 'name': 'Sem CNPJ'}, {**_suppliers(1)[0], 'name': 'Último'}]
+    stats = migrate_suppliers(collection, records, batch_size=10)
+    assert stats == {'position': 5, 'inserted': 3, 'updated': 0, 'invalid': 1, 'failed': 0}
+    [ops] = collection.batches
+    # CNPJ repetido no lote: vale o último registro, com original_id na mesma escrita
+    first = ops[0]._doc
+    assert ops[0]._filter == {'cnpj': '00000000000000', 'deleted_at': {'$type': 'null'}}
+    assert first['$set']['name'] == 'Último' and first['$set']['original_id'] == 'sup_0'
+    assert first['$set']['phone'] == '119999'
+    assert first['$setOnInsert']['id'] == f"sup_{first['$setOnInsert']['_id']}"
+
+
+def test_migrate_suppliers_resumes_from_checkpoint(tmp_path):
+    from db.migrar_fornecedores import _source_id, load_checkpoint, save_checkpoint
+    path = tmp_path / 'suppliers.jsonl'
+    path.write_text('\n'.join(json.dumps(r) for r in _suppliers(25)), encoding='utf-8')
+    checkpoint = tmp_path / 'suppliers.jsonl.checkpoint'
+    source = _source_id(path)
+    collection = RecordingCollection(fail_at=2)
+    with pytest.raises(AutoReconnect):
+        migrate_suppliers(collection, iter_json_records(path), batch_size=10,
+                          on_batch=lambda stats: save_checkpoint(checkpoint, source, stats))
+    skip = load_checkpoint(checkpoint, source)
+    assert skip == 20
+    stats = migrate_suppliers(collection, iter_json_records(path), batch_size=10, skip=skip)
+    assert stats['position'] == 25 and stats['inserted'] == 5
+    cnpjs = [op._filter['cnpj'] for ops in collection.batches for op in ops]
+    assert cnpjs == [f'{i:014d}' for i in range(25)]
+
+
+def test_migrate_suppliers_mongo(client, mongo_available):
+    from api.app import mongo
+    prefix = random.randint(100000, 999999)
+    records = [{'id': f'sup_m{i}', 'name': f'F{i}', 'cnpj': f'{prefix}{i:08d}', 'email': f'f{i}@t.com',
+                'phone': '11999999999'} for i in range(30)]
+    with client.application.app_context():
+        assert migrate_suppliers(mongo.db.suppliers, records, batch_size=7)['inserted'] == 30
+        # Segunda execução atualiza os mesmos documentos
+        stats = migrate_suppliers(mongo.db.suppliers, records[:5], batch_size=7)
+        assert (stats['inserted'], stats['updated']) == (0, 5)
+        doc = mongo.db.suppliers.find_one({'cnpj': f'{prefix}00000001'})
+        assert doc['original_id'] == 'sup_m1' and doc['id'] == f"sup_{doc['_id']}" and doc['deleted_at'] is None
@@ -0,0 +1,83 @@
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from api.wsgi import app
+from api.slow_queries import SlowQueryLog, query_shape
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+class FakeClient:
+    """Cliente mínimo que responde ao explain com um plano fixo."""
+
+    def __init__(self):
+        self.commands = []
+
+    def __getitem__(self, name):
+        return SimpleNamespace(command=self._command)
+
+    def _command(self, command):
+        self.commands.append(command)
+        return {'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': {
+            'stage': 'IXSCAN', 'indexName': 'idx_supplier_name'}}}}
+
+
+def run_command(log, command, duration_ms, request_id=1):
+    name = next(iter(command))
+    log.started(SimpleNamespace(connection_id=('localhost', 27017), request_id=request_id,
+                                command=command, database_name='eskcrud'))
+    log.succeeded(SimpleNamespace(connection_id=('localhost', 27017), request_id=request_id,
+                                  command_name=name, duration_micros=int(duration_ms * 1000)))
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not predicate():
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_query_shape_hides_values():
+    shape = query_shape({'cnpj': '12345678000190', 'name': {'$in': ['a', 'b', 'c']}})
+    assert shape == {'cnpj': '?', 'name': {'$in': ['?']}}
+
+
+def test_fast_commands_ignored():
+    log = SlowQueryLog(threshold_ms=50)
+    run_command(log, {'find': 'suppliers', 'filter': {'cnpj': '1'}}, duration_ms=5)
+    assert log.top_shapes() == []
+
+
+def test_slow_commands_grouped_by_shape(tmp_path):
+    fake = FakeClient()
+    log = SlowQueryLog(threshold_ms=50, path=str(tmp_path / 'slow.jsonl'))
+    log.client_getter = lambda: fake
+    run_command(log, {'find': 'suppliers', 'filter': {'name': 'A'}, 'lsid': {'id': 1}}, 80, request_id=1)
+    run_command(log, {'find': 'suppliers', 'filter': {'name': 'B'}}, 120, request_id=2)
+    run_command(log, {'find': 'users', 'filter': {'email': 'x'}}, 60, request_id=3)
+
+    top = log.top_shapes()
+    assert [entry['collection'] for entry in top] == ['suppliers', 'users']
+    assert top[0]['count'] == 2
+    assert top[0]['total_ms'] == 200
+    assert top[0]['shape'] == {'filter': {'name': '?'}}
+    # explain executado uma única vez por forma nova, sem campos de sessão
+    assert wait_for(lambda: len(fake.commands) == 2)
+    assert 'lsid' not in fake.commands[0]['explain']
+    assert wait_for(lambda: log.top_shapes()[0]['plan'] is not None)
+    assert log.top_shapes()[0]['plan']['indexes'] == ['idx_supplier_name']
+    # Amostras gravadas no arquivo JSONL, sem valores do filtro
+    assert wait_for(lambda: len((tmp_path / 'slow.jsonl').read_text().splitlines()) == 3)
+    lines = [json.loads(line) for line in (tmp_path / 'slow.jsonl').read_text().splitlines()]
+    assert all('A' not in json.dumps(line['shape']) for line in lines)
+
+
+def test_slow_queries_endpoint_requires_auth(client):
+    response = client.get('/admin/slow-queries')
+    assert response.status_code == 401
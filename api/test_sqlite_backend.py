@@ -0,0 +1,189 @@
+import threading
+import pytest
+from api.app import create_app
+from api.sqlite_db import SQLiteDatabase
+from api.supplier_sqlite import Supplier
+from api.user_sqlite import User
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDatabase(tmp_path / 'eskcrud.sqlite3')
+    yield database
+    database.close()
+
+
+def _supplier(i):
+    return {'name': f'Fornecedor {i}', 'cnpj': f'{i:014d}', 'email': f'f{i}@teste.com', 'phone': '11999999999'}
+
+
+def test_database_uses_wal(db):
+    assert db.connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    # Uma conexão por thread
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.connection))
+    thread.start()
+    thread.join()
+    assert other[0] is not db.connection
+
+
+def test_supplier_crud(db):
+    model = Supplier(db)
+    created = model.create(_supplier(1))
+    assert created['id'].startswith('sup_') and created['cnpj'] == '00000000000001'
+    assert model.get(created['id']) == created
+    assert list(model.get_all()) == [created['id']]
+    with pytest.raises(ValueError, match='CNPJ já cadastrado'):
+        model.create(_supplier(1))
+    updated = model.update(created['id'], {**_supplier(1), 'name': 'Novo Nome'})
+    assert updated['name'] == 'Novo Nome' and updated['updated_at'] >= created['updated_at']
+    assert model.update('sup_' + '0' * 24, _supplier(9)) is None
+    other = model.create(_supplier(2))
+    with pytest.raises(ValueError):
+        model.update(other['id'], _supplier(1))
+    assert model.delete(created['id']) and not model.delete(created['id'])
+    assert model.get(created['id']) is None
+
+
+def test_supplier_create_many_ignores_existing_cnpj(db):
+    model = Supplier(db)
+    model.create(_supplier(0))
+    assert model.create_many([_supplier(i) for i in range(5)]) == 4
+    assert len(model.get_all()) == 5
+
+
+def test_user_unique_fields_and_authenticate(db):
+    model = User(db)
+    created = model.create({'username': 'ana', 'email': 'ana@teste.com', 'password': 'senha123',
+                            'role': 'user', 'active': True})
+    assert model.authenticate('ana', 'senha123')['id'] == created['id']
+    assert model.authenticate('ana', 'errada') is None
+    with pytest.raises(ValueError, match='usuário'):
+        model.create({'username': 'ana', 'email': 'outra@teste.com', 'password': 'x'})
+    with pytest.raises(ValueError, match='Email já'):
+        model.create({'username': 'bia', 'email': 'ana@teste.com', 'password': 'x'})
+    assert model.update(created['id'], {'role': 'admin'})['role'] == 'admin'
+    assert model.delete(created['id']) and model.get(created['id']) is None
+
+
+def test_user_seed_and_keyset_pages(db):
+    model = User(db)
+    records = [{'id': f'usr_{i}', 'username': f'user{i:02d}', 'email': f'u{i}@teste.com',
+                'password': 'hash', 'role': 'admin' if i % 2 else 'user', 'active': True}
+               for i in range(25)]
+    assert model.seed(records, batch_size=10) == 25
+    # Idempotente: usernames existentes são mantidos
+    assert model.seed(records) == 0
+    first, cursor = model.get_page(limit=10)
+    second, last_cursor = model.get_page(limit=10, after=cursor)
+    assert len(first) == 10 and not set(first) & set(second)
+    assert all('password' not in u for u in first.values())
+    admins, _ = model.get_page(limit=50, role='admin')
+    assert len(admins) == 12
+    found, _ = model.get_page(search='user1')
+    assert sorted(u['username'] for u in found.values()) == [f'user{i}' for i in range(10, 20)]
+
+
+def test_app_selects_sqlite_backend(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE_BACKEND': 'sqlite',
+                      'SQLITE_PATH': str(tmp_path / 'app.sqlite3')})
+    response = app.test_client().get('/readyz')
+    assert response.status_code == 200
+    assert response.get_json()['sqlite']['ok'] is True
+
+
+def test_readyz_waits_for_migration(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE_BACKEND': 'sqlite',
+                      'SQLITE_PATH': str(tmp_path / 'app.sqlite3')})
+    # Linha no formato anterior: id só na coluna
+    app.extensions['esk_sqlite'].connection.execute(
+        "INSERT INTO suppliers (id, cnpj, name, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+        ('0' * 24, '11222333000181', 'Antiga', '2024-01-02T03:04:05.000000', '2024-01-02T03:04:05.000000',
+         '{"name": "Antiga", "cnpj": "11222333000181"}'))
+    client = app.test_client()
+    response = client.get('/readyz')
+    assert response.status_code == 503 and 'migrate-data' in response.get_json()['migration']
+    # A listagem falha em vez de devolver uma lista vazia
+    with app.app_context():
+        from api.app import supplier
+        with pytest.raises(KeyError):
+            supplier.get_all()
+    assert app.test_cli_runner().invoke(args=['migrate-data']).exit_code == 0
+    assert client.get('/readyz').status_code == 200
+
+
+def test_migrate_rewrites_legacy_rows(db):
+    # Formato anterior: id e timestamps só nas colunas, campos sem normalizar no JSON
+    db.connection.execute(
+        "INSERT INTO suppliers (id, cnpj, name, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+        ('0' * 24, '11.222.333/0001-81', 'Antiga', '2024-01-02T03:04:05.000000', '2024-01-02T03:04:05.000000',
+         '{"name": "Antiga", "cnpj": "11.222.333/0001-81", "phone": "(11) 9999-0000"}'))
+    db.connection.execute(
+        "INSERT INTO users (id, username, created_at, data) VALUES (?, ?, ?, ?)",
+        ('1' * 24, 'ana', '2024-01-02T03:04:05.500000', '{"username": "ana", "password": "hash"}'))
+    suppliers, users = Supplier(db), User(db)
+    assert suppliers.migrate() == 1 and users.migrate() == 1
+    assert suppliers.get('sup_' + '0' * 24) == {
+        'id': 'sup_' + '0' * 24, 'name': 'Antiga', 'cnpj': '11222333000181', 'phone': '1199990000',
+        'created_at': '2024-01-02T03:04:05Z', 'updated_at': '2024-01-02T03:04:05Z'}
+    assert users.get('1' * 24) == {'id': '1' * 24, 'username': 'ana', 'password': 'hash',
+                                   'created_at': '2024-01-02T03:04:05.500000Z'}
+    assert suppliers.migrate() == 0 and users.migrate() == 0
+
+
+def test_migrate_lowercases_user_login_fields(db):
+    db.connection.execute("INSERT INTO users (id, username, email, data) VALUES (?, ?, ?, ?)",
+                          ('1' * 24, 'Ana', 'Ana@Teste.com', '{"id": "%s", "username": "Ana", "email": "Ana@Teste.com"}' % ('1' * 24)))
+    users = User(db)
+    assert users.migrate() == 1
+    assert users.get_by_username('ana')['email'] == 'ana@teste.com'
+    # Dois usuários que só diferem em maiúsculas: a migração falha sem alterar nada
+    db.connection.execute("INSERT INTO users (id, username, data) VALUES (?, ?, ?)",
+                          ('2' * 24, 'ANA', '{"id": "%s", "username": "ANA"}' % ('2' * 24)))
+    with pytest.raises(ValueError, match='diferem só em maiúsculas'):
+        users.migrate()
+    assert db.connection.execute("SELECT username FROM users WHERE id = ?", ('2' * 24,)).fetchone()[0] == 'ANA'
+
+
+def test_schema_upgrade_adds_soft_delete(tmp_path):
+    import sqlite3
+    path = tmp_path / 'antigo.sqlite3'
+    # Tabela e índice único anteriores à exclusão lógica
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE suppliers (id TEXT PRIMARY KEY, cnpj TEXT, name TEXT, created_at TEXT NOT NULL,
+                                updated_at TEXT NOT NULL, data TEXT NOT NULL);
+        CREATE UNIQUE INDEX idx_supplier_cnpj ON suppliers (cnpj);
+    """)
+    conn.close()
+    database = SQLiteDatabase(path)
+    try:
+        model = Supplier(database)
+        created = model.create(_supplier(1))
+        assert model.delete(created['id'])
+        assert model.create(_supplier(1))['id'] != created['id']
+        index_sql = database.connection.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'idx_supplier_cnpj'").fetchone()[0]
+        assert 'WHERE deleted_at IS NULL' in index_sql
+    finally:
+        database.close()
+
+
+def test_archive_endpoint_and_command(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE_BACKEND': 'sqlite', 'ARCHIVE_RETENTION_DAYS': 0,
+                      'SQLITE_PATH': str(tmp_path / 'app.sqlite3')})
+    client = app.test_client()
+    with app.app_context():
+        from api.app import supplier, user
+        user.create({'username': 'chefe', 'email': 'chefe@teste.com', 'password': 'senha123',
+                     'role': 'admin', 'active': True})
+        created = supplier.create(_supplier(1))
+    token = client.post('/auth/login', json={'username': 'chefe', 'password': 'senha123'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.delete(f"/suppliers/{created['id']}", headers=headers).status_code == 200
+    assert client.get(f"/suppliers/{created['id']}", headers=headers).status_code == 404
+    result = app.test_cli_runner().invoke(args=['archive-suppliers'])
+    assert '1 fornecedor(es) arquivado(s)' in result.output
+    body = client.get('/admin/suppliers/archive?cnpj=00000000000001', headers=headers).get_json()
+    assert list(body['data']) == [created['id']] and body['next_cursor'] is None
+    assert client.get('/admin/suppliers/archive?limit=x', headers=headers).status_code == 400
@@ -0,0 +1,84 @@
+"""
+Testes de inicialização
+Garante que importar a aplicação é rápido e não depende do MongoDB.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Orçamento de tempo para `import api.wsgi` (import + create_app, em segundos), ajustável por ambiente
+IMPORT_TIME_BUDGET = float(os.getenv('IMPORT_TIME_BUDGET', '2.0'))
+
+ROOT = Path(__file__).parent.parent
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import api.wsgi
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'elapsed': elapsed,
+    'modules': [m for m in ('yaml', 'marshmallow') if m in sys.modules],
+}))
+"""
+
+
+def _import_app(**env):
+    # MongoDB inacessível: qualquer acesso ao banco durante o import travaria ou falharia
+    full_env = {**os.environ, 'MONGO_URI': 'mongodb://127.0.0.1:1/eskcrud_test', **env}
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=ROOT, env=full_env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_time_within_budget():
+    """Criar a aplicação (api.wsgi) deve caber no orçamento sem conectar ao banco."""
+    probe = _import_app()
+    assert probe['elapsed'] < IMPORT_TIME_BUDGET, \
+        f"Import levou {probe['elapsed']:.2f}s (orçamento: {IMPORT_TIME_BUDGET}s)"
+
+
+def test_optional_subsystems_loaded_lazily():
+    """YAML e marshmallow só devem ser carregados quando usados."""
+    probe = _import_app()
+    assert probe['modules'] == []
+
+
+def test_docs_can_be_disabled():
+    """Com DOCS_ENABLED=false a rota do Swagger UI não é registrada."""
+    from api.app import create_app
+    docs_app = create_app({'DOCS_ENABLED': False})
+    rules = {rule.rule for rule in docs_app.url_map.iter_rules()}
+    assert '/api/docs/' not in rules
+
+
+def test_mongo_client_recreated_after_fork():
+    """reset_mongo_client (post_fork do gunicorn) troca o cliente e os modelos."""
+    from api.app import create_app, mongo, reset_mongo_client, supplier
+    fork_app = create_app()
+    with fork_app.app_context():
+        old_client = mongo.cx
+        old_model = supplier._get_current_object()
+        reset_mongo_client(fork_app)
+        assert mongo.cx is not old_client
+        assert supplier._get_current_object() is not old_model
+        assert supplier.collection.database.client is mongo.cx
+
+
+def test_apps_do_not_share_state():
+    """Cada create_app tem o próprio MongoClient, limiter e registro de consultas lentas."""
+    from api.app import create_app, mongo
+    first = create_app()
+    second = create_app({'MONGO_URI': 'mongodb://127.0.0.1:2/outro'})
+    for name in ('esk_mongo', 'esk_limiter', 'esk_slow_queries'):
+        assert first.extensions[name] is not second.extensions[name]
+    with first.app_context():
+        assert mongo.db.name != 'outro'
+    with second.app_context():
+        assert mongo.db.name == 'outro'
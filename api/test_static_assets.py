@@ -0,0 +1,103 @@
+import hashlib
+import pytest
+from flask import Flask
+from api import compression, static_assets
+
+SCRIPT = 'console.log("v1");\n'
+
+
+@pytest.fixture
+def static_app(tmp_path):
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'app.js').write_text(SCRIPT)
+    (tmp_path / 'index.html').write_text(
+        '<link href="https://cdn.exemplo.com/lib.css" rel="stylesheet">\n'
+        '<a href="login.html">Entrar</a>\n'
+        '<script src="js/app.js"></script>\n'
+    )
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path='/frontend')
+    app.config.update(STATIC_FINGERPRINT=True, STATIC_MAX_AGE=31536000, STATIC_OFFLOAD='',
+                      STATIC_ACCEL_PREFIX='/_static/', COMPRESS_ENABLED=True, COMPRESS_MIN_SIZE=500,
+                      COMPRESS_LEVEL=6, COMPRESS_ALGORITHMS=['gzip'])
+    compression.init_app(app)
+    static_assets.init_app(app)
+    return app
+
+
+def _fingerprinted_url():
+    digest = hashlib.sha256(SCRIPT.encode()).hexdigest()[:static_assets.HASH_LENGTH]
+    return f'js/app.{digest}.js'
+
+
+def test_html_references_rewritten(static_app):
+    client = static_app.test_client()
+    response = client.get('/frontend/index.html')
+    html = response.get_data(as_text=True)
+    assert f'src="{_fingerprinted_url()}"' in html
+    assert 'href="https://cdn.exemplo.com/lib.css"' in html
+    assert 'href="login.html"' in html
+    assert response.cache_control.no_cache
+    revalidated = client.get('/frontend/index.html', headers={'If-None-Match': response.get_etag()[0]})
+    assert revalidated.status_code == 304
+
+
+def test_gzip_html_revalidated(static_app, tmp_path):
+    (tmp_path / 'index.html').write_text('<script src="js/app.js"></script>\n' + '<p>Fornecedores</p>\n' * 100)
+    client = static_app.test_client()
+    response = client.get('/frontend/index.html', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    etag = response.get_etag()[0]
+    assert etag.endswith('-gzip')
+    revalidated = client.get('/frontend/index.html', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.get_etag()[0] == etag
+    # A variante sem compressão tem outro ETag
+    plain = client.get('/frontend/index.html', headers={'If-None-Match': etag})
+    assert plain.status_code == 200
+    assert 'Content-Encoding' not in plain.headers
+
+
+def test_fingerprinted_asset_is_immutable(static_app):
+    client = static_app.test_client()
+    response = client.get(f'/frontend/{_fingerprinted_url()}')
+    assert response.data == SCRIPT.encode()
+    assert response.cache_control.immutable
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 31536000
+    response.close()
+    # Nome sem hash, ou com hash antigo: arquivo atual sem cache longo
+    for path in ('/frontend/js/app.js', '/frontend/js/app.000000000000.js'):
+        response = client.get(path)
+        assert response.data == SCRIPT.encode()
+        assert not response.cache_control.immutable
+        response.close()
+
+
+def test_manifest_refreshed_in_debug(static_app, tmp_path):
+    manifest = static_app.extensions['esk_asset_manifest']
+    old = manifest.url_for('js/app.js')
+    (tmp_path / 'js' / 'app.js').write_text('console.log("v2");\n')
+    assert manifest.url_for('js/app.js') == old
+    assert manifest.url_for('js/app.js', check=True) != old
+
+
+def test_x_accel_redirect_offload(static_app):
+    static_app.config['STATIC_OFFLOAD'] = 'x-accel-redirect'
+    response = static_app.test_client().get(f'/frontend/{_fingerprinted_url()}')
+    assert response.headers['X-Accel-Redirect'] == '/_static/js/app.js'
+    assert response.data == b''
+    assert response.mimetype in ('text/javascript', 'application/javascript')
+    assert response.cache_control.immutable
+
+
+def test_x_sendfile_offload(tmp_path):
+    (tmp_path / 'app.css').write_text('body { color: red; }\n')
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path='/frontend')
+    app.config.update(STATIC_FINGERPRINT=True, STATIC_MAX_AGE=60, STATIC_OFFLOAD='x-sendfile')
+    static_assets.init_app(app)
+    response = app.test_client().get('/frontend/app.css')
+    assert response.headers['X-Sendfile'] == str(tmp_path / 'app.css')
+    response.close()
+    app.config['STATIC_OFFLOAD'] = 'nginx'
+    with pytest.raises(ValueError):
+        static_assets.init_app(app)
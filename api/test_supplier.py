@@ -1,6 +1,6 @@
 import pytest
 import random
-from api.app import app
+from api.wsgi import app
 
 @pytest.fixture
 def client():
@@ -0,0 +1,62 @@
+import logging
+import pytest
+from flask_jwt_extended import create_access_token
+from api.wsgi import app
+from api import timing
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_server_timing_and_request_id_headers(client):
+    response = client.get('/api/swagger.json')
+    assert response.status_code == 200
+    assert len(response.headers['X-Request-ID']) == 32
+    server_timing = response.headers['Server-Timing']
+    assert 'serialize;dur=' in server_timing
+    assert server_timing.split(', ')[-1].startswith('total;dur=')
+
+
+def test_incoming_request_id_is_propagated(client):
+    response = client.get('/api/swagger.json', headers={'X-Request-ID': 'lb-1234.abc'})
+    assert response.headers['X-Request-ID'] == 'lb-1234.abc'
+    response = client.get('/api/swagger.json', headers={'X-Request-ID': 'inválido com espaço'})
+    assert response.headers['X-Request-ID'] != 'inválido com espaço'
+
+
+def test_jwt_and_validation_spans(client):
+    with app.app_context():
+        token = create_access_token(identity='teste')
+    response = client.post('/suppliers', json={'name': ''}, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 400
+    server_timing = response.headers['Server-Timing']
+    assert 'jwt;dur=' in server_timing
+    assert 'validate;dur=' in server_timing
+    assert 'db;dur=' not in server_timing
+
+
+def test_span_outside_request_is_noop():
+    with timing.span('validate'):
+        pass
+    assert timing._current_spans.get() is None
+
+
+def test_header_counts_repeated_spans():
+    header = timing.server_timing_header({'db': [0.003, 2]}, 0.01)
+    assert header == 'db;dur=3.00;desc="MongoDB (2x)", total;dur=10.00;desc="Total"'
+
+
+def test_access_log_contains_request_id_and_spans(client, monkeypatch):
+    records = []
+    monkeypatch.setattr(timing.access_logger, 'handle', records.append)
+    monkeypatch.setattr(timing.access_logger, 'isEnabledFor', lambda level: level >= logging.INFO)
+    response = client.get('/api/swagger.json')
+    record = records[-1]
+    assert record.request_id == response.headers['X-Request-ID']
+    assert record.route == '/api/swagger.json'
+    assert record.status == 200
+    assert 'serialize' in record.timing
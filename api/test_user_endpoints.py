@@ -1,6 +1,6 @@
 import pytest
 import random
-from api.app import app
+from api.wsgi import app
 from api.validators import CNPJValidator
 
 @pytest.fixture
@@ -23,6 +23,21 @@ def test_swagger_json(client):
     assert 'openapi' in data
     assert 'paths' in data
 
+def test_swagger_json_cached(client):
+    response = client.get('/api/swagger.json')
+    etag = response.headers['ETag']
+    assert 'max-age' in response.headers['Cache-Control']
+    # Revalidação com ETag não reenvia o corpo
+    cached = client.get('/api/swagger.json', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+
+def test_swagger_json_gzip(client):
+    import gzip, json
+    plain = client.get('/api/swagger.json')
+    response = client.get('/api/swagger.json', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
 # Test CNPJValidator
 
 def test_cnpj_validator_valid():
@@ -77,6 +92,24 @@ def test_user_crud_admin(client):
     del_resp = client.delete(f'/users/{user_id}', headers={"Authorization": f"Bearer {token}"})
     assert del_resp.status_code == 200
     
+def test_update_user_whitelist_and_password(client):
+    token = get_jwt_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    username = f"u{random.randint(10000,99999)}"
+    reg = client.post('/auth/register', json={"username": username, "email": f"{username}@test.com", "password": "pass"})
+    user_id = reg.get_json()['user']['id']
+    upd = client.put(f'/users/{user_id}', json={"password": "nova123", "created_at": "2000-01-01", "is_superuser": True},
+                     headers=headers)
+    assert upd.status_code == 200
+    data = upd.get_json()['data']
+    assert 'password' not in data and 'is_superuser' not in data
+    assert not data.get('created_at', '').startswith('2000')
+    # A senha nova foi gravada com hash: o login funciona com ela
+    assert client.post('/auth/login', json={"username": username, "password": "nova123"}).status_code == 200
+    assert client.put(f'/users/{user_id}', json={"is_superuser": True}, headers=headers).status_code == 400
+    assert client.put(f'/users/{user_id}', json={"password": ""}, headers=headers).status_code == 400
+    client.delete(f'/users/{user_id}', headers=headers)
+
 # Novos testes de validação e erros de usuários
 def test_register_missing_fields(client):
     # Campo obrigatório ausente deve retornar 400
@@ -121,3 +154,46 @@ def test_crud_user_not_found(client):
     # DELETE não existente
     resp_del = client.delete(f'/users/{fake_id}', headers={"Authorization": f"Bearer {token}"})
     assert resp_del.status_code == 404
+
+def test_user_unique_indexes():
+    # Índices únicos garantidos na inicialização
+    from api.app import mongo
+    with app.app_context():
+        indexes = mongo.db.users.index_information()
+    assert indexes['idx_user_username'].get('unique') is True
+    assert indexes['idx_user_email'].get('unique') is True
+
+def test_register_duplicate_messages(client):
+    username = f"dupmsg{random.randint(1000,9999)}"
+    email = f"{username}@test.com"
+    client.post('/auth/register', json={"username": username, "email": email, "password": "pass"})
+    # DuplicateKeyError é traduzido para as mensagens existentes
+    resp_user = client.post('/auth/register', json={"username": username, "email": f"x{email}", "password": "pass"})
+    assert resp_user.get_json()['message'] == 'Nome de usuário já cadastrado'
+    resp_email = client.post('/auth/register', json={"username": f"{username}x", "email": email, "password": "pass"})
+    assert resp_email.get_json()['message'] == 'Email já cadastrado'
+
+def test_get_users_paginated(client):
+    token = get_jwt_token(client)
+    prefix = f"page{random.randint(1000,9999)}"
+    for i in range(3):
+        client.post('/auth/register', json={"username": f"{prefix}_{i}", "email": f"{prefix}_{i}@test.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {token}"}
+    # Primeira página com prefixo e filtros
+    resp = client.get(f'/users?limit=2&q={prefix}&role=user&active=true', headers=headers)
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert len(body['data']) == 2
+    assert body['next_cursor'] is not None
+    assert all('password' not in u for u in body['data'].values())
+    # Segunda página continua do cursor
+    resp2 = client.get(f"/users?limit=2&q={prefix}&after={body['next_cursor']}", headers=headers)
+    body2 = resp2.get_json()
+    assert len(body2['data']) == 1
+    assert body2['next_cursor'] is None
+    assert not set(body['data']) & set(body2['data'])
+
+def test_get_users_invalid_cursor(client):
+    token = get_jwt_token(client)
+    resp = client.get('/users?after=invalido', headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 400
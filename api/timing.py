@@ -0,0 +1,168 @@
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import Flask, g, request
+from pymongo import monitoring
+
+access_logger = logging.getLogger('api.access')
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# IDs recebidos do proxy/cliente são aceitos apenas neste formato
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Descrições exibidas nas ferramentas do navegador (Server-Timing "desc")
+# (headers HTTP aceitam apenas ASCII)
+SPAN_DESCRIPTIONS = {
+    'jwt': 'JWT',
+    'validate': 'Schema',
+    'db': 'MongoDB',
+    'serialize': 'JSON',
+    'compress': 'gzip/br/zstd',
+    'total': 'Total',
+}
+
+# Spans da requisição atual: {nome: [duração em segundos, ocorrências]}
+_current_spans = ContextVar('request_spans', default=None)
+
+
+def _add(name, elapsed):
+    spans = _current_spans.get()
+    if spans is None:
+        return
+    entry = spans.get(name)
+    if entry is None:
+        spans[name] = [elapsed, 1]
+    else:
+        entry[0] += elapsed
+        entry[1] += 1
+
+
+def begin_spans():
+    """Abre a coleta de spans no contexto atual; devolve o token de end_spans."""
+    return _current_spans.set({})
+
+
+def end_spans(token):
+    """Encerra a coleta aberta por begin_spans e devolve os spans."""
+    spans = _current_spans.get() or {}
+    _current_spans.reset(token)
+    return spans
+
+
+@contextmanager
+def span(name):
+    """Cronometra um trecho e soma a duração ao span `name` da requisição.
+
+    Fora de uma requisição (ex.: comandos CLI) não registra nada.
+    """
+    if _current_spans.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add(name, time.perf_counter() - start)
+
+
+class MongoCommandTiming(monitoring.CommandListener):
+    """Soma a duração dos comandos MongoDB no span 'db' da requisição.
+
+    O driver síncrono publica os eventos no thread que executou o comando,
+    como em metrics.MongoCommandMetrics.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        _add('db', event.duration_micros / 1e6)
+
+    def failed(self, event):
+        _add('db', event.duration_micros / 1e6)
+
+
+command_timing = MongoCommandTiming()
+
+
+class TimedFlask(Flask):
+    """Flask que mede a conversão do retorno da view em resposta (span 'serialize')."""
+
+    def make_response(self, rv):
+        with span('serialize'):
+            return super().make_response(rv)
+
+
+# ============================================================================
+# Integração com o Flask
+# ============================================================================
+
+def request_id_from(incoming):
+    """Reaproveita o X-Request-ID recebido, se válido, ou gera um novo."""
+    if incoming and _VALID_REQUEST_ID.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def _start_request():
+    g.request_id = request_id_from(request.headers.get(REQUEST_ID_HEADER))
+    g.timing_start = time.perf_counter()
+    g.timing_token = begin_spans()
+
+
+def server_timing_header(spans, total):
+    """Monta o valor do header Server-Timing (durações em ms)."""
+    parts = []
+    for name, (elapsed, count) in spans.items():
+        desc = SPAN_DESCRIPTIONS.get(name, name)
+        if count > 1:
+            desc = f'{desc} ({count}x)'
+        parts.append(f'{name};dur={elapsed * 1000:.2f};desc="{desc}"')
+    parts.append(f'total;dur={total * 1000:.2f};desc="{SPAN_DESCRIPTIONS["total"]}"')
+    return ', '.join(parts)
+
+
+def _finish_request(response):
+    start = g.pop('timing_start', None)
+    if start is None:
+        return response
+    total = time.perf_counter() - start
+    spans = end_spans(g.pop('timing_token'))
+    response.headers[REQUEST_ID_HEADER] = g.request_id
+    response.headers['Server-Timing'] = server_timing_header(spans, total)
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    log_access(g.request_id, request.method, route, request.path, response.status_code, total, spans)
+    return response
+
+
+def log_access(request_id, method, route, path, status, total, spans):
+    """Registro estruturado de acesso (logger api.access)."""
+    if not access_logger.isEnabledFor(logging.INFO):
+        return
+    access_logger.info(
+        f"{method} {path} {status} {total * 1000:.1f}ms",
+        extra={
+            'request_id': request_id,
+            'method': method,
+            'route': route,
+            'path': path,
+            'status': status,
+            'duration_ms': round(total * 1000, 2),
+            'timing': {name: round(elapsed * 1000, 2) for name, (elapsed, _) in spans.items()},
+        }
+    )
+
+
+def init_app(app):
+    """Registra request id, spans e access log na aplicação.
+
+    Deve ser chamado antes dos demais hooks: o before_request abre a
+    medição primeiro e o after_request (executado em ordem inversa) a
+    fecha por último, depois dos headers de segurança.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
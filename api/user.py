@@ -1,18 +1,23 @@
-import json
 import uuid
 from pathlib import Path
 import bcrypt
 import logging
 from typing import Optional, Dict, Any
 
+from .json_store import COMPACT_EVERY, JsonStore
+from .repository import DUPLICATE_MESSAGES, UserRepository
+from .utils import normalize_login, normalize_user
+
 logger = logging.getLogger(__name__)
 
-class User:
-    def __init__(self, db_path=None):
+class User(UserRepository):
+    def __init__(self, db_path=None, compact_every=COMPACT_EVERY):
         if db_path:
             self.db_file = Path(db_path)
         else:
             self.db_file = Path(__file__).parent.parent / 'db' / 'users.json'
+        # Índice primário (id) e secundários (username, email) em memória
+        self.store = JsonStore(self.db_file, indexes=('username', 'email'), compact_every=compact_every)
         self._init_db()
 
     def _init_db(self):
@@ -39,57 +44,39 @@ class User:
         return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
     def _read_db(self) -> Dict[str, Any]:
-        try:
-            with open(self.db_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.warning("Arquivo de banco de dados de usuários não encontrado, criando novo...")
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON de usuários: {e}")
-            return {}
+        """Todos os usuários (registros compartilhados do JsonStore: não alterar)."""
+        return self.store.all()
 
     def _write_db(self, data: Dict[str, Any]) -> None:
-        try:
-            self.db_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.db_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Erro ao escrever no banco de dados de usuários: {e}")
-            raise
+        """Grava o conteúdo inicial do banco (snapshot completo)."""
+        with self.store.locked():
+            for id, user in data.items():
+                self.store.put(id, user)
+            self.store.compact()
 
     def create(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        users = self._read_db()
-        
-        # Verificar se usuário já existe
-        if any(u['username'] == data['username'] for u in users.values()):
-            raise ValueError("Nome de usuário já cadastrado")
-        if any(u['email'] == data['email'] for u in users.values()):
-            raise ValueError("Email já cadastrado")
-        
-        # Hash da senha
+        data = normalize_user(data)
+        # Hash da senha (fora do lock: o bcrypt é lento de propósito)
         data['password'] = self._hash_password(data['password'])
-        
-        # Gerar ID único
-        id = f'usr_{uuid.uuid4()}'
-        users[id] = {'id': id, **data}
-        
-        self._write_db(users)
-        return users[id]
+
+        with self.store.locked():
+            # Verificar se usuário já existe
+            self._check_unique(data)
+
+            # Gerar ID único
+            id = f'usr_{uuid.uuid4()}'
+            return self.store.put(id, data)
+
+    def _check_unique(self, data, id=None):
+        for field, message in DUPLICATE_MESSAGES.items():
+            if field in data and self.store.find(field, data[field]) - {id}:
+                raise ValueError(message)
 
     def get_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        users = self._read_db()
-        for user in users.values():
-            if user['username'] == username:
-                return user
-        return None
+        return self.store.find_one('username', normalize_login(username))
 
     def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        users = self._read_db()
-        for user in users.values():
-            if user['email'] == email:
-                return user
-        return None
+        return self.store.find_one('email', normalize_login(email))
 
     def authenticate(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         user = self.get_by_username(username)
@@ -97,31 +84,26 @@ class User:
             return user
         return None
 
-    def get_all(self) -> Dict[str, Any]:
+    def get_all(self, after=None) -> Dict[str, Any]:
         return self._read_db()
 
     def get(self, id: str) -> Optional[Dict[str, Any]]:
-        users = self._read_db()
-        return users.get(id)
+        return self.store.get(id)
 
     def update(self, id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        users = self._read_db()
-        
-        if id not in users:
-            return None
-            
+        data = normalize_user(data)
         # Se estiver atualizando a senha, fazer o hash
         if 'password' in data:
             data['password'] = self._hash_password(data['password'])
-            
-        users[id].update(data)
-        self._write_db(users)
-        return users[id]
+
+        with self.store.locked():
+            user = self.store.get(id)
+            if user is None:
+                return None
+
+            self._check_unique(data, id)
+            user.update(data)
+            return self.store.put(id, user)
 
     def delete(self, id: str) -> bool:
-        users = self._read_db()
-        if id in users:
-            del users[id]
-            self._write_db(users)
-            return True
-        return False
\ No newline at end of file
+        return self.store.delete(id)
\ No newline at end of file
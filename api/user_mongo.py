@@ -1,45 +1,104 @@
 import logging
+import re
 from bson import ObjectId
 import bcrypt
 from datetime import datetime
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from . import read_routing
+from .repository import DUPLICATE_MESSAGES, PRIVATE_USER_FIELDS, SEARCH_FIELDS, UserRepository
+from .utils import DEFAULT_PAGE_SIZE, normalize_login, normalize_user, page_limit, paginate
 
 logger = logging.getLogger(__name__)
 
-class User:
-    def __init__(self, mongo):
+# Os documentos guardam o id público (ObjectId em texto) no campo 'id': as
+# leituras excluem o _id na projeção e devolvem o documento como veio do banco
+DOCUMENT_PROJECTION = {'_id': 0}
+# Campos nunca devolvidos em listagens (excluídos já no banco)
+PUBLIC_PROJECTION = {'_id': 0, **{field: 0 for field in PRIVATE_USER_FIELDS}}
+
+
+def _projection(fields):
+    if fields is None:
+        return PUBLIC_PROJECTION
+    return {'_id': 0, 'id': 1, **{field: 1 for field in fields if field not in PRIVATE_USER_FIELDS}}
+
+
+class User(UserRepository):
+    def __init__(self, mongo, read_preference=None):
         self.mongo = mongo
         self.collection = self.mongo.db.users
+        # Listagem e busca podem ir para secundários; login e leituras por id
+        # seguem no primário
+        self.list_collection = self.collection.with_options(read_preference=read_preference) \
+            if read_preference is not None else self.collection
+        self.causal = read_preference is not None
+
+    def ensure_indexes(self):
+        """Garante índices únicos em 'username' e 'email'.
+
+        Com os índices, login e registro resolvem em uma única operação
+        indexada e a unicidade passa a ser garantida pelo próprio banco,
+        inclusive entre registros concorrentes.
+        """
+        for field in DUPLICATE_MESSAGES:
+            name = f"idx_user_{field}"
+            try:
+                self.collection.create_index([(field, ASCENDING)], name=name, unique=True)
+                logger.info(f"Índice único '{name}' garantido na coleção 'users'.")
+            except OperationFailure as e:
+                # Ex.: duplicatas pré-existentes impedem a criação do índice
+                logger.error(f"Não foi possível criar o índice '{name}': {e}")
+        # Atende os filtros da listagem paginada mantendo a ordenação por _id
+        self.collection.create_index(
+            [('role', ASCENDING), ('active', ASCENDING), ('_id', ASCENDING)],
+            name="idx_user_role_active"
+        )
+        logger.info("Índice 'idx_user_role_active' garantido na coleção 'users'.")
+
+    def _duplicate_message(self, error):
+        """Traduz um DuplicateKeyError na mensagem de negócio correspondente."""
+        details = error.details or {}
+        fields = list(details.get('keyPattern') or details.get('keyValue') or {})
+        for field in fields:
+            if field in DUPLICATE_MESSAGES:
+                return DUPLICATE_MESSAGES[field]
+        # Servidores antigos não enviam keyPattern: recorre ao nome do índice
+        message = str(error)
+        for field, text in DUPLICATE_MESSAGES.items():
+            if f"idx_user_{field}" in message:
+                return text
+        return 'Usuário já cadastrado'
 
     def create(self, data):
-        # Verifica se username ou email já existem
-        if self.collection.find_one({'username': data['username']}):
-            raise ValueError('Nome de usuário já cadastrado')
-        if self.collection.find_one({'email': data['email']}):
-            raise ValueError('Email já cadastrado')
+        data = normalize_user(data)
         # Hash da senha
         data['password'] = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         # Adiciona timestamps de criação e atualização
         timestamp = datetime.utcnow()
         data['created_at'] = timestamp
         data['updated_at'] = timestamp
-        result = self.collection.insert_one(data)
-        user = self.get(str(result.inserted_id))
+        # _id gerado no cliente: o id público é gravado na mesma inserção
+        data['_id'] = ObjectId()
+        data['id'] = str(data['_id'])
+        # Os índices únicos rejeitam username/email duplicados na própria inserção
+        try:
+            with read_routing.write_session(self.mongo.cx, self.causal) as session:
+                self.collection.insert_one(data, session=session)
+        except DuplicateKeyError as e:
+            raise ValueError(self._duplicate_message(e))
+        # O documento gravado já está completo: não é preciso relê-lo
+        user = dict(data)
+        del user['_id']
         logger.info(f"Usuário criado com ID: {user['id']}")
         return user
 
     def get_by_username(self, username):
-        user = self.collection.find_one({'username': username})
-        if user:
-            user['id'] = str(user['_id'])
-            del user['_id']
-        return user
+        return self.collection.find_one({'username': normalize_login(username)}, DOCUMENT_PROJECTION)
 
     def get_by_email(self, email):
-        user = self.collection.find_one({'email': email})
-        if user:
-            user['id'] = str(user['_id'])
-            del user['_id']
-        return user
+        return self.collection.find_one({'email': normalize_login(email)}, DOCUMENT_PROJECTION)
 
     def authenticate(self, username, password):
         user = self.get_by_username(username)
@@ -47,26 +106,91 @@ class User:
             return user
         return None
 
-    def get_all(self):
-        users = list(self.collection.find())
-        for u in users:
-            u['id'] = str(u['_id'])
-            del u['_id']
-        return {u['id']: u for u in users}
+    def get_all(self, after=None):
+        with read_routing.causal_session(self.mongo.cx, after) as session:
+            return {u['id']: u for u in self.list_collection.find(projection=DOCUMENT_PROJECTION, session=session)}
+
+    def get_page(self, limit=DEFAULT_PAGE_SIZE, after=None, role=None, active=None, search=None,
+                 read_after=None, fields=None):
+        """Lista usuários com paginação por cursor (keyset) sobre o _id.
+
+        'after' é o id do último usuário da página anterior; 'search' faz
+        busca por prefixo em username e email (SEARCH_FIELDS). Os dois são
+        gravados em minúsculas: o prefixo, também em minúsculas, é uma regex
+        ancorada sem a opção 'i', resolvida com limites justos nos índices
+        únicos. O hash de senha é excluído na projeção ('fields' restringe
+        os campos devolvidos). 'read_after' é o operationTime da última
+        escrita do cliente (leitura causal).
+
+        Retorna (usuarios, proximo_cursor); o cursor é None na última página.
+        """
+        limit = page_limit(limit)
+        query = {}
+        if after:
+            query['_id'] = {'$gt': ObjectId(after)}
+        if role:
+            query['role'] = role
+        if active is not None:
+            query['active'] = active
+        if search:
+            prefix = {'$regex': f"^{re.escape(search.lower())}"}
+            query['$or'] = [{field: prefix} for field in SEARCH_FIELDS]
+        # Busca um item a mais apenas para saber se existe próxima página
+        with read_routing.causal_session(self.mongo.cx, read_after) as session:
+            cursor = self.list_collection.find(query, _projection(fields), session=session) \
+                .sort('_id', ASCENDING).limit(limit + 1)
+            return paginate(cursor, limit)
+
+    def get_many(self, ids, fields=None):
+        """Leitura em lote com uma única consulta ($in sobre _id), sem o hash de senha."""
+        oids = [ObjectId(id) for id in ids if ObjectId.is_valid(id)]
+        cursor = self.collection.find({'_id': {'$in': oids}}, _projection(fields))
+        return {u['id']: u for u in cursor}
 
     def get(self, id):
-        user = self.collection.find_one({'_id': ObjectId(id)})
-        if user:
-            user['id'] = str(user['_id'])
-            del user['_id']
-        return user
+        return self.collection.find_one({'_id': ObjectId(id)}, DOCUMENT_PROJECTION)
+
+    def pending_migration(self):
+        """True se há documentos sem 'id' (anteriores ao formato atual)."""
+        return self.collection.find_one({'id': {'$exists': False}}, {'_id': 1}) is not None
+
+    def migrate(self):
+        """Migração única: grava o campo 'id' e username/email em minúsculas nos documentos antigos.
+
+        Ver supplier_mongo.Supplier.migrate. Usuários que diferem só em
+        maiúsculas violam os índices únicos: ValueError, a resolver à mão.
+        """
+        result = self.collection.update_many({'id': {'$exists': False}},
+                                             [{'$set': {'id': {'$toString': '$_id'}}}])
+        changed = result.modified_count
+        # Campos ausentes ou que não são texto ficam como estão
+        lowered = {field: {'$cond': [{'$eq': [{'$type': f'${field}'}, 'string']}, {'$toLower': f'${field}'},
+                                     f'${field}']}
+                   for field in SEARCH_FIELDS}
+        mixed_case = {'$or': [{'$ne': [f'${field}', expression]} for field, expression in lowered.items()]}
+        try:
+            result = self.collection.update_many({'$expr': mixed_case}, [{'$set': lowered}])
+        except DuplicateKeyError as e:
+            raise ValueError(f"Usuários que diferem só em maiúsculas: {self._duplicate_message(e)} ({e})")
+        changed += result.modified_count
+        logger.info(f"Migração de usuários: {changed} documento(s) atualizado(s)")
+        return changed
 
     def update(self, id, data):
+        data = normalize_user(data)
+        # Se estiver atualizando a senha, fazer o hash
+        if 'password' in data:
+            data['password'] = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         # Atualiza timestamp de atualização
         data['updated_at'] = datetime.utcnow()
-        self.collection.update_one({'_id': ObjectId(id)}, {'$set': data})
+        try:
+            with read_routing.write_session(self.mongo.cx, self.causal) as session:
+                self.collection.update_one({'_id': ObjectId(id)}, {'$set': data}, session=session)
+        except DuplicateKeyError as e:
+            raise ValueError(self._duplicate_message(e))
         return self.get(id)
 
     def delete(self, id):
-        result = self.collection.delete_one({'_id': ObjectId(id)})
+        with read_routing.write_session(self.mongo.cx, self.causal) as session:
+            result = self.collection.delete_one({'_id': ObjectId(id)}, session=session)
         return result.deleted_count > 0
@@ -0,0 +1,236 @@
+import json
+import logging
+import re
+import sqlite3
+from datetime import datetime
+
+import bcrypt
+from bson import ObjectId
+
+from .repository import DUPLICATE_MESSAGES, PRIVATE_USER_FIELDS, SEARCH_FIELDS, UserRepository
+from .sqlite_db import from_legacy_text, load_documents, to_text
+from .utils import DEFAULT_PAGE_SIZE, normalize_login, normalize_user, page_limit, paginate, project
+
+logger = logging.getLogger(__name__)
+
+# Lotes do seed e da migração (executemany)
+SEED_BATCH_SIZE = 1000
+
+# Curingas do GLOB escapados na busca por prefixo ('*' -> '[*]')
+_GLOB_SPECIAL = re.compile(r'[*?\[]')
+
+# A coluna data guarda o documento completo, com 'id' e timestamps em texto
+# (ver supplier_sqlite); nas listagens o hash de senha é removido no SQL
+PUBLIC_DATA = 'json_remove(data, {})'.format(', '.join(f"'$.{field}'" for field in PRIVATE_USER_FIELDS))
+SELECT_ONE = 'SELECT data FROM users WHERE id = ?'
+SELECT_BY_USERNAME = 'SELECT data FROM users WHERE username = ?'
+SELECT_BY_EMAIL = 'SELECT data FROM users WHERE email = ?'
+SELECT_ALL = 'SELECT data FROM users ORDER BY id'
+SELECT_MANY = f'SELECT {PUBLIC_DATA} FROM users WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id'
+SELECT_PAGE = f'SELECT {PUBLIC_DATA} FROM users'
+SELECT_RAW = 'SELECT id, created_at, updated_at, data FROM users'
+SELECT_PENDING = "SELECT 1 FROM users WHERE json_extract(data, '$.id') IS NULL LIMIT 1"
+INSERT = ('INSERT INTO users (id, username, email, role, active, created_at, updated_at, data) '
+          'VALUES (?, ?, ?, ?, ?, ?, ?, ?)')
+INSERT_IGNORE = INSERT.replace('INSERT', 'INSERT OR IGNORE', 1)
+UPDATE = ('UPDATE users SET username = ?, email = ?, role = ?, active = ?, created_at = ?, updated_at = ?, data = ? '
+          'WHERE id = ?')
+DELETE = 'DELETE FROM users WHERE id = ?'
+
+
+def _document(id, data):
+    # Documento no formato de user_mongo.User.get, pronto para serializar;
+    # timestamps ausentes (usuários antigos) ficam fora do documento
+    document = {k: v for k, v in data.items() if k != '_id'}
+    document['id'] = id
+    for field in ('created_at', 'updated_at'):
+        if document.get(field) is None:
+            document.pop(field, None)
+        else:
+            document[field] = to_text(document[field])
+    return document
+
+
+def _row(id, document):
+    active = document.get('active')
+    return (id, document.get('username'), document.get('email'), document.get('role'),
+            None if active is None else int(bool(active)),
+            document.get('created_at'), document.get('updated_at'), json.dumps(document, ensure_ascii=False))
+
+
+def _duplicate_message(error):
+    # "UNIQUE constraint failed: users.username"
+    message = str(error)
+    for field, text in DUPLICATE_MESSAGES.items():
+        if f'users.{field}' in message:
+            return text
+    return 'Usuário já cadastrado'
+
+
+class User(UserRepository):
+    """Usuários no SQLite, com os mesmos métodos e retornos de user_mongo.User."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def ensure_indexes(self):
+        """O schema (tabela e índices únicos) é criado na primeira conexão."""
+        self.db.connection
+        logger.info("Índices únicos de username e email garantidos no SQLite.")
+
+    def create(self, data):
+        data = normalize_user(data)
+        # Hash da senha
+        data['password'] = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        # Adiciona timestamps de criação e atualização
+        timestamp = datetime.utcnow()
+        data['created_at'] = timestamp
+        data['updated_at'] = timestamp
+        id = str(ObjectId())
+        user = _document(id, data)
+        # Os índices únicos rejeitam username/email duplicados na própria inserção
+        try:
+            self.db.connection.execute(INSERT, _row(id, user))
+        except sqlite3.IntegrityError as e:
+            raise ValueError(_duplicate_message(e))
+        logger.info(f"Usuário criado com ID: {id}")
+        return user
+
+    def seed(self, records, batch_size=SEED_BATCH_SIZE):
+        """Insere usuários de forma idempotente (username/email existentes são mantidos).
+
+        Equivalente SQLite de seed.seed_users: lotes com executemany e
+        INSERT OR IGNORE. Retorna a quantidade de usuários inseridos.
+        """
+        inserted = 0
+        batch = []
+        for record in records:
+            doc = normalize_user(record)
+            doc.pop('id', None)
+            id = str(ObjectId())
+            batch.append(_row(id, _document(id, doc)))
+            if len(batch) >= batch_size:
+                inserted += self._insert_batch(batch)
+                batch = []
+        if batch:
+            inserted += self._insert_batch(batch)
+        return inserted
+
+    def _insert_batch(self, rows):
+        with self.db.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(INSERT_IGNORE, rows)
+            return conn.total_changes - before
+
+    def pending_migration(self):
+        """True se há linhas no formato anterior (id só na coluna)."""
+        return self.db.connection.execute(SELECT_PENDING).fetchone() is not None
+
+    def migrate(self, batch_size=SEED_BATCH_SIZE):
+        """Migração única das linhas antigas para o documento completo.
+
+        Grava id e timestamps no JSON e username/email em minúsculas; linhas
+        já no formato atual não são regravadas. Retorna quantas foram
+        alteradas. Usuários que diferem só em maiúsculas geram ValueError.
+        """
+        changed = 0
+        try:
+            with self.db.transaction() as conn:
+                rows = []
+                for row in conn.execute(SELECT_RAW).fetchall():
+                    current = json.loads(row['data'])
+                    document = _document(row['id'], {'created_at': from_legacy_text(row['created_at']),
+                                                     'updated_at': from_legacy_text(row['updated_at']),
+                                                     **normalize_user(current)})
+                    if document != current:
+                        rows.append(_row(row['id'], document)[1:] + (row['id'],))
+                    if len(rows) >= batch_size:
+                        conn.executemany(UPDATE, rows)
+                        changed += len(rows)
+                        rows = []
+                conn.executemany(UPDATE, rows)
+                changed += len(rows)
+        except sqlite3.IntegrityError as e:
+            # A transação é desfeita: nenhuma linha fica migrada pela metade
+            raise ValueError(f"Usuários que diferem só em maiúsculas: {_duplicate_message(e)}")
+        logger.info(f"Migração de usuários: {changed} linha(s) atualizada(s)")
+        return changed
+
+    def _find_one(self, sql, value):
+        row = self.db.connection.execute(sql, (value,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_by_username(self, username):
+        return self._find_one(SELECT_BY_USERNAME, normalize_login(username))
+
+    def get_by_email(self, email):
+        return self._find_one(SELECT_BY_EMAIL, normalize_login(email))
+
+    def authenticate(self, username, password):
+        user = self.get_by_username(username)
+        if user and bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
+            return user
+        return None
+
+    def get_all(self, after=None):
+        return {u['id']: u for u in load_documents(self.db.connection, SELECT_ALL)}
+
+    def get_page(self, limit=DEFAULT_PAGE_SIZE, after=None, role=None, active=None, search=None,
+                 read_after=None, fields=None):
+        """Lista usuários com paginação por cursor sobre o id (ver user_mongo.User.get_page).
+
+        A busca por prefixo usa GLOB 'p*' em username e email, gravados em
+        minúsculas: diferente do LIKE, o GLOB (que diferencia maiúsculas) é
+        resolvido como faixa nos índices únicos dos dois campos.
+        """
+        limit = page_limit(limit)
+        clauses, params = [], []
+        if after:
+            clauses.append('id > ?')
+            params.append(str(ObjectId(after)))
+        if role:
+            clauses.append('role = ?')
+            params.append(role)
+        if active is not None:
+            clauses.append('active = ?')
+            params.append(int(bool(active)))
+        if search:
+            pattern = _GLOB_SPECIAL.sub(r'[\g<0>]', search.lower()) + '*'
+            clauses.append('(' + ' OR '.join(f'{field} GLOB ?' for field in SEARCH_FIELDS) + ')')
+            params.extend([pattern] * len(SEARCH_FIELDS))
+        sql = SELECT_PAGE + (' WHERE ' + ' AND '.join(clauses) if clauses else '') + ' ORDER BY id LIMIT ?'
+        # Busca um item a mais apenas para saber se existe próxima página
+        params.append(limit + 1)
+        users = load_documents(self.db.connection, sql, params)
+        return paginate(users if fields is None else (project(u, fields) for u in users), limit)
+
+    def get_many(self, ids, fields=None):
+        """Leitura em lote com uma única consulta, sem o hash de senha."""
+        users = load_documents(self.db.connection, SELECT_MANY, (json.dumps([str(id) for id in ids]),))
+        return {u['id']: project(u, fields) for u in users}
+
+    def get(self, id):
+        return self._find_one(SELECT_ONE, str(ObjectId(id)))
+
+    def update(self, id, data):
+        data = normalize_user(data)
+        id = str(ObjectId(id))
+        # Se estiver atualizando a senha, fazer o hash (fora da transação: o bcrypt é lento de propósito)
+        if 'password' in data:
+            data['password'] = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        with self.db.transaction() as conn:
+            row = conn.execute(SELECT_ONE, (id,)).fetchone()
+            if row is None:
+                return None
+            # Atualiza timestamp de atualização
+            data['updated_at'] = datetime.utcnow()
+            user = _document(id, {**json.loads(row[0]), **data})
+            try:
+                conn.execute(UPDATE, _row(id, user)[1:] + (id,))
+            except sqlite3.IntegrityError as e:
+                raise ValueError(_duplicate_message(e))
+        return user
+
+    def delete(self, id):
+        cursor = self.db.connection.execute(DELETE, (str(ObjectId(id)),))
+        return cursor.rowcount > 0
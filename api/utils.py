@@ -0,0 +1,80 @@
+"""Funções auxiliares dos repositórios: normalização, paginação e projeção.
+
+Usadas pelos três backends (ver repository.py) e pelo seed.
+"""
+import re
+
+# Paginação das listagens
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_NOT_ALPHANUMERIC = re.compile(r'[^0-9A-Z]')
+_NOT_DIGIT = re.compile(r'\D')
+
+
+def normalize_cnpj(value):
+    # CNPJ alfanumérico (validators.CNPJValidator): pontuação removida, letras em maiúsculas
+    return _NOT_ALPHANUMERIC.sub('', str(value).upper())
+
+
+def normalize_phone(value):
+    return _NOT_DIGIT.sub('', str(value))
+
+
+def normalize_supplier(data):
+    """Cópia de `data` na forma gravada pelos backends (apenas campos presentes)."""
+    cleaned = dict(data)
+    if cleaned.get('cnpj') is not None:
+        cleaned['cnpj'] = normalize_cnpj(cleaned['cnpj'])
+    if cleaned.get('phone') is not None:
+        cleaned['phone'] = normalize_phone(cleaned['phone'])
+    if cleaned.get('email') is not None:
+        cleaned['email'] = str(cleaned['email']).strip()
+    return cleaned
+
+
+def normalize_login(value):
+    # username/email como gravados e procurados: minúsculas, sem espaços nas pontas
+    return str(value).strip().lower()
+
+
+def normalize_user(data):
+    """Cópia de `data` com username e email em minúsculas, sem espaços nas pontas (apenas campos presentes).
+
+    Gravados assim, a busca por prefixo e o login não diferenciam
+    maiúsculas e continuam usando os índices únicos dos dois campos.
+    """
+    cleaned = dict(data)
+    for field in ('username', 'email'):
+        if cleaned.get(field) is not None:
+            cleaned[field] = normalize_login(cleaned[field])
+    return cleaned
+
+
+def page_limit(limit):
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def project(record, fields=None, exclude=()):
+    """Campos `fields` de `record` (todos se None), sem os de `exclude`; 'id' sempre presente."""
+    if fields is None:
+        return {k: v for k, v in record.items() if k not in exclude}
+    projected = {k: record[k] for k in fields if k in record and k not in exclude}
+    projected['id'] = record['id']
+    return projected
+
+
+def paginate(records, limit):
+    """Monta (itens, próximo cursor) a partir de até limit + 1 registros ordenados por id.
+
+    O registro excedente só indica que existe próxima página; o cursor é o
+    id do último item devolvido (None na última página).
+    """
+    items = {}
+    for record in records:
+        items[record['id']] = record
+    next_cursor = None
+    if len(items) > limit:
+        items.popitem()
+        next_cursor = next(reversed(items))
+    return items, next_cursor
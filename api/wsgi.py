@@ -0,0 +1,15 @@
+"""Ponto de entrada WSGI: a aplicação criada com a configuração do ambiente.
+
+Servidor de produção:        gunicorn api.wsgi:app
+Servidor de desenvolvimento: python server.py (ou python -m api.wsgi)
+
+api/app.py só define a fábrica (create_app); a aplicação é criada aqui,
+ao importar este módulo.
+"""
+from .app import create_app, start_metrics_server
+
+app = create_app()
+
+if __name__ == '__main__':
+    start_metrics_server(app)
+    app.run(port=5000)
@@ -0,0 +1,9 @@
+"""Aplicação ASGI para benchmarks: mesma configuração, com rate limiting desligado.
+
+Servidor: uvicorn bench.asgi:app --port 5002
+"""
+from api.asgi import SupplierASGI
+
+from .wsgi import app as flask_app
+
+app = SupplierASGI(flask_app)
@@ -0,0 +1,141 @@
+"""Mesma carga de trabalho em cada backend de fornecedores (api/repository.py).
+
+Uso: python bench/backends.py [quantidade] [repetições] [--save arquivo] [--baseline arquivo]
+
+Compara o backend JSON (api/supplier.py), o SQLite (api/supplier_sqlite.py)
+e o MongoDB (api/supplier_mongo.py, via MONGO_URI; ignorado se o servidor
+não responder). Cada backend começa vazio em um diretório/banco temporário
+e passa pelas mesmas operações da interface: carga em lote (create_many),
+criação unitária, leitura por id, leitura em lote, página projetada,
+atualização e listagem completa.
+
+--save grava os tempos em JSON; --baseline compara com um arquivo salvo e
+termina com código 1 se alguma operação ficar mais de TOLERANCE vezes mais
+lenta (regressão de desempenho em qualquer engine).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from api import supplier, supplier_mongo, supplier_sqlite  # noqa: E402
+from api.sqlite_db import SQLiteDatabase  # noqa: E402
+
+# Razão máxima tempo atual / baseline antes de acusar regressão
+TOLERANCE = 1.5
+
+
+def make_record(i):
+    return {
+        'name': f'Fornecedor {i} Comércio Ltda',
+        'cnpj': f'{i:014d}',
+        'email': f'contato{i}@fornecedor{i % 50}.com.br',
+        'phone': f'119{i:08d}',
+        'address': f'Rua das Flores, {i}, São Paulo - SP',
+    }
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def workload(model, count, repeat):
+    """Tempos (segundos) de cada operação; a carga é o tempo total, as demais o melhor de `repeat`."""
+    for id in list(model.get_all()):
+        model.delete(id)
+    start = time.perf_counter()
+    model.create_many(make_record(i) for i in range(count))
+    elapsed_load = time.perf_counter() - start
+    ids = sorted(model.get_all())
+    target = model.get(ids[1])
+    sample = ids[::max(1, len(ids) // 100)][:100]
+    sequence = iter(range(count, count + repeat * 3))
+    return {
+        'carga': elapsed_load,
+        'create': best_of(lambda: model.create(make_record(next(sequence))), repeat),
+        'get': best_of(lambda: model.get(ids[len(ids) // 2]), repeat),
+        'get_many_100': best_of(lambda: model.get_many(sample, fields=['name', 'cnpj']), repeat),
+        'get_page_50': best_of(lambda: model.get_page(50, after=ids[len(ids) // 2], fields=['name']), repeat),
+        'update': best_of(lambda: model.update(ids[1], {**make_record(1), 'cnpj': target['cnpj']}), repeat),
+        'get_all': best_of(model.get_all, max(1, repeat // 10)),
+    }
+
+
+def mongo_backend():
+    uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/eskcrud_bench')
+    client = MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        client.close()
+        print(f"mongo    ignorado ({type(e).__name__})")
+        return None
+    db = client.get_database('eskcrud_bench')
+    db.suppliers.drop()
+    model = supplier_mongo.Supplier(SimpleNamespace(db=db, cx=client))
+    model.ensure_indexes()
+    return model, lambda: (db.suppliers.drop(), client.close())
+
+
+def backends(tmp):
+    yield 'json', supplier.Supplier(os.path.join(tmp, 'suppliers.json')), lambda: None
+    db = SQLiteDatabase(os.path.join(tmp, 'eskcrud.sqlite3'))
+    yield 'sqlite', supplier_sqlite.Supplier(db), db.close
+    mongo = mongo_backend()
+    if mongo is not None:
+        yield 'mongo', mongo[0], mongo[1]
+
+
+def regressions(results, baseline):
+    for backend, times in results.items():
+        for op, seconds in times.items():
+            reference = baseline.get(backend, {}).get(op)
+            if reference and seconds > reference * TOLERANCE:
+                yield f"{backend}.{op}: {reference * 1000:.3f} ms -> {seconds * 1000:.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('count', nargs='?', type=int, default=10000)
+    parser.add_argument('repeat', nargs='?', type=int, default=100)
+    parser.add_argument('--save', help='grava os tempos medidos (JSON)')
+    parser.add_argument('--baseline', help='compara com tempos salvos por --save')
+    args = parser.parse_args()
+
+    print(f"{args.count} fornecedores, melhor de {args.repeat} execuções (carga: total)")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model, close in backends(tmp):
+            try:
+                results[name] = workload(model, args.count, args.repeat)
+            finally:
+                close()
+            print(f"{name:<8} " + "  ".join(
+                f"{op} {seconds * 1000:.3f} ms" for op, seconds in results[name].items()))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            slower = list(regressions(results, json.load(f)))
+        for line in slower:
+            print(f"REGRESSÃO {line}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
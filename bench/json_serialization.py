@@ -0,0 +1,71 @@
+"""Custo de serializar a listagem de fornecedores com cada provider JSON.
+
+Uso: python bench/json_serialization.py [quantidade] [repetições]
+
+Compara o bson.json_util (BSONProvider do Flask-PyMongo, usado antes) com
+os providers de api/json_provider.py, sobre documentos no formato
+devolvido por Supplier.get_all().
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId, json_util
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from api.json_provider import PROVIDERS  # noqa: E402
+
+
+def make_suppliers(count):
+    base = datetime(2025, 7, 30, 12, 0, 0)
+    suppliers = {}
+    for i in range(count):
+        oid = ObjectId()
+        created = base + timedelta(minutes=i, milliseconds=i % 1000)
+        suppliers[f'sup_{oid}'] = {
+            'id': f'sup_{oid}',
+            'name': f'Fornecedor {i} Comércio Ltda',
+            'cnpj': f'{i:014d}',
+            'email': f'contato{i}@fornecedor{i % 50}.com.br',
+            'phone': f'(11) 9{i:04d}-{i % 10000:04d}',
+            'address': f'Rua das Flores, {i}, São Paulo - SP',
+            'owner_id': ObjectId(),
+            'created_at': created,
+            'updated_at': created,
+        }
+    return {'success': True, 'data': suppliers}
+
+
+def measure(dumps, payload, repeat):
+    best = float('inf')
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = dumps(payload)
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    return best, size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    payload = make_suppliers(count)
+    app = Flask(__name__)
+
+    candidates = {'bson.json_util (anterior)': lambda obj: json_util.dumps(obj).encode('utf-8')}
+    for name, provider_class in PROVIDERS.items():
+        candidates[name] = provider_class(app).dumps_bytes
+
+    print(f"{count} fornecedores, melhor de {repeat} execuções")
+    baseline = None
+    for name, dumps in candidates.items():
+        elapsed, size = measure(dumps, payload, repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<28} {elapsed * 1000:8.1f} ms  {size / 1024:8.0f} KiB  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
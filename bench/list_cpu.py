@@ -0,0 +1,115 @@
+"""CPU da listagem de fornecedores (GET /suppliers) por 10 mil registros.
+
+Uso: python bench/list_cpu.py [quantidade] [repetições]
+
+Mede o tempo de CPU do processo (time.process_time) para montar a
+resposta da listagem: Supplier.get_all() seguido da serialização com o
+provider JSON da aplicação (JSON_PROVIDER). Backends JSON e SQLite rodam
+em diretório temporário.
+
+O MongoDB é simulado sem servidor: os documentos são codificados em BSON
+uma vez e cada execução decodifica o lote (o que o driver faz com a
+resposta do find) e monta o dicionário da listagem, no formato anterior
+(_id convertido em 'id' por registro) e no atual ('id' gravado, _id
+excluído pela projeção).
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from api import config, supplier, supplier_sqlite  # noqa: E402
+from api.json_provider import get_provider_class  # noqa: E402
+from api.sqlite_db import SQLiteDatabase  # noqa: E402
+
+PER = 10000
+
+
+def make_record(i):
+    return {
+        'name': f'Fornecedor {i} Comércio Ltda',
+        'cnpj': f'{i:014d}',
+        'email': f'contato{i}@fornecedor{i % 50}.com.br',
+        'phone': f'119{i:08d}',
+        'address': f'Rua das Flores, {i}, São Paulo - SP',
+    }
+
+
+def cpu_best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def mongo_batches(count):
+    """Lote BSON como o servidor devolve: formato anterior e formato atual."""
+    timestamp = datetime.utcnow().replace(microsecond=0)
+    legacy, stored = [], []
+    for i in range(count):
+        oid = ObjectId()
+        document = {**make_record(i), 'created_at': timestamp, 'updated_at': timestamp}
+        legacy.append(bson.encode({'_id': oid, **document}))
+        stored.append(bson.encode({'id': f'sup_{oid}', **document}))
+    return b''.join(legacy), b''.join(stored)
+
+
+def legacy_mongo_listing(data):
+    suppliers = {}
+    for s in bson.decode_all(data):
+        s['id'] = f"sup_{str(s['_id'])}"
+        del s['_id']
+        suppliers[s['id']] = s
+    return suppliers
+
+
+def stored_mongo_listing(data):
+    return {s['id']: s for s in bson.decode_all(data)}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else PER
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    dumps = get_provider_class(config.JSON_PROVIDER)(Flask(__name__)).dumps_bytes
+    scale = PER / count
+
+    def listing(get_all):
+        return lambda: dumps({'success': True, 'data': get_all()})
+
+    print(f"{count} fornecedores, provider {config.JSON_PROVIDER}, melhor de {repeat} execuções, "
+          f"ms de CPU por {PER} registros")
+    with tempfile.TemporaryDirectory() as tmp:
+        json_model = supplier.Supplier(os.path.join(tmp, 'suppliers.json'))
+        db = SQLiteDatabase(os.path.join(tmp, 'eskcrud.sqlite3'))
+        sqlite_model = supplier_sqlite.Supplier(db)
+        legacy, stored = mongo_batches(count)
+        cases = []
+        for name, model in (('json', json_model), ('sqlite', sqlite_model)):
+            for id in list(model.get_all()):
+                model.delete(id)
+            model.create_many(make_record(i) for i in range(count))
+            cases.append((name, model.get_all, listing(model.get_all)))
+        cases.append(('mongo (anterior, simulado)', lambda: legacy_mongo_listing(legacy),
+                      listing(lambda: legacy_mongo_listing(legacy))))
+        cases.append(('mongo (atual, simulado)', lambda: stored_mongo_listing(stored),
+                      listing(lambda: stored_mongo_listing(stored))))
+        try:
+            for name, read, respond in cases:
+                read_cpu = cpu_best_of(read, repeat)
+                total_cpu = cpu_best_of(respond, repeat)
+                print(f"{name:<28} get_all {read_cpu * scale * 1000:8.1f} ms  "
+                      f"resposta {total_cpu * scale * 1000:8.1f} ms")
+        finally:
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
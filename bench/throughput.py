@@ -0,0 +1,109 @@
+"""Mede a vazão (req/s) e a latência de um endpoint HTTP.
+
+Uso:
+    python bench/throughput.py http://127.0.0.1:5000/api/swagger.json -c 16 -d 15
+    python bench/throughput.py http://127.0.0.1:5000/suppliers -H "Authorization: Bearer <token>"
+    python bench/throughput.py http://127.0.0.1:5002/suppliers/<id> -c 1000 --strict --row asgi
+
+Usa apenas a biblioteca padrão: cada conexão é um thread com keep-alive.
+--strict encerra com código 1 se alguma resposta não for 2xx (a medição
+cobriria o caminho de erro); --row imprime a linha da tabela do README.
+"""
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+def _worker(url, headers, deadline, latencies, errors, statuses):
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    conn = None
+    while time.perf_counter() < deadline:
+        if conn is None:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            statuses.append(response.status)
+            if response.status >= 400:
+                errors.append(response.status)
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = None
+            continue
+        latencies.append(time.perf_counter() - start)
+    if conn is not None:
+        conn.close()
+
+
+def run(url, concurrency, duration, headers):
+    latencies, errors, statuses = [], [], []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=_worker, args=(url, headers, deadline, latencies, errors, statuses))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    statuses = Counter(statuses)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'ok': sum(count for status, count in statuses.items() if 200 <= status < 300),
+        # Respostas por status e falhas de conexão por tipo de exceção
+        'statuses': dict(statuses + Counter(e for e in errors if isinstance(e, str))),
+        'rps': len(latencies) / elapsed,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': pct(0.50),
+        'p99_ms': pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help='conexões simultâneas')
+    parser.add_argument('-d', '--duration', type=float, default=15, help='duração em segundos')
+    parser.add_argument('-H', '--header', action='append', default=[], help='header extra ("Nome: valor")')
+    parser.add_argument('--strict', action='store_true', help='código de saída 1 se alguma resposta não for 2xx')
+    parser.add_argument('--row', metavar='NOME', help='imprime também a linha da tabela (Markdown)')
+    args = parser.parse_args()
+    headers = dict(h.split(':', 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+    headers.setdefault('Accept-Encoding', 'gzip')
+
+    result = run(args.url, args.concurrency, args.duration, headers)
+    print(f"{result['requests']} requisições, {result['errors']} erro(s) em {args.duration:.0f}s "
+          f"com {args.concurrency} conexões")
+    print(f"{result['rps']:.1f} req/s | média {result['mean_ms']:.2f} ms | "
+          f"p50 {result['p50_ms']:.2f} ms | p99 {result['p99_ms']:.2f} ms")
+    print('Respostas: ' + ', '.join(f"{status}: {count}" for status, count in sorted(result['statuses'].items(),
+                                                                                   key=lambda item: str(item[0]))))
+    if args.row:
+        print(f"| {args.row} | {args.concurrency} | {result['rps']:.0f} | {result['p50_ms']:.1f} | "
+              f"{result['p99_ms']:.1f} | {result['errors']} |")
+    if args.strict and (result['errors'] or not result['ok'] or result['ok'] < result['requests']):
+        print("Há respostas que não são 2xx: a medição não vale para a tabela", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""Aplicação para benchmarks: mesma configuração, com rate limiting desligado.
+
+Servidor de desenvolvimento: flask --app bench.wsgi run --debug --port 5000
+Servidor de produção:        gunicorn -c gunicorn.conf.py bench.wsgi:app
+"""
+from api.app import create_app
+
+# TESTING desliga o rate limiting (200/dia, 50/hora por IP), que do
+# contrário responderia 429 a quase todas as requisições do benchmark
+app = create_app({'TESTING': True})
@@ -1,35 +1,29 @@
-import json
 import os
+import sys
 from pymongo import MongoClient
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Permite importar o pacote api ao executar `python db/migrar_usuarios.py`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from api.seed import iter_json_records, seed_users
+
 load_dotenv()
 
 # Configuração da URI do MongoDB Atlas
 MONGO_URI = os.getenv("MONGO_URI", "mongodb+srv://localhost:27017/eskcrud")
 
-# Caminho do arquivo JSON de usuários
-json_path = Path("db/users.json")
+# Caminho do arquivo de usuários (.json ou .jsonl), opcionalmente informado na linha de comando
+json_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("db/users.json")
 
 # Conectar ao MongoDB
 client = MongoClient(MONGO_URI)
 db = client["eskcrud"]
 collection = db["users"]
 
-# Carregar usuários do JSON
-with open(json_path, "r", encoding="utf-8") as f:
-    users = json.load(f)
-
-# Migrar cada usuário
-for user in users.values():
-    # Remove o campo 'id' (MongoDB usará _id)
-    user.pop("id", None)
-    # Evita duplicidade por username/email
-    if not collection.find_one({"username": user["username"]}):
-        collection.insert_one(user)
-        print(f"Usuário {user['username']} migrado.")
-    else:
-        print(f"Usuário {user['username']} já existe no MongoDB, ignorado.")
+# Migrar usuários: leitura incremental e upsert em lote por username
+# (usuários já existentes no MongoDB são mantidos)
+count = seed_users(collection, iter_json_records(json_path))
+print(f"{count} usuário(s) migrado(s).")
 
 print("Migração concluída.")
\ No newline at end of file
@@ -4,6 +4,12 @@ let currentUser = null;
 let usersData = [];
 let currentUserSearchTerm = '';
 let lastFocusedElement = null;
+// Paginação por cursor da listagem de usuários
+const USERS_PAGE_SIZE = 50;
+let nextUsersCursor = null;
+let userSearchTimer = null;
+// Número da última requisição de listagem: respostas de buscas anteriores são descartadas
+let usersRequestSeq = 0;
 
 // Page initialization
 document.addEventListener('DOMContentLoaded', () => {
@@ -86,9 +92,16 @@ function initializeUserSearch() {
     searchInput.value = '';
     currentUserSearchTerm = '';
     searchInput.addEventListener('input', (event) => {
-        currentUserSearchTerm = event.target.value.trim().toLowerCase();
-        applyUserFilters();
+        currentUserSearchTerm = event.target.value.trim();
+        // A busca por prefixo é feita no servidor; aguarda o usuário parar de digitar
+        clearTimeout(userSearchTimer);
+        userSearchTimer = setTimeout(() => loadUsers(), 300);
     });
+
+    const loadMoreButton = document.getElementById('loadMoreUsers');
+    if (loadMoreButton) {
+        loadMoreButton.addEventListener('click', () => loadUsers(true));
+    }
 }
 
 // Include the handleAuthError function from script.js
@@ -103,13 +116,21 @@ function handleAuthError(response) {
     return false;
 }
 
-async function loadUsers() {
+async function loadUsers(append = false) {
+    const requestSeq = ++usersRequestSeq;
     try {
         showLoading();
         const token = localStorage.getItem('token');
-        const response = await fetch(`${API_URL}/users`, {
+        const params = new URLSearchParams({ limit: USERS_PAGE_SIZE });
+        if (currentUserSearchTerm) params.set('q', currentUserSearchTerm);
+        if (append && nextUsersCursor) params.set('after', nextUsersCursor);
+        const response = await fetch(`${API_URL}/users?${params}`, {
             headers: { 'Authorization': `Bearer ${token}` }
         });
+        // Uma busca mais recente já foi enviada: esta resposta chegou fora de ordem
+        if (requestSeq !== usersRequestSeq) {
+            return;
+        }
         
         // Check for authentication errors
         if (handleAuthError(response)) {
@@ -118,35 +139,43 @@ async function loadUsers() {
         
         if (!response.ok) throw new Error(`Status ${response.status}`);
         const result = await response.json();
+        if (requestSeq !== usersRequestSeq) {
+            return;
+        }
         if (result.success) {
-            usersData = Object.values(result.data || {});
+            const page = Object.values(result.data || {});
+            usersData = append ? usersData.concat(page) : page;
+            nextUsersCursor = result.next_cursor || null;
+            updateLoadMoreButton();
             applyUserFilters();
         } else {
             throw new Error(result.message);
         }
     } catch (err) {
+        if (requestSeq !== usersRequestSeq) {
+            return;
+        }
         console.error('Erro ao carregar usuários:', err);
         Swal.fire({ icon: 'error', title: 'Erro', text: err.message });
     } finally {
-        hideLoading();
+        if (requestSeq === usersRequestSeq) {
+            hideLoading();
+        }
     }
 }
 
 function applyUserFilters() {
+    // O filtro de busca já foi aplicado pelo servidor
     const safeUsers = Array.isArray(usersData) ? usersData : [];
-    const filteredUsers = safeUsers.filter((user) => {
-        if (!currentUserSearchTerm) {
-            return true;
-        }
-
-        const usernameMatch = user.username && user.username.toLowerCase().includes(currentUserSearchTerm);
-        const emailMatch = user.email && user.email.toLowerCase().includes(currentUserSearchTerm);
-        const roleMatch = user.role && user.role.toLowerCase().includes(currentUserSearchTerm);
-        return usernameMatch || emailMatch || roleMatch;
-    });
+    renderUsers(safeUsers);
+    updateUsersSummary(safeUsers.length, safeUsers.length);
+}
 
-    renderUsers(filteredUsers);
-    updateUsersSummary(filteredUsers.length, safeUsers.length);
+function updateLoadMoreButton() {
+    const loadMoreButton = document.getElementById('loadMoreUsers');
+    if (loadMoreButton) {
+        loadMoreButton.classList.toggle('d-none', !nextUsersCursor);
+    }
 }
 
 function renderUsers(list) {
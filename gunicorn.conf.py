@@ -0,0 +1,83 @@
+# Configuração do servidor de produção (pre-fork)
+#
+# Uso: gunicorn api.wsgi:app   (ou: python server.py --production)
+#
+# O mestre carrega a aplicação uma vez (preload_app) e cria os workers
+# com fork. Sinais suportados pelo mestre:
+#   HUP   recria os workers gradualmente (nova configuração; código novo
+#         só é carregado com uma troca de binário, abaixo)
+#   USR2  inicia um novo mestre com o código atual ao lado do antigo;
+#         em seguida WINCH + QUIT no mestre antigo: reload sem downtime
+#   TERM  encerramento gracioso (aguarda graceful_timeout)
+import gc
+import os
+
+from api import config as _config  # "config" é um nome de opção do gunicorn
+
+
+def _cpu_count():
+    # Respeita a afinidade de CPU do processo (containers, taskset)
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = _config.WEB_BIND
+workers = _config.WEB_WORKERS or (2 * _cpu_count() + 1)
+worker_class = 'sync'
+preload_app = True
+max_requests = _config.WEB_MAX_REQUESTS
+max_requests_jitter = _config.WEB_MAX_REQUESTS_JITTER
+timeout = _config.WEB_TIMEOUT
+graceful_timeout = _config.WEB_GRACEFUL_TIMEOUT
+keepalive = 5
+# Logs de acesso ficam com api.timing (access log estruturado)
+accesslog = None
+errorlog = '-'
+
+# Coleta de ciclos desligada enquanto a aplicação é carregada no mestre:
+# objetos criados aqui não são promovidos/tocados antes do gc.freeze()
+gc.disable()
+
+
+def _loaded_app(server):
+    # Aplicação servida (api.wsgi:app, bench.wsgi:app, ...), já carregada no mestre (preload_app)
+    return server.app.wsgi()
+
+
+def when_ready(server):
+    # Aplicação já carregada: move tudo para a geração permanente, que o GC
+    # não percorre, evitando cópias das páginas compartilhadas (copy-on-write).
+    # Depois do freeze o mestre volta a coletar normalmente
+    gc.freeze()
+    gc.enable()
+    server.log.info(f"{gc.get_freeze_count()} objetos congelados antes do fork; {workers} worker(s)")
+
+
+def pre_fork(server, worker):
+    # Workers recriados (reciclagem, HUP) também herdam o que o mestre alocou depois do when_ready
+    gc.freeze()
+    # Menor índice livre entre os workers vivos: a porta de métricas do
+    # worker (METRICS_BIND + índice) é reaproveitada quando ele é reciclado
+    used = {getattr(w, 'metrics_index', None) for w in server.WORKERS.values()}
+    worker.metrics_index = next(i for i in range(len(used) + 1) if i not in used)
+
+
+def post_fork(server, worker):
+    from api.app import reset_mongo_client, start_metrics_server, warm_mongo_pool
+    from api.logging_setup import restart_listener_after_fork
+    app = _loaded_app(server)
+    # Threads e conexões não sobrevivem ao fork
+    restart_listener_after_fork()
+    reset_mongo_client(app)
+    # Métricas ficam na memória de cada worker: um servidor por worker
+    start_metrics_server(app, worker.metrics_index)
+    # Conexões abertas antes do worker aceitar a primeira requisição
+    warm_mongo_pool(app)
+
+
+def worker_exit(server, worker):
+    # Eventos de auditoria ainda na fila são gravados antes do worker sair
+    log = _loaded_app(server).extensions.get('esk_audit')
+    if log is not None:
+        log.close()
@@ -1,6 +1,24 @@
-from api.app import app
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_production():
+    """Substitui o processo pelo gunicorn, configurado em gunicorn.conf.py."""
+    os.chdir(BASE_DIR)
+    os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'api.wsgi:app'])
+
 
 if __name__ == '__main__':
+    if '--production' in sys.argv[1:]:
+        run_production()
+
+    from api.app import start_metrics_server
+    from api.wsgi import app
+    # Com o reloader, só o processo filho (WERKZEUG_RUN_MAIN) atende requisições
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_metrics_server(app)
     # reloader_type='watchdog' evita o OSError: [WinError 10038] no shutdown
     # causado pelo reloader 'stat' do Werkzeug no Windows com Python 3.12+
     app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=True, reloader_type='watchdog')
\ No newline at end of file